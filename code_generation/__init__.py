@@ -1,8 +1,7 @@
-from os import path, SEEK_END, SEEK_SET
-import re
-from collections import defaultdict
+from os import path
 
 import code_generation.code_generator_util as code_generator_util
+from code_generation import build_targets, manifest, node_catalogue, node_ids, render_cache
 from code_generation.svm_writer import SVMWriter
 from code_generation.glsl_writer import GLSLWriter
 from code_generation.cmake_writer import CMakeWriter
@@ -12,6 +11,10 @@ from code_generation.dna_writer import DNAWriter
 from code_generation.node_register_writer import NodeRegisterWriter
 from code_generation.rna_writer import RNAWriter
 from code_generation.node_drawing_writer import NodeDrawingWriter
+from code_generation.formatter import NullFormatter
+from code_generation.journal import Journal
+from code_generation.node_spec import NodeSpec
+from code_generation.source_tree import SourceTree
 from node_types.prop_bool import BoolProp
 from node_types.prop_enum import EnumProp
 from node_types.prop_int import IntProp
@@ -23,185 +26,159 @@ from node_types.socket_vector import VectorSocket
 class CodeGenerator:
     """Generates code required for a new node"""
 
-    def __init__(self, gui):
-        self._gui = gui
+    def __init__(self, gui, source_tree=None, node_id=None):
+        """
+        :param node_id: optional- type id of the node, allocated from BKE_node.h when the node is written by default
+        """
+        self._spec = NodeSpec.from_gui(gui)
+        self._source_tree = source_tree if source_tree is not None else \
+            SourceTree(gui.get_source_path(), journal=Journal(gui.get_source_path()))
+        self._node_id = node_id
+
+    def _allocate_node_id(self):
+        """Allocates the nodes type id if it wasn't given, raises if the node is already defined"""
+        if self._node_id is None:
+            registry = node_ids.index_text(self._source_tree.read(node_ids.file_path(self._spec.get_source_path())))
+            name = node_ids.define_name(self._spec)
+            self._node_id = registry.allocate([name])[name]
 
     def _add_node_type_id(self):
         """BKE_node.h"""
-        with open(path.join(self._gui.get_source_path(), "source", "blender", "blenkernel", "BKE_node.h"),
-                  "r+") as f:
-            file_text = f.read()
-            last_i = -1
-            last_id = re.search('[7-9][0-9][0-9]\n\n', file_text)
-            if last_id is not None:
-                last_i = last_id.end()
-            else:
-                print("Node ID not found")
-            last = int(file_text[last_i - 5:last_i - 2])
-            name_underscored = "_".join(self._gui.get_node_name().split(" "))
-            line = "#define SH_NODE_{0}{1} {2}\n".format("{SUFF}_".format(
-                SUFF=self._gui.type_suffix_abbreviated().upper()) if self._gui.type_suffix_abbreviated() else '',
-                                                         name_underscored.upper(), str(last + 1))
-            file_text = file_text[:last_i - 1] + line + file_text[last_i - 1:]
-
-            f.seek(0)
-            f.write(file_text)
-            f.truncate()
+        self._allocate_node_id()
+        file_path = node_ids.file_path(self._spec.get_source_path())
+        line = "#define {0} {1}\n".format(node_ids.define_name(self._spec), self._node_id)
+        self._source_tree.insert(file_path, self._source_tree.anchor(file_path, 'node_ids_end'), line)
+
+    @render_cache.rendered
+    def _generate_node_definition(self):
+        """DefNode line of the node"""
+        params = 'ShaderNode,' \
+                 'SH_NODE_{SUFF}{NAME},' \
+                 '{rna},' \
+                 '"{SUFF}{NAME}",' \
+                 '{struct},' \
+                 '"{Name}{Suffix}",' \
+                 '""'.format(
+            SUFF=self._spec.suffix_abbreviated_prefix_upper,
+            NAME=self._spec.name_upper_underscored,
+            rna='def_sh_{suff}{name}'.format(
+                suff=self._spec.suffix_abbreviated_prefix,
+                name=self._spec.name_lower_underscored) if self._spec.node_has_properties() else 0,
+            struct='{Suff}{Name}'.format(Suff=self._spec.type_suffix_abbreviated().capitalize(),
+                                         Name=self._spec.name_capitalized_no_space),
+            Name=self._spec.name_capitalized_spaced,
+            Suffix=' {Suffix}'.format(
+                Suffix='Texture' if self._spec.is_texture_node() else 'BSDF') if self._spec.type_suffix() else '')
+
+        def_node_line_length = 138
+        def_node_parameter_offsets = [0, 16, 44, 68, 90, 108, 129]
+        return 'DefNode({params})\n'.format(
+            params=code_generator_util.fill_white_space(
+                params.split(','), def_node_line_length, def_node_parameter_offsets))
 
     def _add_node_definition(self):
         """NOD_static_types.h"""
-        file_path = path.join(self._gui.get_source_path(), "source", "blender", "nodes", "NOD_static_types.h")
-        with open(file_path, "r+") as f:
-            params = 'ShaderNode,' \
-                     'SH_NODE_{SUFF}{NAME},' \
-                     '{rna},' \
-                     '"{SUFF}{NAME}",' \
-                     '{struct},' \
-                     '"{Name}{Suffix}",' \
-                     '""'.format(
-                SUFF='{SUFF}_'.format(
-                    SUFF=self._gui.type_suffix_abbreviated().upper()) if self._gui.type_suffix_abbreviated() else '',
-                NAME=code_generator_util.string_upper_underscored(self._gui.get_node_name()),
-                rna='def_sh_{suff}{name}'.format(
-                    suff='{suff}_'.format(suff=self._gui.type_suffix_abbreviated()) if self._gui.type_suffix() else '',
-                    name=code_generator_util.string_lower_underscored(
-                        self._gui.get_node_name())) if self._gui.node_has_properties() else 0,
-                struct='{Suff}{Name}'.format(Suff=self._gui.type_suffix_abbreviated().capitalize(),
-                                             Name=code_generator_util.string_capitalized_no_space(
-                                                 self._gui.get_node_name())),
-                Name=code_generator_util.string_capitalized_spaced(self._gui.get_node_name()),
-                Suffix=' {Suffix}'.format(
-                    Suffix='Texture' if self._gui.is_texture_node() else 'BSDF') if self._gui.type_suffix() else '')
-
-            def_node_line_length = 138
-            def_node_parameter_offsets = [0, 16, 44, 68, 90, 108, 129]
-            node_definition = 'DefNode({params})\n'.format(
-                params=code_generator_util.fill_white_space(
-                    params.split(','), def_node_line_length, def_node_parameter_offsets))
-
-            # Find last shader node definition, write new node def under that
-            text = f.read()
-            matches = re.search(r'edoNredahS\(edoNfeD', text[::-1])
-            if not matches:
-                raise Exception("Match not found")
-            match_i = len(text) - matches.end()
-            for i in range(match_i, len(text)):
-                if text[i] == '\n':
-                    break
-            else:
-                raise Exception("No newline found")
+        file_path = path.join(self._spec.get_source_path(), "source", "blender", "nodes", "NOD_static_types.h")
+        # Write new node def under the last shader node definition
+        i = self._source_tree.anchor(file_path, 'shader_node_definitions_end')
+        self._source_tree.insert(file_path, i, self._generate_node_definition())
+
+    @render_cache.rendered
+    def _generate_cycles_class(self):
+        """Cycles node class"""
+        props_string = "\n".join(
+            "NODE_SOCKET_API({type}, {name})".format(
+                type=item['data-type'].property_name,
+                name=item.name_lower_underscored
+                )
+                for item in self._spec.get_props() + self._spec.get_node_sockets()
+            )
 
-            text = text[:i + 1] + node_definition + text[i + 1:]
-            f.seek(0)
-            f.write(text)
-            f.truncate()
+        return "class {name}{Suffix}Node : public {type}Node {{" \
+               "public:" \
+               "SHADER_NODE_CLASS({name}{Suffix}Node)\n" \
+               "{constant_fold}" \
+               "{props}" \
+               "}};".format(name=self._spec.name_capitalized_no_space,
+                            Suffix=self._spec.type_suffix().capitalize(),
+                            type=self._spec.get_node_type(),
+                            constant_fold='void constant_fold(const ConstantFolder &folder);\n'
+                            if self._uses_constant_fold() else '',
+                            props=props_string) + '\n\n'
 
     def _add_cycles_class(self):
         """shader_nodes.h"""
-        file_path = path.join(self._gui.get_source_path(), "intern", "cycles", "scene", "shader_nodes.h")
-        with open(file_path, 'r+') as f:
-            props_string = "\n".join(
-                "NODE_SOCKET_API({type}, {name})".format(
-                    type=item['data-type'].property_name,
-                    name=code_generator_util.string_lower_underscored(item['name'])
-                    )
-                    for item in self._gui.get_props() + self._gui.get_node_sockets()
-                )
-
-            node = "class {name}{Suffix}Node : public {type}Node {{" \
-                   "public:" \
-                   "SHADER_NODE_CLASS({name}{Suffix}Node)\n" \
-                   "{props}" \
-                   "}};".format(name=code_generator_util.string_capitalized_no_space(self._gui.get_node_name()),
-                                Suffix=self._gui.type_suffix().capitalize(),
-                                type=self._gui.get_node_type(),
-                                props=props_string)
-            f.seek(0, SEEK_END)
-            f.seek(f.tell() - 100, SEEK_SET)
-            line = f.readline()
-            while line != '\n':
-                if line == '':
-                    raise Exception("Reached end of file")
-                line = f.readline()
-            f.seek(f.tell(), SEEK_SET)
-            f.write(node)
-            f.write("""
-
-                    CCL_NAMESPACE_END
-
-                    #endif /* __NODES_H__ */
-                    """)
-        code_generator_util.apply_clang_formatting(file_path, self._gui.get_source_path())
+        file_path = path.join(self._spec.get_source_path(), "intern", "cycles", "scene", "shader_nodes.h")
+        i = self._source_tree.anchor(file_path, 'cycles_classes_end')
+        self._source_tree.insert(file_path, i, self._generate_cycles_class(), formatted=True)
+
+    @render_cache.rendered
+    def _generate_cycles_class_instance(self):
+        """Case creating the cycles node from the blender node"""
+        props = self._spec.get_props()
+        return 'else if (b_node.is_a(&RNA_ShaderNode{Suff}{Name})) {{' \
+               'BL::ShaderNode{Suff}{Name} b_{name}_node(b_node);' \
+               '{Name}{Suffix}Node *{name} = graph->create_node<{Name}{Suffix}Node>();' \
+               '{props}' \
+               '{texture_mapping}' \
+               'node = {name};' \
+               '}}\n'.format(
+            Suff=self._spec.type_suffix_abbreviated().capitalize(),
+            Name=self._spec.name_capitalized_no_space,
+            name=self._spec.name_lower_underscored,
+            Suffix=self._spec.type_suffix().capitalize(),
+            props=''.join(
+                ['{name}->set_{prop}(b_{name}_node.{prop}());'.format(
+                    name=self._spec.name_lower_underscored,
+                    prop=prop.name_lower_underscored) for prop in props]),
+            texture_mapping='BL::TexMapping b_texture_mapping(b_{name}_node.texture_mapping());'
+                            'get_tex_mapping({name}, b_texture_mapping);'.format(
+                name=self._spec.name_lower_underscored) if self._spec.uses_texture_mapping() else '') \
+            if len(props) > 0 or self._spec.uses_texture_mapping() else \
+            'else if (b_node.is_a(&RNA_ShaderNode{Suff}{Name})) {{' \
+            'node = graph->create_node<{Name}{Suffix}Node>();}}\n'.format(
+                Name=self._spec.name_capitalized_no_space,
+                Suff=self._spec.type_suffix_abbreviated().capitalize(),
+                Suffix=self._spec.type_suffix().capitalize())
 
     def _add_cycles_class_instance(self):
         """shader.cpp"""
-        file_path = path.join(self._gui.get_source_path(), "intern", "cycles", "blender", "shader.cpp")
-        with open(file_path, 'r+') as f:
-            props = self._gui.get_props()
-            text = 'else if (b_node.is_a(&RNA_ShaderNode{Suff}{Name})) {{' \
-                   'BL::ShaderNode{Suff}{Name} b_{name}_node(b_node);' \
-                   '{Name}{Suffix}Node *{name} = graph->create_node<{Name}{Suffix}Node>();' \
-                   '{props}' \
-                   '{texture_mapping}' \
-                   'node = {name};' \
-                   '}}\n'.format(
-                Suff=self._gui.type_suffix_abbreviated().capitalize(),
-                Name=code_generator_util.string_capitalized_no_space(
-                    self._gui.get_node_name()),
-                name=code_generator_util.string_lower_underscored(
-                    self._gui.get_node_name()),
-                Suffix=self._gui.type_suffix().capitalize(),
-                props=''.join(
-                    ['{name}->set_{prop}(b_{name}_node.{prop}());'.format(
-                        name=code_generator_util.string_lower_underscored(self._gui.get_node_name()),
-                        prop=code_generator_util.string_lower_underscored(prop['name'])) for prop in props]),
-                texture_mapping='BL::TexMapping b_texture_mapping(b_{name}_node.texture_mapping());'
-                                'get_tex_mapping({name}, b_texture_mapping);'.format(
-                    name=code_generator_util.string_lower_underscored(
-                        self._gui.get_node_name())) if self._gui.uses_texture_mapping() else '') \
-                if len(props) > 0 or self._gui.uses_texture_mapping() else \
-                'else if (b_node.is_a(&RNA_ShaderNode{Suff}{Name})) {{' \
-                'node = graph->create_node<{Name}{Suffix}Node>();}}\n'.format(
-                    Name=code_generator_util.string_capitalized_no_space(self._gui.get_node_name()),
-                    Suff=self._gui.type_suffix_abbreviated().capitalize(),
-                    Suffix=self._gui.type_suffix().capitalize())
-
-            file_text = f.read()
-            # Find start of function
-            function_i = re.search(r'static ShaderNode \*add_node\(Scene \*scene,', file_text)
-
-            # Find end of function
-            if not function_i:
-                raise Exception("Match not found")
-
-            i = function_i.span()[1]
-            while file_text[i] != '{':
-                i += 1
-            bracket_stack = 1
-            while bracket_stack > 0:
-                i += 1
-                if file_text[i] == '{':
-                    bracket_stack += 1
-                elif file_text[i] == '}':
-                    bracket_stack -= 1
-
-            # Go back to last else if
-            seen_brackets = 0
-            while seen_brackets < 2:
-                i -= 1
-                if file_text[i] == '}':
-                    seen_brackets += 1
-
-            # Insert text into file
-            file_text = file_text[:i + 2] + text + file_text[i + 2:]
-
-            f.seek(0)
-            f.write(file_text)
-            f.truncate()
-        code_generator_util.apply_clang_formatting(file_path, self._gui.get_source_path())
-
-    def _add_cycles_node(self):
-        """shader_nodes.cpp"""
+        file_path = path.join(self._spec.get_source_path(), "intern", "cycles", "blender", "shader.cpp")
+        i = self._source_tree.anchor(file_path, 'add_node_cases_end')
+        self._source_tree.insert(file_path, i, self._generate_cycles_class_instance(), formatted=True)
+
+    def _uses_constant_fold(self):
+        """Whether the spec asked for a constant_fold skeleton and the node can be folded"""
+        return self._spec.uses_constant_fold() and \
+            code_generator_util.can_constant_fold(self._spec.get_node_type(), self._spec.get_node_sockets())
+
+    def _generate_constant_fold(self):
+        """Cycles constant_fold, each output is folded separately once none of the inputs are linked"""
+        if not self._uses_constant_fold():
+            return ''
+        sockets = self._spec.get_node_sockets()
+        values = []
+        if self._spec.get_props():
+            values.append('the props {props}'.format(
+                props=', '.join(prop.name_lower_underscored for prop in self._spec.get_props())))
+        values.append('the inputs {inputs}'.format(
+            inputs=', '.join(socket.name_lower_underscored for socket in sockets if socket['type'] == 'Input')))
+        return 'void {Name}{Suffix}Node::constant_fold(const ConstantFolder &folder)' \
+               '{{' \
+               'if (folder.all_inputs_constant()) {{' \
+               '{outputs}' \
+               '}}' \
+               '}}\n\n'.format(
+            Name=self._spec.name_capitalized_no_space,
+            Suffix=self._spec.type_suffix().capitalize(),
+            outputs=''.join('if (folder.output == output("{Name}")) {{'
+                            '/* Compute {Name} from {values} and pass it to folder.make_constant() */'
+                            '}}'.format(Name=socket.name_capitalized_spaced, values=' and '.join(values))
+                            for socket in sockets if socket['type'] == 'Output'))
+
+    @render_cache.rendered
+    def _generate_cycles_node(self):
+        """Cycles node definition and compile functions"""
 
         def format_default(item):
             if isinstance(item['data-type'], EnumProp):
@@ -225,121 +202,118 @@ class CodeGenerator:
                 return False
             return socket == [sock for sock in sockets if isinstance(sock['data-type'], VectorSocket)][0]
 
-        file_path = path.join(self._gui.get_source_path(), "intern", "cycles", "scene", "shader_nodes.cpp")
-        with open(file_path, 'r+') as f:
-            props = self._gui.get_props()
-            sockets = self._gui.get_node_sockets()
-
-            svm_node_manager = SVMWriter(self._gui)
-
-            socket_defs = []
-            for prop in props:
-                if isinstance(prop['data-type'], EnumProp):
-                    socket_defs.append('static NodeEnum {name}_enum;'.format(
-                        name=code_generator_util.string_lower_underscored(prop['name'])))
-                    socket_defs.extend(['{prop}_enum.insert("{OPTION}", {i});'.format(
-                        prop=prop['name'],
-                        OPTION=code_generator_util.string_upper_underscored(option['name']),
-                        i=i + 1) for i, option in enumerate(prop['options'])])
-                    socket_defs.append('SOCKET_ENUM({prop}, "{Prop}", {prop}_enum, {default});\n\n'.format(
-                        prop=code_generator_util.string_lower_underscored(prop['name']),
-                        Prop=code_generator_util.string_capitalized_spaced(prop['name']),
-                        default=format_default(prop)))
-                else:
-                    socket_defs.append('SOCKET_{TYPE}({prop}, "{Prop}", {default});'.format(
-                        TYPE=prop['data-type'].type_name.upper(),
-                        prop=code_generator_util.string_lower_underscored(prop['name']),
-                        Prop=code_generator_util.string_capitalized_spaced(prop['name']),
-                        default=format_default(prop)))
-            socket_defs.append('\n\n')
-
-            for socket in sockets:
-                socket_defs.append('SOCKET_{TYPE}_{DATA_TYPE}({name}, "{Name}"{default}{texture_mapping});'.format(
-                    TYPE=socket['type'][:-3].upper(),
-                    DATA_TYPE=socket['data-type'].definition_name,
-                    name=code_generator_util.string_lower_underscored(socket['name']),
-                    Name=code_generator_util.string_capitalized_spaced(socket['name']),
-                    default=(', ' + format_default(socket)) if socket['type'] == 'Input' else '',
-                    texture_mapping=', SocketType::LINK_TEXTURE_GENERATED' if self._gui.uses_texture_mapping() and
-                                                                              isinstance(socket['data-type'], VectorSocket) and
-                                                                              is_first_vector_socket(socket) else ''))
-
-            node = '/* {NodeName}{space}{Suffix} */\n\n' \
-                   'NODE_DEFINE({Name}{Suffix}Node)' \
-                   '{{' \
-                   'NodeType *type = NodeType::add("{name}{suffix}", create, NodeType::SHADER);\n\n' \
-                   '{texture_mapping}' \
-                   '{sockets}\n\n' \
-                   'return type;' \
-                   '}}\n\n' \
-                   '{Name}{Suffix}Node::{Name}{Suffix}Node() : {Type}Node(node_type)' \
-                   '{{' \
-                   '}}\n\n' \
-                   '{svm_func}' \
-                   'void {Name}{Suffix}Node::compile(OSLCompiler &compiler)' \
-                   '{{' \
-                   '{tex_mapping_comp_osl}' \
-                   '{osl_params}' \
-                   'compiler.add(this, "node_{name}{suffix}");' \
-                   '}}\n\n'.format(
-                NodeName=code_generator_util.string_capitalized_spaced(self._gui.get_node_name()),
-                space=' ' if self._gui.type_suffix_abbreviated() is not '' else '',
-                Suffix=self._gui.type_suffix().capitalize(),
-                Name=code_generator_util.string_capitalized_no_space(self._gui.get_node_name()),
-                name=code_generator_util.string_lower_underscored(self._gui.get_node_name()),
-                suffix='_{suffix}'.format(suffix=self._gui.type_suffix()) if self._gui.type_suffix() else '',
-                texture_mapping='TEXTURE_MAPPING_DEFINE({Name}{Texture}Node);\n\n'.format(
-                    Name=code_generator_util.string_capitalized_no_space(self._gui.get_node_name()),
-                    Texture='Texture' if self._gui.is_texture_node() else ''
-                ) if self._gui.uses_texture_mapping() else '',
-                sockets=''.join(socket_defs),
-                Type=self._gui.get_node_type(),
-                svm_func=svm_node_manager.generate_svm_compile_func(),
-                tex_mapping_comp_osl='tex_mapping.compile(compiler);\n\n' if self._gui.uses_texture_mapping() else '',
-                osl_params=''.join('compiler.parameter(this, "{prop}");'.format(prop=code_generator_util.string_lower_underscored(prop['name'])) for prop in props)
-            )
-
-            text = f.read()
-            match = re.search('CCL_NAMESPACE_END\n', text)
-
-            if not match:
-                raise Exception("Match not found")
+        props = self._spec.get_props()
+        sockets = self._spec.get_node_sockets()
+
+        svm_node_manager = SVMWriter(self._spec)
+
+        socket_defs = []
+        for prop in props:
+            if isinstance(prop['data-type'], EnumProp):
+                socket_defs.append('static NodeEnum {name}_enum;'.format(
+                    name=prop.name_lower_underscored))
+                socket_defs.extend(['{prop}_enum.insert("{OPTION}", {i});'.format(
+                    prop=prop['name'],
+                    OPTION=option.name_upper_underscored,
+                    i=i + 1) for i, option in enumerate(prop['options'])])
+                socket_defs.append('SOCKET_ENUM({prop}, "{Prop}", {prop}_enum, {default});\n\n'.format(
+                    prop=prop.name_lower_underscored,
+                    Prop=prop.name_capitalized_spaced,
+                    default=format_default(prop)))
+            else:
+                socket_defs.append('SOCKET_{TYPE}({prop}, "{Prop}", {default});'.format(
+                    TYPE=prop['data-type'].type_name.upper(),
+                    prop=prop.name_lower_underscored,
+                    Prop=prop.name_capitalized_spaced,
+                    default=format_default(prop)))
+        socket_defs.append('\n\n')
+
+        for socket in sockets:
+            socket_defs.append('SOCKET_{TYPE}_{DATA_TYPE}({name}, "{Name}"{default}{texture_mapping});'.format(
+                TYPE=socket['type'][:-3].upper(),
+                DATA_TYPE=socket['data-type'].definition_name,
+                name=socket.name_lower_underscored,
+                Name=socket.name_capitalized_spaced,
+                default=(', ' + format_default(socket)) if socket['type'] == 'Input' else '',
+                texture_mapping=', SocketType::LINK_TEXTURE_GENERATED' if self._spec.uses_texture_mapping() and
+                                                                          isinstance(socket['data-type'], VectorSocket) and
+                                                                          is_first_vector_socket(socket) else ''))
+
+        return '/* {NodeName}{space}{Suffix} */\n\n' \
+               'NODE_DEFINE({Name}{Suffix}Node)' \
+               '{{' \
+               'NodeType *type = NodeType::add("{name}{suffix}", create, NodeType::SHADER);\n\n' \
+               '{texture_mapping}' \
+               '{sockets}\n\n' \
+               'return type;' \
+               '}}\n\n' \
+               '{Name}{Suffix}Node::{Name}{Suffix}Node() : {Type}Node(node_type)' \
+               '{{' \
+               '}}\n\n' \
+               '{constant_fold}' \
+               '{svm_func}' \
+               'void {Name}{Suffix}Node::compile(OSLCompiler &compiler)' \
+               '{{' \
+               '{tex_mapping_comp_osl}' \
+               '{osl_params}' \
+               'compiler.add(this, "node_{name}{suffix}");' \
+               '}}\n\n'.format(
+            NodeName=self._spec.name_capitalized_spaced,
+            space=' ' if self._spec.type_suffix_abbreviated() != '' else '',
+            Suffix=self._spec.type_suffix().capitalize(),
+            Name=self._spec.name_capitalized_no_space,
+            name=self._spec.name_lower_underscored,
+            suffix='_{suffix}'.format(suffix=self._spec.type_suffix()) if self._spec.type_suffix() else '',
+            texture_mapping='TEXTURE_MAPPING_DEFINE({Name}{Texture}Node);\n\n'.format(
+                Name=self._spec.name_capitalized_no_space,
+                Texture='Texture' if self._spec.is_texture_node() else ''
+            ) if self._spec.uses_texture_mapping() else '',
+            sockets=''.join(socket_defs),
+            Type=self._spec.get_node_type(),
+            constant_fold=self._generate_constant_fold(),
+            svm_func=svm_node_manager.generate_svm_compile_func(),
+            tex_mapping_comp_osl='tex_mapping.compile(compiler);\n\n' if self._spec.uses_texture_mapping() else '',
+            osl_params=''.join('compiler.parameter(this, "{prop}");'.format(prop=prop.name_lower_underscored) for prop in props)
+        )
 
-            f.seek(match.start())
-            f.write(node)
-            f.write('CCL_NAMESPACE_END\n')
-        code_generator_util.apply_clang_formatting(file_path, self._gui.get_source_path())
+    def _add_cycles_node(self):
+        """shader_nodes.cpp"""
+        file_path = path.join(self._spec.get_source_path(), "intern", "cycles", "scene", "shader_nodes.cpp")
+        i = self._source_tree.anchor(file_path, 'cycles_nodes_end')
+        self._source_tree.insert(file_path, i, self._generate_cycles_node(), formatted=True)
 
     def _add_to_node_menu(self):
         """nodeitems_builtins.py"""
-        nodeitems_path = path.join(self._gui.get_source_path(), "release", "scripts", "startup",
+        nodeitems_path = path.join(self._spec.get_source_path(), "release", "scripts", "startup",
                                    "nodeitems_builtins.py")
-        with open(nodeitems_path, 'r+') as f:
-            lines = f.readlines()
-            cat_line_i = 0
-            for i, line in enumerate(lines):
-                if re.search('SH_NEW_' + self._gui.get_node_group().upper(), line):
-                    cat_line_i = i
-                    break
-            else:
-                print("Node Type Not Found")
-
-            for i in range(cat_line_i, len(lines)):
-                if re.search(']\)', lines[i]):
-                    lines.insert(i, '        NodeItem("ShaderNode{0}{1}")\n'.format(
-                        self._gui.type_suffix_abbreviated().capitalize(),
-                        code_generator_util.string_capitalized_no_space(self._gui.get_node_name())))
-                    if lines[i - 1][-2] != ',':
-                        lines[i - 1] = lines[i - 1][:len(lines[i - 1]) - 1] + ',\n'
-                    break
-            else:
-                print("End not found")
-
-            f.seek(0)
-            f.writelines(lines)
-            f.truncate()
-
-    def generate_node(self):
+        i = self._source_tree.anchor(nodeitems_path, 'menu_end:{0}'.format(self._spec.get_node_group().upper()))
+        # The previous item needs a trailing comma
+        text = self._source_tree.read(nodeitems_path)
+        if text[i - 2] != ',':
+            self._source_tree.insert(nodeitems_path, i - 1, ',')
+            i += 1
+        self._source_tree.insert(nodeitems_path, i, '        NodeItem("ShaderNode{0}{1}")\n'.format(
+            self._spec.type_suffix_abbreviated().capitalize(),
+            self._spec.name_capitalized_no_space))
+
+    def required_anchors(self):
+        """(file path, anchor name) of every insertion point the node is written at"""
+        source_path = self._spec.get_source_path()
+        anchors = [
+            (node_ids.file_path(source_path), 'node_ids_end'),
+            (path.join(source_path, "source", "blender", "nodes", "NOD_static_types.h"), 'shader_node_definitions_end'),
+            (path.join(source_path, "intern", "cycles", "scene", "shader_nodes.h"), 'cycles_classes_end'),
+            (path.join(source_path, "intern", "cycles", "blender", "shader.cpp"), 'add_node_cases_end'),
+            (path.join(source_path, "intern", "cycles", "scene", "shader_nodes.cpp"), 'cycles_nodes_end'),
+            (path.join(source_path, "release", "scripts", "startup", "nodeitems_builtins.py"),
+             'menu_end:{0}'.format(self._spec.get_node_group().upper()))]
+        for writer in (SVMWriter, CMakeWriter, DNAWriter, NodeRegisterWriter, RNAWriter, NodeDrawingWriter):
+            anchors.extend(writer(self._spec, self._source_tree).required_anchors())
+        return anchors
+
+    def write_node(self):
+        """Applies every edit required for the node to the source tree, nothing is written to disk"""
+        self._allocate_node_id()
         self._add_to_node_menu()
         self._add_node_type_id()
         self._add_cycles_class()
@@ -347,32 +321,118 @@ class CodeGenerator:
         self._add_node_definition()
         self._add_cycles_node()
 
-        svm_manager = svm_writer.SVMWriter(self._gui)
+        svm_manager = SVMWriter(self._spec, self._source_tree)
         svm_manager.add_svm_shader()
         svm_manager.add_register_svm()
         svm_manager.add_svm_types()
 
-        glsl_manager = GLSLWriter(self._gui)
+        glsl_manager = GLSLWriter(self._spec, self._source_tree)
         glsl_manager.add_glsl_shader()
 
-        cmake_manager = CMakeWriter(self._gui)
+        cmake_manager = CMakeWriter(self._spec, self._source_tree)
         cmake_manager.add_to_cmake()
 
-        node_definition_writer = NodeDefinitionWriter(self._gui)
+        node_definition_writer = NodeDefinitionWriter(self._spec, self._source_tree)
         node_definition_writer.write_node_definition_file()
 
-        osl_writer = OSLWriter(self._gui)
+        osl_writer = OSLWriter(self._spec, self._source_tree)
         osl_writer.write_osl_shader()
 
-        dna_writer = DNAWriter(self._gui)
+        dna_writer = DNAWriter(self._spec, self._source_tree)
         dna_writer.write_dna_node_type()
+        dna_writer.write_shader_defines()
 
-        register_writer = NodeRegisterWriter(self._gui)
+        register_writer = NodeRegisterWriter(self._spec, self._source_tree)
         register_writer.write_call_node_register()
         register_writer.write_node_register()
 
-        rna_writer = RNAWriter(self._gui)
+        rna_writer = RNAWriter(self._spec, self._source_tree)
         rna_writer.write_rna_properties()
 
-        drawing_writer = NodeDrawingWriter(self._gui)
+        drawing_writer = NodeDrawingWriter(self._spec, self._source_tree)
         drawing_writer.write_node_drawing()
+
+    def generate_node(self):
+        node_catalogue.check(self._source_tree, [self._spec])
+        self._source_tree.preflight(self.required_anchors())
+        with render_cache.enabled():
+            self.write_node()
+        self._source_tree.flush()
+
+
+def _update_node(source_tree, spec, entry, node_id):
+    """
+    Rewrites the code of a node which was generated before whose spec was edited, only changed fragments are written
+    :return: manifest records of the nodes code
+    """
+    if entry['group'] != spec.get_node_group():
+        raise Exception("{0}: the node group changed from {1}, remove the node before generating it again".format(
+            spec.get_node_name(), entry['group']))
+    # The node is generated into a scratch tree to render its code, which is then compared with the code in the tree
+    scratch_tree = SourceTree(source_tree.get_source_path(), NullFormatter(), base=source_tree)
+    CodeGenerator(spec, scratch_tree, node_id).write_node()
+    return manifest.update(source_tree, entry['fragments'],
+                           manifest.node_fragments(scratch_tree, scratch_tree.fragments()))
+
+
+def generate_nodes(guis, formatter=None, dry_run=False, targets=False):
+    """
+    Generates code for a batch of nodes
+    Every node is written to a shared source tree so each blender file is read, edited in memory
+    and written once for the whole batch, rather than once per node.
+    Nodes which were generated before are updated instead, only the code which changed for their spec is rewritten
+    :param guis: node specs, all nodes must use the same blender source path
+    :param formatter: optional- formatter applied to the written files, uses blenders clang format by default
+    :param dry_run: optional- nothing is written and the edits are returned as a patch instead, it isn't formatted
+    :param targets: optional- return the written files with the CMake targets they're built by, see build_report
+    :return: paths of the modified files, or the unified diff of every edit for a dry run
+    """
+    if not guis:
+        if dry_run:
+            return ''
+        return build_targets.build_report('', [], []) if targets else []
+    source_paths = set(gui.get_source_path() for gui in guis)
+    if len(source_paths) > 1:
+        raise Exception("All nodes in a batch must use the same source path")
+
+    source_path = source_paths.pop()
+    journal = Journal(source_path)
+    source_tree = SourceTree(source_path, formatter, journal)
+    specs = [NodeSpec.from_gui(gui) for gui in guis]
+    node_manifest = manifest.Manifest(source_path)
+    registry = node_ids.index_text(source_tree.read(node_ids.file_path(source_path)))
+    # Nodes are only updated while they're still in the tree, an undone node is added again
+    updated = [spec for spec in specs if node_manifest.get(node_ids.define_name(spec)) is not None and
+               node_ids.define_name(spec) in registry.names]
+    added = [spec for spec in specs if not any(spec is updated_spec for updated_spec in updated)]
+    # Conflicts are checked and ids allocated for the whole batch first so problems are found before any edits
+    node_catalogue.check(source_tree, added)
+    allocated = registry.allocate([node_ids.define_name(spec) for spec in added])
+    generators = [CodeGenerator(spec, source_tree, allocated[node_ids.define_name(spec)]) for spec in added]
+    source_tree.preflight([anchor for generator in generators for anchor in generator.required_anchors()])
+
+    records = {}
+    # Unchanged nodes reuse the code rendered by earlier generations
+    with render_cache.enabled():
+        for spec in updated:
+            name = node_ids.define_name(spec)
+            records[name] = _update_node(source_tree, spec, node_manifest.get(name), registry.names[name])
+        written_fragments = {}
+        for spec, generator in zip(added, generators):
+            start = len(source_tree.fragments())
+            generator.write_node()
+            written_fragments[node_ids.define_name(spec)] = source_tree.fragments()[start:]
+    # Records are taken once every node is written, as later nodes move the fragments of earlier ones
+    for name, fragments in written_fragments.items():
+        records[name] = manifest.node_fragments(source_tree, fragments)
+    if dry_run:
+        return source_tree.diff()
+    created = [file_path for file_path in source_tree.dirty_files() if not path.exists(file_path)]
+    journal.set_nodes({node_ids.define_name(spec): node_manifest.get(node_ids.define_name(spec)) for spec in specs})
+    written = source_tree.flush()
+    for spec in specs:
+        node_manifest.set(node_ids.define_name(spec), spec.get_node_group(), records[node_ids.define_name(spec)])
+    node_manifest.save()
+    if targets:
+        return build_targets.build_report(source_path, written, created)
+    return written
@@ -0,0 +1,61 @@
+"""
+Command line entry point, generates nodes from spec files without the gui
+python -m code_generation --source-path path/to/blender node_spec.json [more_specs.json ...]
+With --dry-run the changes are printed as a patch which can be applied later with git apply
+With --targets the changed files and the CMake targets they're built by are printed as json
+python -m code_generation --source-path path/to/blender --undo restores the files changed by the last generation
+"""
+import argparse
+import json
+from os import path
+import sys
+
+from code_generation import generate_nodes
+from code_generation.formatter import NullFormatter
+from code_generation.journal import Journal
+from code_generation.spec_loader import load_node_spec
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog='python -m code_generation',
+                                     description='Generates the code for new blender shader nodes')
+    parser.add_argument('specs', nargs='*', help='node spec files')
+    parser.add_argument('--source-path', required=True, help='path of the blender source directory')
+    parser.add_argument('--no-format', action='store_true', help="don't apply clang formatting to changed files")
+    parser.add_argument('--dry-run', action='store_true',
+                        help="print the changes as a unified diff instead of writing them, the diff isn't formatted")
+    parser.add_argument('--targets', action='store_true',
+                        help='print the changed files and the CMake targets they are built by as json')
+    parser.add_argument('--undo', action='store_true', help='restore the files changed by the last generation')
+    parser.add_argument('--force', action='store_true', help='undo even if generated files were edited since')
+    args = parser.parse_args(argv)
+    if not args.specs and not args.undo:
+        parser.error('node spec files are required unless undoing')
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.undo:
+        for file_path in Journal(args.source_path).undo(args.force):
+            print(file_path)
+        return 0
+    specs = [load_node_spec(spec_path, args.source_path) for spec_path in args.specs]
+    if args.dry_run:
+        sys.stdout.write(generate_nodes(specs, dry_run=True))
+        return 0
+    report = generate_nodes(specs, NullFormatter() if args.no_format else None, targets=True)
+    if args.targets:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+    else:
+        for file in report['files']:
+            print(path.join(args.source_path, *file['path'].split('/')))
+    if report['dna_rebuild']:
+        sys.stderr.write('DNA headers changed, DNA is regenerated and most of blender is rebuilt: {0}\n'.format(
+            ', '.join(report['dna_rebuild'])))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,277 @@
+"""
+Insertion points of the blender source files the generator edits
+
+Each file has a scanner which finds every anchor the writers need in one pass over the file.
+Anchors are offsets into the file text where new code is inserted.
+The anchors of unchanged files are cached on disk, keyed by the files path, mtime, size and hash,
+so repeated runs against the same blender tree don't scan the files again
+"""
+import os
+from os import path
+import re
+
+from code_generation import cache, cpp_index, node_ids
+
+# Bump when a scanner changes so stale cache entries aren't used
+ANCHOR_INDEX_VERSION = 5
+CACHE_NAMESPACE = 'anchors'
+# Characters searched at a time by find_last when searching backwards for a pattern
+FIND_LAST_CHUNK_SIZE = 1 << 16
+# Characters past its chunk a match found by find_last may run, the patterns searched match within a line
+FIND_LAST_OVERLAP = 1 << 12
+
+
+def _line_start(text, i):
+    """Offset of the start of the line containing i"""
+    return text.rfind('\n', 0, i) + 1
+
+
+def _line_end(text, i):
+    """Offset just after the newline ending the line containing i"""
+    end = text.find('\n', i)
+    return len(text) if end == -1 else end + 1
+
+
+def find_last(text, pattern, end=None, chunk_size=FIND_LAST_CHUNK_SIZE, overlap=FIND_LAST_OVERLAP):
+    """
+    Last occurrence of pattern in text before end, without copying the text
+    Strings are found with rfind, compiled regular expressions are searched in chunks from the end backwards,
+    so only the tail of the text is searched when the pattern occurs near the end
+    :param overlap: optional- characters past the chunk searched for matches which start in it
+    :return: the match, a (start, end) tuple for strings or None if not found
+    """
+    end = len(text) if end is None else end
+    if isinstance(pattern, str):
+        i = text.rfind(pattern, 0, end)
+        return (i, i + len(pattern)) if i != -1 else None
+
+    boundary = end
+    while boundary > 0:
+        start = max(boundary - chunk_size, 0)
+        # Matches starting in this chunk may straddle its end, later ones were searched by the previous step
+        window_end = min(boundary + overlap, end)
+        matches = [match for match in pattern.finditer(text, start, window_end) if match.start() < boundary]
+        for match in reversed(matches):
+            if match.end() == window_end and window_end < end:
+                # Cut short by the window, matched again against the rest of the text
+                match = pattern.match(text, match.start(), end)
+            if match is not None:
+                return match
+        boundary = start
+    return None
+
+
+def _scan_node_ids(text):
+    """BKE_node.h"""
+    registry = node_ids.index_text(text)
+    # After the last shader node id
+    return {'node_ids_end': registry.block_end} if registry.block_end is not None else {}
+
+
+def _scan_static_types(text):
+    """NOD_static_types.h"""
+    match = find_last(text, 'DefNode(ShaderNode')
+    if match is None:
+        return {}
+    return {'shader_node_definitions_end': _line_end(text, match[0])}
+
+
+def _scan_cycles_classes(text):
+    """shader_nodes.h"""
+    classes = cpp_index.index_text(text).top_level('class')
+    if not classes:
+        return {}
+    # After the blank line following the last class, before the namespace end
+    i = _line_end(text, classes[-1].close)
+    if text.startswith('\n', i):
+        i += 1
+    return {'cycles_classes_end': i}
+
+
+def _scan_cycles_instances(text):
+    """blender/shader.cpp"""
+    add_node = cpp_index.index_text(text).function('add_node')
+    if add_node is None:
+        return {}
+    # After the last else if creating a node
+    cases = [block for block in add_node.children if block.name in ('if', 'else') and 'b_node.is_a(' in block.head]
+    if not cases:
+        return {}
+    return {'add_node_cases_end': _line_end(text, cases[-1].close)}
+
+
+def _scan_cycles_nodes(text):
+    """shader_nodes.cpp"""
+    i = text.find('CCL_NAMESPACE_END\n')
+    return {'cycles_nodes_end': i} if i != -1 else {}
+
+
+def _scan_node_menu(text):
+    """nodeitems_builtins.py, the end of each shader node category"""
+    anchors = {}
+    for match in re.finditer(r'SH_NEW_(\w+)', text):
+        name = 'menu_end:{0}'.format(match.group(1))
+        if name in anchors:
+            continue
+        end = text.find('])', match.end())
+        if end != -1:
+            anchors[name] = _line_start(text, end)
+    return anchors
+
+
+def _scan_svm(text):
+    """svm.h"""
+    anchors = {}
+    i = text.find('\n#ifdef __SHADER_RAYTRACE__\n')
+    if i != -1:
+        # Start of the line before the raytrace includes
+        anchors['svm_includes_end'] = _line_start(text, i)
+    i = text.find('\n    switch (node.x) {\n')
+    if i != -1:
+        anchors['svm_cases_start'] = i + len('\n    switch (node.x) {\n')
+    return anchors
+
+
+def _scan_svm_types(text):
+    """svm/types.h"""
+    i = text.find('\n} ShaderNodeType;\n')
+    if i == -1:
+        return {}
+    return {'shader_node_types_end': i + 1,
+            'shader_node_types_after': i + len('\n} ShaderNodeType;\n')}
+
+
+def _scan_dna(text):
+    """DNA_node_types.h"""
+    anchors = {}
+    match = find_last(text, '} NodeTex')
+    if match is not None:
+        # After the blank line which follows the last texture struct
+        anchors['node_structs_end'] = _line_end(text, match[0]) + 1
+    return anchors
+
+
+_REGISTER_DECLARATION = re.compile(r'^void register_node_type_sh.*void\);$', re.MULTILINE)
+
+
+def _scan_register_declarations(text):
+    """NOD_shader.h"""
+    match = find_last(text, _REGISTER_DECLARATION)
+    if match is None:
+        return {}
+    # Before the end of the extern "C" block, or the end of the file
+    end = find_last(text, '\n#ifdef __cplusplus\n}')
+    return {'register_declarations_end': _line_end(text, match.start()),
+            'shader_defines_end': end[0] + 1 if end is not None and end[0] > match.start() else len(text)}
+
+
+def _scan_register_calls(text):
+    """node.cc"""
+    i = text.find('static void registerShaderNodes()\n')
+    if i == -1:
+        return {}
+    end = text.find('\n}\n', i)
+    return {'register_calls_end': end + 1} if end != -1 else {}
+
+
+def _scan_rna(text):
+    """rna_nodetree.c"""
+    anchors = {}
+    i = text.find('\n/* -- Compositor Nodes ------------------------------------------------------ */\n')
+    if i != -1:
+        anchors['compositor_nodes_start'] = i + 1
+    i = text.find('#ifndef RNA_RUNTIME\n')
+    if i != -1:
+        end = text.find('\n#endif\n', i)
+        if end != -1:
+            anchors['rna_runtime_enums_end'] = end + len('\n#endif\n')
+    return anchors
+
+
+def _scan_node_drawing(text):
+    """drawnode.cc"""
+    index = cpp_index.index_text(text)
+    function = index.function('node_shader_set_butfunc')
+    if function is None:
+        return {}
+    # Start of the line before the function, its comment
+    anchors = {'shader_buttons_end': _line_start(text, max(_line_start(text, function.start) - 1, 0))}
+    switches = index.switches('node_shader_set_butfunc')
+    if switches and switches[-1].cases:
+        # After the last case, before the end of the switch
+        anchors['shader_button_cases_end'] = _line_start(text, switches[-1].close)
+    return anchors
+
+
+def _scan_cmake_svm(text):
+    match = re.search(r'set\(SRC_KERNEL_SVM_HEADERS', text)
+    return {'svm_headers_start': match.end() + 1} if match else {}
+
+
+def _scan_cmake_osl(text):
+    match = re.search(r'set\(SRC_OSL', text)
+    return {'osl_sources_start': match.end() + 1} if match else {}
+
+
+def _scan_cmake_nodes(text):
+    match = re.search(r'set\(SRC\n', text)
+    return {'node_sources_start': match.end()} if match else {}
+
+
+SCANNERS = {
+    'source/blender/blenkernel/BKE_node.h': _scan_node_ids,
+    'source/blender/nodes/NOD_static_types.h': _scan_static_types,
+    'intern/cycles/scene/shader_nodes.h': _scan_cycles_classes,
+    'intern/cycles/blender/shader.cpp': _scan_cycles_instances,
+    'intern/cycles/scene/shader_nodes.cpp': _scan_cycles_nodes,
+    'release/scripts/startup/nodeitems_builtins.py': _scan_node_menu,
+    'intern/cycles/kernel/svm/svm.h': _scan_svm,
+    'intern/cycles/kernel/svm/types.h': _scan_svm_types,
+    'source/blender/makesdna/DNA_node_types.h': _scan_dna,
+    'source/blender/nodes/NOD_shader.h': _scan_register_declarations,
+    'source/blender/blenkernel/intern/node.cc': _scan_register_calls,
+    'source/blender/makesrna/intern/rna_nodetree.c': _scan_rna,
+    'source/blender/editors/space_node/drawnode.cc': _scan_node_drawing,
+    'intern/cycles/kernel/CMakeLists.txt': _scan_cmake_svm,
+    'intern/cycles/kernel/osl/shaders/CMakeLists.txt': _scan_cmake_osl,
+    'source/blender/nodes/shader/CMakeLists.txt': _scan_cmake_nodes,
+}
+
+
+def scan(relative_path, text):
+    """Anchors of the file text, relative path is from the blender source directory using / separators"""
+    scanner = SCANNERS.get(relative_path)
+    return scanner(text) if scanner is not None else {}
+
+
+class AnchorIndex:
+    """Anchors of the source files as they are on disk, cached between runs"""
+
+    def __init__(self, source_path):
+        self._source_path = source_path
+
+    def relative_path(self, file_path):
+        return path.relpath(file_path, self._source_path).replace(os.sep, '/')
+
+    def anchors(self, file_path, text):
+        """
+        Anchors of the file, text must be the files content on disk
+        :return: dict of anchor name to offset
+        """
+        relative_path = self.relative_path(file_path)
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return scan(relative_path, text)
+
+        key = cache.digest(ANCHOR_INDEX_VERSION, path.abspath(file_path))
+        text_hash = cache.digest(text)
+        entry = cache.load(CACHE_NAMESPACE, key)
+        if entry is not None and entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size \
+                and entry['hash'] == text_hash:
+            return entry['anchors']
+
+        anchors = scan(relative_path, text)
+        cache.store(CACHE_NAMESPACE, key, {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'hash': text_hash,
+                                           'anchors': anchors})
+        return anchors
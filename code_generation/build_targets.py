@@ -0,0 +1,88 @@
+"""
+CMake targets the files changed by a generation are built by
+
+A file belongs to the first target defined in the nearest CMakeLists.txt of its directory or the directories above it,
+so a build can be limited to those targets rather than rebuilding all of blender.
+Files which include a changed header are rebuilt by ninja from its own dependency tracking
+"""
+import os
+from os import path
+import re
+
+CMAKE_FILE_NAME = 'CMakeLists.txt'
+# makesdna parses every DNA header, changing one regenerates DNA and rebuilds almost all of blender
+DNA_DIR = 'source/blender/makesdna/'
+
+# Commands defining targets, libraries are preferred as the sources listed in a CMakeLists.txt are usually
+# built into its library, code generators like makesrna are executables defined next to it
+_TARGET_RANKS = {'add_executable': 1, 'add_custom_target': 2}
+_TARGET = re.compile(r'^[ \t]*(blender_add_lib(?:_nolist)?|cycles_add_library|add_library|add_executable|'
+                     r'add_custom_target)\(\s*([\w.-]+)', re.MULTILINE | re.IGNORECASE)
+
+
+def cmake_file_target(text):
+    """
+    Target defined by a CMakeLists.txt, None if there are none
+    Libraries are preferred over executables and executables over custom targets
+    """
+    targets = _TARGET.findall(text)
+    if not targets:
+        return None
+    # min keeps the first of the equally ranked targets
+    return min(targets, key=lambda target: _TARGET_RANKS.get(target[0].lower(), 0))[1]
+
+
+class TargetIndex:
+    """Targets of the files of a blender source directory, each CMakeLists.txt is read once"""
+
+    def __init__(self, source_path):
+        self._source_path = path.abspath(source_path)
+        self._targets = {}  # Directory -> target
+
+    def _directory_target(self, directory):
+        if directory in self._targets:
+            return self._targets[directory]
+        target = None
+        # The source directories own CMakeLists.txt only adds the others, it isn't searched
+        if directory != self._source_path and directory.startswith(self._source_path):
+            try:
+                with open(path.join(directory, CMAKE_FILE_NAME), 'r') as f:
+                    target = cmake_file_target(f.read())
+            except OSError:
+                pass
+            if target is None:
+                target = self._directory_target(path.dirname(directory))
+        self._targets[directory] = target
+        return target
+
+    def target(self, file_path):
+        """Target the file is built by, None if it isn't built by any"""
+        return self._directory_target(path.dirname(path.abspath(file_path)))
+
+
+def forces_dna_rebuild(relative_path):
+    """Whether changing the file regenerates DNA"""
+    return relative_path.startswith(DNA_DIR) and path.basename(relative_path).startswith('DNA_')
+
+
+def build_report(source_path, written, created):
+    """
+    Files changed by a generation and the targets they're built by
+    :param written: paths of the written files
+    :param created: paths of the written files which didn't exist before
+    :return: dict of 'files', list of dicts of the relative path, whether it was created and its target or None,
+    'targets', the targets to build in the order their files were written,
+    and 'dna_rebuild', relative paths of the written files which force DNA to be regenerated
+    """
+    index = TargetIndex(source_path)
+    created = set(path.normpath(file_path) for file_path in created)
+    files = []
+    targets = []
+    for file_path in written:
+        target = index.target(file_path)
+        files.append({'path': path.relpath(file_path, source_path).replace(os.sep, '/'),
+                      'created': path.normpath(file_path) in created, 'target': target})
+        if target is not None and target not in targets:
+            targets.append(target)
+    return {'files': files, 'targets': targets,
+            'dna_rebuild': [file['path'] for file in files if forces_dna_rebuild(file['path'])]}
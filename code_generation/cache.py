@@ -0,0 +1,55 @@
+"""
+On disk cache shared by the generator, stores json values in a cache directory per namespace
+The cache is best effort, unreadable or unwritable entries behave as misses
+"""
+import hashlib
+import json
+import os
+from os import path
+import tempfile
+
+CACHE_DIR_ENV = 'BLENDER_NODE_GENERATOR_CACHE'
+
+
+def cache_dir():
+    """Cache directory, can be overridden with the BLENDER_NODE_GENERATOR_CACHE environment variable"""
+    return os.environ.get(CACHE_DIR_ENV) or path.join(path.expanduser('~'), '.cache', 'blender-node-generator')
+
+
+def digest(*parts):
+    """Hex sha256 digest of the given str/bytes parts"""
+    hasher = hashlib.sha256()
+    for part in parts:
+        hasher.update(part if isinstance(part, bytes) else str(part).encode('utf-8'))
+        hasher.update(b'\0')
+    return hasher.hexdigest()
+
+
+def _entry_path(namespace, key):
+    return path.join(cache_dir(), namespace, '{0}.json'.format(key))
+
+
+def load(namespace, key):
+    """Cached value for the key, None on a miss"""
+    try:
+        with open(_entry_path(namespace, key), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def store(namespace, key, value):
+    """Caches a json serializable value, the entry is replaced atomically so readers never see partial entries"""
+    entry_path = _entry_path(namespace, key)
+    try:
+        os.makedirs(path.dirname(entry_path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=path.dirname(entry_path))
+        try:
+            with open(fd, 'w') as f:
+                json.dump(value, f)
+            os.replace(temp_path, entry_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+    except OSError:
+        pass
@@ -1,7 +1,7 @@
 from os import path
-import re
 
-import code_generation.code_generator_util as code_generator_util
+from code_generation.node_spec import NodeSpec
+from code_generation.source_tree import SourceTree
 
 CMAKE_FILE_NAME = 'CMakeLists.txt'
 
@@ -9,12 +9,14 @@ CMAKE_FILE_NAME = 'CMakeLists.txt'
 class CMakeWriter:
     """Writes new files to Cmake build list"""
 
-    def __init__(self, gui):
-        self._source_path = gui.get_source_path()
-        self._node_name = gui.get_node_name()
-        self._is_texture_node = gui.is_texture_node()
-        self._type_suffix = gui.type_suffix()
-        self._type_suffix_abbreviated = gui.type_suffix_abbreviated()
+    def __init__(self, gui, source_tree=None):
+        self._spec = NodeSpec.from_gui(gui)
+        self._source_path = self._spec.get_source_path()
+        self._source_tree = source_tree if source_tree is not None else SourceTree(self._source_path)
+        self._node_name = self._spec.get_node_name()
+        self._is_texture_node = self._spec.is_texture_node()
+        self._type_suffix = self._spec.type_suffix()
+        self._type_suffix_abbreviated = self._spec.type_suffix_abbreviated()
 
     def _insert_cmake_file_path(self, names_start_i, file_text, new_file_path, names_end_i=None):
         """
@@ -47,61 +49,53 @@ class CMakeWriter:
 
         return file_text[:names_start_i] + '\n'.join(file_paths) + file_text[names_end_i:]
 
+    def required_anchors(self):
+        """(file path, anchor name) of the insertion points used by the writer"""
+        return [(path.join(self._source_path, "intern", "cycles", "kernel", CMAKE_FILE_NAME), 'svm_headers_start'),
+                (path.join(self._source_path, "intern", "cycles", "kernel", "osl", "shaders", CMAKE_FILE_NAME),
+                 'osl_sources_start'),
+                (path.join(self._source_path, "source", "blender", "nodes", "shader", CMAKE_FILE_NAME),
+                 'node_sources_start')]
+
     def _add_svm(self):
         """Adds created svm file to cmake list"""
-        with open(path.join(self._source_path, "intern", "cycles", "kernel", CMAKE_FILE_NAME), 'r+') as f:
-            text = f.read()
-            match = re.search(r'set\(SRC_KERNEL_SVM_HEADERS', text)
-            if not match:
-                raise Exception("Match not found")
-
-            svm_start = match.end() + 1
+        file_path = path.join(self._source_path, "intern", "cycles", "kernel", CMAKE_FILE_NAME)
+        text = self._source_tree.read(file_path)
+        svm_start = self._source_tree.anchor(file_path, 'svm_headers_start')
 
-            svm_file_path = '  svm/{name}.h'.format(
-                name=code_generator_util.string_lower_underscored(self._node_name))
+        svm_file_path = '  svm/{name}.h'.format(
+            name=self._spec.name_lower_underscored)
 
-            text = self._insert_cmake_file_path(svm_start, text, svm_file_path)
+        text = self._insert_cmake_file_path(svm_start, text, svm_file_path)
 
-            f.seek(0)
-            f.write(text)
-            f.truncate()
+        self._source_tree.write(file_path, text)
 
     def _add_osl(self):
-        with open(path.join(self._source_path, "intern", "cycles", "kernel", "osl", "shaders", CMAKE_FILE_NAME), 'r+') as f:
-            text = f.read()
-            match = re.search(r'set\(SRC_OSL', text)
-            if not match:
-                raise Exception("Match not found")
-            osl_start_i = match.end() + 1
+        file_path = path.join(self._source_path, "intern", "cycles", "kernel", "osl", "shaders", CMAKE_FILE_NAME)
+        text = self._source_tree.read(file_path)
+        osl_start_i = self._source_tree.anchor(file_path, 'osl_sources_start')
 
-            osl_path = '  node_{name}{suffix}.osl'.format(
-                name=code_generator_util.string_lower_underscored(self._node_name),
-                suffix='_{suffix}'.format(suffix=self._type_suffix) if self._type_suffix else '')
+        osl_path = '  node_{name}{suffix}.osl'.format(
+            name=self._spec.name_lower_underscored,
+            suffix='_{suffix}'.format(suffix=self._type_suffix) if self._type_suffix else '')
 
-            text = self._insert_cmake_file_path(osl_start_i, text, osl_path)
+        text = self._insert_cmake_file_path(osl_start_i, text, osl_path)
 
-            f.seek(0)
-            f.write(text)
-            f.truncate()
+        self._source_tree.write(file_path, text)
 
     def _add_node(self):
-        with open(path.join(self._source_path, "source", "blender", "nodes", "shader", CMAKE_FILE_NAME), 'r+') as f:
-            text = f.read()
-            match = re.search(r'set\(SRC\n', text)
-            if not match:
-                raise Exception("Match not found")
-            node_start_i = match.end()
-
-            node_path = '  nodes/node_shader_{suff}{name}.cc'.format(
-                suff='{suff}_'.format(suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-                name=code_generator_util.string_lower_underscored(self._node_name)
-            )
-
-            text = self._insert_cmake_file_path(node_start_i, text, node_path)
-
-            f.seek(0)
-            f.write(text)
-            f.truncate()
+        file_path = path.join(self._source_path, "source", "blender", "nodes", "shader", CMAKE_FILE_NAME)
+        text = self._source_tree.read(file_path)
+        node_start_i = self._source_tree.anchor(file_path, 'node_sources_start')
+
+        node_path = '  nodes/node_shader_{suff}{name}.cc'.format(
+            suff=self._spec.suffix_abbreviated_prefix,
+            name=self._spec.name_lower_underscored
+        )
+
+        text = self._insert_cmake_file_path(node_start_i, text, node_path)
+
+        self._source_tree.write(file_path, text)
 
     # def _add_glsl(self):
     #     with open(path.join(self._source_path, "source", "blender", "gpu", CMAKE_FILE_NAME), 'r+') as f:
@@ -1,33 +1,16 @@
-import os
 from os import path, pardir
-import shutil
-import subprocess
+from functools import lru_cache
 from node_types.prop_bool import BoolProp
 
 from node_types.prop_enum import EnumProp
 from node_types.prop_int import IntProp
 
 
-def write_license(fd):
-    """Appends Blender license info to the file specified by the given file descriptor"""
+@lru_cache(maxsize=None)
+def license_text():
+    """Blender license info which is placed at the top of new files"""
     with open(path.join(path.dirname(__file__), pardir, "templates", "license.txt"), 'r') as license_f:
-        shutil.copyfileobj(license_f, fd)
-
-
-def apply_clang_formatting(file_path, source_path):
-    """
-    Applies clang formatting to the given file
-    """
-    lib_dir_name = os.listdir(path.normpath(path.join(source_path, "..", "lib")))[0]
-    clang_format_dir_path = path.normpath(path.join(source_path, "..", "lib", lib_dir_name, "llvm", "bin"))
-    if os.path.exists(clang_format_dir_path):
-        os.chdir(clang_format_dir_path)
-        subprocess.call(["./clang-format", file_path, "-i", "--verbose"])
-    else:
-        raise Exception("Clang format executable not found at {path},"
-                        " make sure the source path is correct and that you have built blender at least once".format(
-            path=clang_format_dir_path
-        ))
+        return license_f.read()
 
 
 def uses_dna(props, node_type):
@@ -53,6 +36,19 @@ def uses_dna(props, node_type):
     return False
 
 
+def bool_prop_values(props):
+    """Bit of each bool prop by name, the value of its SHD_ define"""
+    return {prop['name']: i + 1 for i, prop in enumerate(prop for prop in props if isinstance(prop['data-type'], BoolProp))}
+
+
+def can_constant_fold(node_type, sockets):
+    """Whether the node can have a constant_fold skeleton
+        Nodes whose outputs only depend on their inputs and props can be folded when none of their inputs are linked,
+        closures and textures can't"""
+    return node_type in ['Shader', 'Curves'] and \
+        any(socket['type'] == 'Input' for socket in sockets) and any(socket['type'] == 'Output' for socket in sockets)
+
+
 def dna_padding_size(props):
     """Returns the padding size the dna struct requires
         Requires a padding member if the bytes size of the properties is not a multiple of 8"""
@@ -0,0 +1,229 @@
+"""
+Structure of the C/C++ source files the generator edits
+
+The file is tokenized in one pass, skipping comments, string literals and preprocessor lines so braces inside
+them aren't counted. Every brace pair becomes a scope, classified by the tokens before its opening brace
+as a namespace, class, function, switch or plain block. Switch scopes record their case labels
+and #if/#ifdef/#ifndef blocks are recorded separately.
+Indexes are cached by file text so repeated queries don't tokenize the file again
+"""
+import functools
+import re
+
+_TOKEN = re.compile(r'''
+    (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+   |(?P<string>"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*')
+   |(?P<preprocessor>^[ \t]*\#(?:\\\n|[^\n])*)
+   |(?P<number>\d[\w.]*)
+   |(?P<word>~?[A-Za-z_]\w*(?:::~?[A-Za-z_]\w*)*)
+   |(?P<punct>[{}();:=])
+''', re.MULTILINE | re.DOTALL | re.VERBOSE)
+
+_PREPROCESSOR = re.compile(r'[ \t]*#[ \t]*(\w+)[ \t]*(.*)', re.DOTALL)
+
+CLASS_KEYWORDS = ('class', 'struct', 'union', 'enum')
+CONTROL_KEYWORDS = ('if', 'else', 'for', 'while', 'do', 'try', 'catch')
+LABEL_KEYWORDS = ('case', 'default', 'public', 'private', 'protected')
+# Scopes which don't stop their children being top level
+TRANSPARENT_KINDS = ('namespace', 'extern')
+
+
+class Scope:
+    """A brace pair, start is the offset of the first token before the opening brace"""
+    __slots__ = ('kind', 'name', 'head', 'start', 'open', 'close', 'parent', 'children', 'cases')
+
+    def __init__(self, kind, name, head, start, open_offset, parent):
+        self.kind = kind
+        self.name = name
+        self.head = head
+        self.start = start
+        self.open = open_offset
+        self.close = None
+        self.parent = parent
+        self.children = []
+        self.cases = []  # Offsets of the lines of each case label, switches only
+
+    def is_top_level(self):
+        parent = self.parent
+        while parent is not None:
+            if parent.kind not in TRANSPARENT_KINDS:
+                return False
+            parent = parent.parent
+        return True
+
+    def __repr__(self):
+        return 'Scope({0}, {1!r}, {2}-{3})'.format(self.kind, self.name, self.open, self.close)
+
+
+class PreprocessorBlock:
+    """An #if, #ifdef or #ifndef block, end is the offset after the line of its #endif"""
+    __slots__ = ('directive', 'condition', 'start', 'end')
+
+    def __init__(self, directive, condition, start, end):
+        self.directive = directive
+        self.condition = condition
+        self.start = start
+        self.end = end
+
+    def __repr__(self):
+        return 'PreprocessorBlock(#{0} {1}, {2}-{3})'.format(self.directive, self.condition, self.start, self.end)
+
+
+def _line_start(text, i):
+    return text.rfind('\n', 0, i) + 1
+
+
+def _line_end(text, i):
+    end = text.find('\n', i)
+    return len(text) if end == -1 else end + 1
+
+
+def _classify(head, inside_function):
+    """Kind and name of a scope from the (kind, value) tokens before its opening brace"""
+    words = [value for kind, value in head if kind == 'word']
+    if not words:
+        return 'block', None
+    if inside_function:
+        if words[0] == 'switch':
+            return 'switch', None
+        return 'block', words[0] if words[0] in CONTROL_KEYWORDS else None
+    if words[0] == 'namespace':
+        return 'namespace', words[1] if len(words) > 1 else None
+    if words[0] == 'extern' and len(head) > 1 and head[1][0] == 'string':
+        return 'extern', None
+    if any(kind == 'punct' and value == '=' for kind, value in head):
+        return 'initializer', None
+    first_paren = next((i for i, (kind, value) in enumerate(head) if value == '('), None)
+    if first_paren is None:
+        for i, (kind, value) in enumerate(head):
+            if kind == 'word' and value in CLASS_KEYWORDS:
+                names = [value for kind, value in head[i + 1:]
+                         if kind == 'word' and value not in ('class', 'struct', 'final')]
+                return 'class', names[0] if names else None
+    elif first_paren > 0 and head[first_paren - 1][0] == 'word':
+        return 'function', head[first_paren - 1][1]
+    return 'block', None
+
+
+class CppIndex:
+    """Scopes and preprocessor blocks of a C/C++ file, see index_text"""
+
+    def __init__(self, text):
+        self.scopes = []
+        self.functions = {}
+        self.classes = {}
+        self.namespaces = []
+        self.preprocessor_blocks = []
+        self._switches = {}  # function scope -> its switch scopes
+        self._top_level = {}  # kind -> top level scopes
+        self._build(text)
+
+    def _build(self, text):
+        stack = []
+        conditionals = []
+        head = []
+        head_start = None
+        for match in _TOKEN.finditer(text):
+            kind = match.lastgroup
+            value = match.group()
+            if kind == 'comment':
+                continue
+            if kind == 'preprocessor':
+                self._preprocessor(value, match.start(), _line_end(text, match.end()), conditionals)
+                continue
+            if kind == 'punct' and value == '{':
+                inside_function = any(scope.kind in ('function', 'block', 'switch') for scope in stack)
+                scope_kind, name = _classify(head, inside_function)
+                start = head_start if head_start is not None else match.start()
+                parent = stack[-1] if stack else None
+                scope = Scope(scope_kind, name, text[start:match.start()].strip(), start, match.start(), parent)
+                if parent is not None:
+                    parent.children.append(scope)
+                stack.append(scope)
+                head, head_start = [], None
+            elif kind == 'punct' and value == '}':
+                if stack:
+                    self._close(stack.pop(), match.start())
+                head, head_start = [], None
+            elif kind == 'punct' and value == ';':
+                head, head_start = [], None
+            elif kind == 'punct' and value == ':' and head and head[0][1] in LABEL_KEYWORDS:
+                if head[0][1] in ('case', 'default'):
+                    switch = next((scope for scope in reversed(stack) if scope.kind == 'switch'), None)
+                    if switch is not None:
+                        switch.cases.append(_line_start(text, head_start))
+                head, head_start = [], None
+            else:
+                if head_start is None:
+                    head_start = match.start()
+                head.append((kind, value))
+        self._finish()
+
+    def _close(self, scope, offset):
+        scope.close = offset
+        self.scopes.append(scope)
+        if scope.kind == 'function':
+            self.functions.setdefault(scope.name, scope)
+        elif scope.kind == 'class' and scope.name is not None:
+            self.classes.setdefault(scope.name, scope)
+        elif scope.kind == 'namespace':
+            self.namespaces.append(scope)
+        elif scope.kind == 'switch':
+            function = scope.parent
+            while function is not None and function.kind != 'function':
+                function = function.parent
+            self._switches.setdefault(function, []).append(scope)
+
+    def _preprocessor(self, line, start, end, conditionals):
+        match = _PREPROCESSOR.match(line)
+        if match is None:
+            return
+        directive, condition = match.group(1), match.group(2).strip()
+        if directive in ('if', 'ifdef', 'ifndef'):
+            conditionals.append((directive, condition, start))
+        elif directive == 'endif' and conditionals:
+            directive, condition, block_start = conditionals.pop()
+            self.preprocessor_blocks.append(PreprocessorBlock(directive, condition, block_start, end))
+
+    def _finish(self):
+        for scope in self.scopes:
+            if scope.kind in TRANSPARENT_KINDS or scope.is_top_level():
+                self._top_level.setdefault(scope.kind, []).append(scope)
+        for scopes in list(self._top_level.values()) + list(self._switches.values()):
+            scopes.sort(key=lambda s: s.open)
+        self.preprocessor_blocks.sort(key=lambda b: b.start)
+
+    def function(self, name):
+        """The first definition of the function, None if it isn't defined"""
+        return self.functions.get(name)
+
+    def function_end(self, name):
+        """Offset of the closing brace of the function, None if it isn't defined"""
+        scope = self.function(name)
+        return scope.close if scope is not None else None
+
+    def switches(self, function_name):
+        """Switch statements of the function in source order"""
+        scope = self.function(function_name)
+        return self._switches.get(scope, []) if scope is not None else []
+
+    def last_case(self, function_name):
+        """Offset of the line of the last case label of the functions last switch, None if there is none"""
+        switches = self.switches(function_name)
+        if not switches or not switches[-1].cases:
+            return None
+        return switches[-1].cases[-1]
+
+    def top_level(self, kind):
+        """Scopes of the kind not nested in a function or class, in source order"""
+        return self._top_level.get(kind, [])
+
+    def ifdef(self, condition):
+        """Preprocessor blocks with the condition in source order"""
+        return [block for block in self.preprocessor_blocks if block.condition == condition]
+
+
+@functools.lru_cache(maxsize=32)
+def index_text(text):
+    """The structural index of the C/C++ text, cached so each file is tokenized once"""
+    return CppIndex(text)
@@ -1,94 +1,102 @@
 from os import path
 from collections import defaultdict
-import re
 
 import code_generation.code_generator_util as code_generator_util
+from code_generation import render_cache
+from code_generation.node_spec import NodeSpec
+from code_generation.source_tree import SourceTree
 from node_types.prop_bool import BoolProp
 from node_types.prop_enum import EnumProp
 
 
 class DNAWriter:
     """Writes code related to DNA"""
-    def __init__(self, gui):
-        self._node_name = gui.get_node_name()
-        self._props = gui.get_props()
-        self._source_path = gui.get_source_path()
-        self._node_type = gui.get_node_type()
-        self._type_suffix_abbreviated = gui.type_suffix_abbreviated()
+    def __init__(self, gui, source_tree=None):
+        self._spec = NodeSpec.from_gui(gui)
+        self._node_name = self._spec.get_node_name()
+        self._props = self._spec.get_props()
+        self._source_path = self._spec.get_source_path()
+        self._source_tree = source_tree if source_tree is not None else SourceTree(self._source_path)
+        self._node_type = self._spec.get_node_type()
+        self._type_suffix_abbreviated = self._spec.type_suffix_abbreviated()
         self._is_texture_node = self._node_type == 'Texture'
 
+    @render_cache.rendered
     def _generate_enums(self):
         """Enums used for enum props"""
         return ''.join('enum {{'
                        '{enums}'
                        '}};\n\n'.format(
             enums=''.join('SHD_{NAME}_{OPTION} = {i},'.format(
-                NAME=code_generator_util.string_upper_underscored(self._node_name),
-                OPTION=code_generator_util.string_upper_underscored(option['name']),
+                NAME=self._spec.name_upper_underscored,
+                OPTION=option.name_upper_underscored,
                 i=i + 1
             ) for i, option in enumerate(dropdown['options'])))
                        for dropdown in self._props if isinstance(dropdown['data-type'], EnumProp))
 
+    @render_cache.rendered
     def _generate_macros(self):
         """Macros used for bool props"""
+        values = code_generator_util.bool_prop_values(self._props)
         return ''.join('#define SHD_{NAME}_{BOOL} {i}\n'.format(
-            NAME=code_generator_util.string_upper_underscored(self._node_name),
-            BOOL=code_generator_util.string_upper_underscored(prop['name']),
-            i=i + 1
-        ) for i, prop in enumerate([prop for prop in self._props if isinstance(prop['data-type'], BoolProp)]))
+            NAME=self._spec.name_upper_underscored,
+            BOOL=prop.name_upper_underscored,
+            i=values[prop['name']]
+        ) for prop in self._props if isinstance(prop['data-type'], BoolProp))
+
+    def _uses_defines(self):
+        return any(isinstance(prop['data-type'], (EnumProp, BoolProp)) for prop in self._props)
+
+    def required_anchors(self):
+        """(file path, anchor name) of the insertion points used by the writer"""
+        anchors = []
+        if code_generator_util.uses_dna(self._props, self._node_type):
+            anchors.append((path.join(self._source_path, "source", "blender", "makesdna", "DNA_node_types.h"),
+                            'node_structs_end'))
+        if self._uses_defines():
+            anchors.append((path.join(self._source_path, "source", "blender", "nodes", "NOD_shader.h"),
+                            'shader_defines_end'))
+        return anchors
 
     def write_dna_node_type(self):
         """
-        DNA_node_types.h
+        DNA_node_types.h, only written for nodes with a storage struct
         """
         dna_path = path.join(self._source_path, "source", "blender", "makesdna", "DNA_node_types.h")
-        with open(dna_path, 'r+') as f:
-            text = f.read()
-
-            if code_generator_util.uses_dna(self._props, self._node_type):
-                props = defaultdict(list)
-                for prop in self._props:
-                    prop_name = code_generator_util.string_lower_underscored(prop['name'])
-                    props['int'].append(prop_name)
-                props_definitions = "; ".join(
-                    '{key} {names}'.format(key=key, names=", ".join(names)) for key, names in props.items()) + ";"
-                struct = 'typedef struct Node{Suff}{name} {{{base}{props}{pad}}} Node{Suff}{name};\n\n'.format(
-                    Suff=self._type_suffix_abbreviated.capitalize(),
-                    base='NodeTexBase base;' if self._is_texture_node else '',
-                    name=code_generator_util.string_capitalized_no_space(self._node_name),
-                    props=props_definitions,
-                    pad=' char _pad[{size}];'.format(size=code_generator_util.dna_padding_size(self._props))
-                    if code_generator_util.dna_padding_size(self._props) != 0 else '')
-
-                match = re.search('} NodeTex'[::-1], text[::-1])  # Reversed to find last occurrence
-                if not match:
-                    raise Exception("No match found")
 
-                i = len(text) - match.end()
-                for _ in range(i, len(text)):
-                    if text[i] == '\n':
-                        break
-                    i += 1
-                else:
-                    print("No newline found")
-                text = text[:i + 2] + struct + text[i + 2:]
+        if code_generator_util.uses_dna(self._props, self._node_type):
+            props = defaultdict(list)
+            for prop in self._props:
+                prop_name = prop.name_lower_underscored
+                props['int'].append(prop_name)
+            props_definitions = "; ".join(
+                '{key} {names}'.format(key=key, names=", ".join(names)) for key, names in props.items()) + ";"
+            struct = 'typedef struct Node{Suff}{name} {{{base}{props}{pad}}} Node{Suff}{name};\n\n'.format(
+                Suff=self._type_suffix_abbreviated.capitalize(),
+                base='NodeTexBase base;' if self._is_texture_node else '',
+                name=self._spec.name_capitalized_no_space,
+                props=props_definitions,
+                pad=' char _pad[{size}];'.format(size=code_generator_util.dna_padding_size(self._props))
+                if code_generator_util.dna_padding_size(self._props) != 0 else '')
 
-            if [prop for prop in self._props if isinstance(prop['data-type'], (EnumProp, BoolProp))]:
-                macros = self._generate_macros()
-                defs = '/* {name} */\n' \
-                       '{macros}' \
-                       '{enums}'.format(name=self._node_name.lower(),
-                                        macros='{0}\n'.format(macros) if macros else '',
-                                        enums=self._generate_enums())
+            self._source_tree.insert(dna_path, self._source_tree.anchor(dna_path, 'node_structs_end'), struct,
+                                     formatted=True)
 
-                match = re.search(r'/\* Output shader node \*/', text)
-                if not match:
-                    raise Exception("No match found")
-
-                text = text[:match.start()] + defs + text[match.start():]
-
-            f.seek(0)
-            f.write(text)
-            f.truncate()
+    def write_shader_defines(self):
+        """
+        NOD_shader.h
+        The enum and bool values don't change any struct layout, writing them to DNA_node_types.h
+        would regenerate DNA and rebuild most of blender.
+        makesrna doesn't see NOD_shader.h, RNA uses the values rather than the defines
+        """
+        if self._uses_defines():
+            file_path = path.join(self._source_path, "source", "blender", "nodes", "NOD_shader.h")
+            macros = self._generate_macros()
+            defs = '\n/* {name} */\n' \
+                   '{macros}' \
+                   '{enums}'.format(name=self._node_name.lower(),
+                                    macros='{0}\n'.format(macros) if macros else '',
+                                    enums=self._generate_enums())
 
-        code_generator_util.apply_clang_formatting(dna_path, self._source_path)
+            self._source_tree.insert(file_path, self._source_tree.anchor(file_path, 'shader_defines_end'), defs,
+                                     formatted=True)
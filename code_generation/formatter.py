@@ -0,0 +1,99 @@
+import os
+from os import path
+from functools import lru_cache
+import subprocess
+import threading
+
+CLANG_FORMAT_WORKERS = 4
+
+
+@lru_cache(maxsize=None)
+def clang_format_path(source_path):
+    """
+    Absolute path of the clang format executable bundled with blenders precompiled libraries
+    Resolved once per source path
+    """
+    lib_path = path.abspath(path.join(source_path, "..", "lib"))
+    lib_dir_name = os.listdir(lib_path)[0]
+    clang_format_dir_path = path.join(lib_path, lib_dir_name, "llvm", "bin")
+    if not os.path.exists(clang_format_dir_path):
+        raise Exception("Clang format executable not found at {path},"
+                        " make sure the source path is correct and that you have built blender at least once".format(
+            path=clang_format_dir_path
+        ))
+    return path.join(clang_format_dir_path, "clang-format")
+
+
+class ClangFormatter:
+    """
+    Formats files by running clang format
+    Only absolute paths are passed to the executable and the working directory is never changed,
+    so the formatter can be used from several threads at once
+    """
+
+    def __init__(self, executable, workers=CLANG_FORMAT_WORKERS):
+        self._executable = executable
+        self._workers = workers
+
+    @classmethod
+    def for_source_path(cls, source_path):
+        """Formatter using the clang format executable which comes with the blender libraries"""
+        return cls(clang_format_path(source_path))
+
+    def commands(self, file_paths, line_ranges=None):
+        """
+        Clang format command lines which format the given files
+        Files without line ranges are formatted entirely in a single call,
+        clang format only accepts line ranges for a single file so the others are formatted one call per file
+        """
+        line_ranges = line_ranges or {}
+        whole_files = [path.abspath(file_path) for file_path in file_paths if not line_ranges.get(file_path)]
+        commands = [[self._executable, "-i"] + whole_files] if whole_files else []
+        for file_path in file_paths:
+            if line_ranges.get(file_path):
+                commands.append([self._executable, "-i"] +
+                                ["--lines={0}:{1}".format(first, last) for first, last in line_ranges[file_path]] +
+                                [path.abspath(file_path)])
+        return commands
+
+    def format(self, file_paths, line_ranges=None):
+        """
+        Formats the given files in place
+        :param line_ranges: optional- dict of file path to 1 based inclusive (first, last) line ranges to format
+        """
+        # Imported here as concurrent.futures is slow to import and isn't needed unless files are formatted
+        from concurrent.futures import ThreadPoolExecutor
+
+        commands = self.commands(file_paths, line_ranges)
+        with ThreadPoolExecutor(max_workers=self._workers) as executor:
+            list(executor.map(subprocess.call, commands))
+
+
+class LazyClangFormatter:
+    """Clang formatter which only looks for the executable once there are files to format"""
+
+    def __init__(self, source_path):
+        self._source_path = source_path
+
+    def format(self, file_paths, line_ranges=None):
+        if file_paths:
+            ClangFormatter.for_source_path(self._source_path).format(file_paths, line_ranges)
+
+
+class RecordingFormatter:
+    """Stub formatter which records the files it was asked to format without changing them"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = []
+
+    def format(self, file_paths, line_ranges=None):
+        with self._lock:
+            self.calls.append((list(file_paths), dict(line_ranges or {})))
+
+
+class NullFormatter:
+    """Formatter which leaves files unchanged"""
+
+    def format(self, file_paths, line_ranges=None):
+        pass
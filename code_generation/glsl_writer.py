@@ -2,6 +2,9 @@ from itertools import chain
 from os import path
 
 import code_generation.code_generator_util as code_generator_util
+from code_generation import render_cache
+from code_generation.node_spec import NodeSpec
+from code_generation.source_tree import SourceTree
 from node_types.prop_bool import BoolProp
 from node_types.prop_enum import EnumProp
 from node_types.prop_int import IntProp
@@ -13,16 +16,18 @@ class GLSLWriter:
     Keeps GLSL parameters consistent between files
     """
 
-    def __init__(self, gui):
-        self._props = gui.get_props()
-        self._node_name = gui.get_node_name()
-        self._is_texture_node = gui.get_node_type() == 'Texture'
-        self._type_suffix_abbreviated = gui.type_suffix_abbreviated()
-        self._uses_texture_mapping = gui.uses_texture_mapping()
-        self._node_type = gui.get_node_type()
+    def __init__(self, gui, source_tree=None):
+        self._spec = NodeSpec.from_gui(gui)
+        self._props = self._spec.get_props()
+        self._node_name = self._spec.get_node_name()
+        self._is_texture_node = self._spec.get_node_type() == 'Texture'
+        self._type_suffix_abbreviated = self._spec.type_suffix_abbreviated()
+        self._uses_texture_mapping = self._spec.uses_texture_mapping()
+        self._node_type = self._spec.get_node_type()
         self._dropdowns = list(filter(lambda p: isinstance(p['data-type'], EnumProp), self._props))
-        self._sockets = gui.get_node_sockets()
-        self._source_path = gui.get_source_path()
+        self._sockets = self._spec.get_node_sockets()
+        self._source_path = self._spec.get_source_path()
+        self._source_tree = source_tree if source_tree is not None else SourceTree(self._source_path)
 
     def _dropdowns_count(self):
         return len(self._dropdowns)
@@ -32,7 +37,7 @@ class GLSLWriter:
 
     def _generate_shader_func_names(self):
         func_name = '"node_{name}_{options}"'.format(
-            name=code_generator_util.string_lower_underscored(self._node_name),
+            name=self._spec.name_lower_underscored,
             options='{options}'
         )
 
@@ -41,7 +46,7 @@ class GLSLWriter:
         elif self._dropdowns_count() == 1:
             return [func_name.format(
                 name=self._node_name,
-                options=code_generator_util.string_lower_underscored(option['name'])
+                options=option.name_lower_underscored
             ) for option in self._get_dropdowns()[0]['options']]
         elif self._dropdowns_count() == 2:
             return [
@@ -69,8 +74,8 @@ class GLSLWriter:
                               '"",'
                               '{names},'
                               '}},'.format(enum='SHD_{NODE_NAME}_{OPTION}'.format(
-                    NODE_NAME=code_generator_util.string_upper_underscored(self._node_name),
-                    OPTION=code_generator_util.string_upper_underscored(option['name'])
+                    NODE_NAME=self._spec.name_upper_underscored,
+                    OPTION=option.name_upper_underscored
                 ),
                     names=','.join(names)) for names, option in
                               zip(self._generate_shader_func_names(), self._get_dropdowns()[0]['options']))
@@ -85,7 +90,7 @@ class GLSLWriter:
             if code_generator_util.uses_dna(self._props, self._node_type):
                 assertions.append('BLI_assert({struct}->{prop} >= 0 && {struct}->{prop} < {option_count});'.format(
                     struct='tex' if self._is_texture_node else 'attr',
-                    prop=code_generator_util.string_lower_underscored(prop['name']),
+                    prop=prop.name_lower_underscored,
                     option_count=len(prop['options']) + 1))
             else:
                 assertions.append('BLI_assert(node->custom{i} >= 0 && node->custom{i} < {option_count});'.format(
@@ -104,11 +109,11 @@ class GLSLWriter:
             struct = 'tex' if self._is_texture_node else 'attr'
             retrieved_props.append('Node{Suff}{Name} *{struct} = (Node{Suff}{Name} *)node->storage;'.format(
                 Suff=self._type_suffix_abbreviated.capitalize(),
-                Name=code_generator_util.string_capitalized_no_space(self._node_name),
+                Name=self._spec.name_capitalized_no_space,
                 struct=struct
             ))
             for prop in self._props:
-                prop_name = code_generator_util.string_lower_underscored(prop['name'])
+                prop_name = prop.name_lower_underscored
                 if isinstance(prop['data-type'], BoolProp):
                     retrieved_props.append('float {name} = ({struct}->{name}) ? 1.0f : 0.0f;'.format(
                         name=prop_name,
@@ -123,7 +128,7 @@ class GLSLWriter:
             f_custom_i = 3
             boolean_bit = 0
             for prop in self._props:
-                prop_name = code_generator_util.string_lower_underscored(prop['name'])
+                prop_name = prop.name_lower_underscored
                 if isinstance(prop['data-type'], BoolProp):
                     # Need to get individual bits if multiple bools
                     if len([prop for prop in self._props if isinstance(prop['data-type'], BoolProp)]) > 1:
@@ -152,13 +157,13 @@ class GLSLWriter:
     def _generate_get_function_name(self):
         if self._dropdowns_count() == 0:
             return '"node_{name}"'.format(
-                name=code_generator_util.string_lower_underscored(self._node_name)
+                name=self._spec.name_lower_underscored
             )
         elif self._dropdowns_count() == 1:
             if code_generator_util.uses_dna(self._props, self._node_type):
                 return 'names[{struct}->{name}]'.format(
                     struct='tex' if self._is_texture_node else 'attr',
-                    name=code_generator_util.string_lower_underscored(self._get_dropdowns()[0]['name'])
+                    name=self._get_dropdowns()[0].name_lower_underscored
                 )
             else:
                 return 'names[node->custom1]'
@@ -166,8 +171,8 @@ class GLSLWriter:
             if code_generator_util.uses_dna(self._props, self._node_type):
                 return 'names[{struct}->{drop1}][{struct}->{drop2}]'.format(
                     struct='tex' if self._is_texture_node else 'attr',
-                    drop1=code_generator_util.string_lower_underscored(self._get_dropdowns()[0]['name']),
-                    drop2=code_generator_util.string_lower_underscored(self._get_dropdowns()[1]['name'])
+                    drop1=self._get_dropdowns()[0].name_lower_underscored,
+                    drop2=self._get_dropdowns()[1].name_lower_underscored
                 )
             else:
                 return 'names[node->custom1][node->custom2]'
@@ -180,7 +185,7 @@ class GLSLWriter:
         Most commonly properties
         """
         return ['GPU_constant(&{prop})'.format(
-            prop=code_generator_util.string_lower_underscored(prop['name'])) for prop in
+            prop=prop.name_lower_underscored) for prop in
             list(filter(lambda p: not isinstance(p['data-type'], EnumProp), self._props))]
 
     def _generate_return_statement(self):
@@ -191,6 +196,7 @@ class GLSLWriter:
             other_params=', {params}'.format(params=', '.join(additional_params)) if len(additional_params) > 0 else ''
         )
 
+    @render_cache.rendered
     def generate_gpu_func(self):
         """gpu func in node_shader_*.c"""
         gpu_text = 'static int gpu_shader_{suff}{name}(GPUMaterial *mat,' \
@@ -204,8 +210,8 @@ class GLSLWriter:
                    '{dna}' \
                    '{return_statement}' \
                    '}};\n\n'.format(
-            suff='{suff}_'.format(suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-            name=code_generator_util.string_lower_underscored(self._node_name),
+            suff=self._spec.suffix_abbreviated_prefix,
+            name=self._spec.name_lower_underscored,
             texture_mapping='node_shader_gpu_default_tex_coord(mat, '
                             'node, &in[0].link);'
                             'node_shader_gpu_tex_mapping(mat, node, in, out);'
@@ -216,6 +222,7 @@ class GLSLWriter:
             other_params=''.join(self._generate_additional_params()))
         return gpu_text
 
+    @render_cache.rendered
     def _generate_glsl_shader(self):
         if self._dropdowns_count() > 2:
             return '// glsl functions'
@@ -224,13 +231,13 @@ class GLSLWriter:
             type=param['data-type'].glsl_name,
             out='out ' if 'type' in param and param['type'] == 'Output' else '',
             # Must check if 'type' is a key since props don't have 'type' key
-            name=code_generator_util.string_lower_underscored(param['name']))
+            name=param.name_lower_underscored)
                           for param in
                           [prop for prop in self._props if not isinstance(prop['data-type'], EnumProp)] +
                           [socket for socket in self._sockets])
         if self._dropdowns_count() == 0:
             return 'void node_{name}({params}){{}}'.format(
-                name=code_generator_util.string_lower_underscored(self._node_name),
+                name=self._spec.name_lower_underscored,
                 params=params
             )
         else:
@@ -246,10 +253,7 @@ class GLSLWriter:
     def add_glsl_shader(self):
         file_path = path.join(self._source_path, "source", "blender", "gpu", "shaders", "material",
                               "gpu_shader_material_{suff}{name}.glsl".format(
-                                  suff='{suff}_'.format(
-                                      suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-                                  name=code_generator_util.string_lower_underscored(self._node_name)
+                                  suff=self._spec.suffix_abbreviated_prefix,
+                                  name=self._spec.name_lower_underscored
                               ))
-        with open(file_path, 'w') as f:
-            f.write('{0}\n'.format(self._generate_glsl_shader()))
-        code_generator_util.apply_clang_formatting(file_path, self._source_path)
+        self._source_tree.write(file_path, '{0}\n'.format(self._generate_glsl_shader()), formatted=True)
@@ -0,0 +1,171 @@
+"""
+Rollback journal of the files changed by the generator
+
+Before a flush replaces any file, every file it modifies is backed up and every file it creates is recorded,
+so undo restores exactly those files instead of resetting the whole blender tree.
+Journals are kept per source path in the cache directory, each flush adds an entry and undo removes the latest.
+Only the latest JOURNAL_SIZE entries are kept, older ones are removed once a flush completes.
+Entries also hold the manifest entries the generation replaced, see manifest.py, so undo restores them with the files
+An entry is written before any file is replaced, so a flush which fails part way can still be undone
+"""
+import hashlib
+import json
+import os
+from os import path
+import shutil
+import tempfile
+
+from code_generation import cache, manifest
+
+JOURNAL_DIR_NAME = 'journal'
+MANIFEST_NAME = 'manifest.json'
+# Generations which can be undone, each entry holds copies of the files it changed
+JOURNAL_SIZE = 10
+
+
+def _file_hash(file_path):
+    with open(file_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+class Journal:
+    """Journal of the generations in a blender source directory"""
+
+    def __init__(self, source_path, size=JOURNAL_SIZE):
+        """
+        :param size: optional- no. of entries kept
+        """
+        self._source_path = source_path
+        self._size = size
+        self._nodes = {}
+        self._root = path.join(cache.cache_dir(), JOURNAL_DIR_NAME, cache.digest(path.abspath(source_path)))
+
+    def _relative_path(self, file_path):
+        return path.relpath(file_path, self._source_path).replace(os.sep, '/')
+
+    def _absolute_path(self, relative_path):
+        return path.join(self._source_path, *relative_path.split('/'))
+
+    def entries(self):
+        """Paths of the complete journal entries, oldest first"""
+        try:
+            names = sorted(name for name in os.listdir(self._root) if name.isdigit())
+        except OSError:
+            return []
+        return [path.join(self._root, name) for name in names
+                if path.exists(path.join(self._root, name, MANIFEST_NAME))]
+
+    def _write_manifest(self, entry, files, nodes):
+        with open(path.join(entry, MANIFEST_NAME), 'w') as f:
+            json.dump({'files': files, 'nodes': nodes}, f)
+
+    def _read_entry(self, entry):
+        with open(path.join(entry, MANIFEST_NAME), 'r') as f:
+            return json.load(f)
+
+    def _read_manifest(self, entry):
+        return self._read_entry(entry)['files']
+
+    def set_nodes(self, nodes):
+        """
+        Manifest entries of the nodes the next recorded generation changes, restored when it's undone
+        :param nodes: dict of the nodes define name to its manifest entry before the generation, None if it had none
+        """
+        self._nodes = dict(nodes)
+
+    def record(self, file_paths):
+        """
+        Backs up the files which are about to be written, must be called before any of them are replaced
+        :return: the journal entry
+        """
+        os.makedirs(self._root, exist_ok=True)
+        numbers = [int(name) for name in os.listdir(self._root) if name.isdigit()]
+        entry = path.join(self._root, '{0:06d}'.format(max(numbers, default=0) + 1))
+        os.makedirs(entry)
+        files = []
+        for i, file_path in enumerate(file_paths):
+            backup = None
+            if path.exists(file_path):
+                backup = str(i)
+                shutil.copy2(file_path, path.join(entry, backup))
+            files.append({'path': self._relative_path(file_path), 'backup': backup, 'hash': None})
+        # The entry is only valid once the manifest exists
+        self._write_manifest(entry, files, self._nodes)
+        return entry
+
+    def complete(self, entry):
+        """Records the hashes of the generated files, so undo can tell whether they were edited since"""
+        data = self._read_entry(entry)
+        files = data['files']
+        for file in files:
+            file_path = self._absolute_path(file['path'])
+            file['hash'] = _file_hash(file_path) if path.exists(file_path) else None
+        self._write_manifest(entry, files, data.get('nodes', {}))
+        self.prune()
+
+    def prune(self):
+        """
+        Removes the entries older than the latest size entries, with any older entries left incomplete
+        :return: paths of the removed entries
+        """
+        try:
+            names = sorted(name for name in os.listdir(self._root) if name.isdigit())
+        except OSError:
+            return []
+        entries = self.entries()
+        if len(entries) <= self._size:
+            return []
+        oldest_kept = path.basename(entries[-self._size]) if self._size > 0 else None
+        removed = [path.join(self._root, name) for name in names if oldest_kept is None or name < oldest_kept]
+        for entry in removed:
+            shutil.rmtree(entry, ignore_errors=True)
+        return removed
+
+    def modified_files(self, entry):
+        """Paths of the files which changed since the entry was completed"""
+        modified = []
+        for file in self._read_manifest(entry):
+            file_path = self._absolute_path(file['path'])
+            if file['hash'] is not None and (not path.exists(file_path) or _file_hash(file_path) != file['hash']):
+                modified.append(file_path)
+        return modified
+
+    def undo(self, force=False):
+        """
+        Restores the files changed by the latest generation and removes its entry
+        :param force: optional- restore files even if they were edited after they were generated
+        :return: paths of the restored files
+        """
+        entries = self.entries()
+        if not entries:
+            raise Exception("Nothing to undo in {0}".format(self._source_path))
+        entry = entries[-1]
+        modified = self.modified_files(entry)
+        if modified and not force:
+            raise Exception("Files were edited after they were generated, undo with force to discard the edits:\n  "
+                            "{0}".format('\n  '.join(modified)))
+
+        restored = []
+        for file in self._read_manifest(entry):
+            file_path = self._absolute_path(file['path'])
+            if file['backup'] is not None:
+                fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=path.dirname(file_path))
+                os.close(fd)
+                try:
+                    shutil.copy2(path.join(entry, file['backup']), temp_path)
+                    os.replace(temp_path, file_path)
+                except BaseException:
+                    os.remove(temp_path)
+                    raise
+            elif path.exists(file_path):
+                os.remove(file_path)
+            restored.append(file_path)
+        nodes = self._read_entry(entry).get('nodes', {})
+        if nodes:
+            # The nodes are updated from their code as it was before the undone generation
+            node_manifest = manifest.Manifest(self._source_path)
+            for name, node in nodes.items():
+                node_manifest.restore(name, node)
+            node_manifest.save()
+        shutil.rmtree(entry)
+        return restored
@@ -0,0 +1,146 @@
+"""
+Manifest of the code generated for each node
+
+Every fragment of code inserted at an anchor and every file created for a node is recorded with its file, anchor,
+range and hash. When a node which was generated before is generated again from an edited spec, only the fragments
+whose code changed are rewritten, so files with unchanged code keep their modification times and aren't rebuilt.
+Fragments are found again by their text ignoring whitespace, as clang format only changes the whitespace
+and code added to the file since moves them
+"""
+import hashlib
+import os
+from os import path
+import re
+
+from code_generation import cache
+
+# Bump when the manifest format changes so stale manifests aren't used
+MANIFEST_VERSION = 1
+CACHE_NAMESPACE = 'manifests'
+
+
+def fragment_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def locate(text, fragment, hint=0):
+    """
+    Range of the fragment in the text ignoring whitespace, the match closest to the hint is used
+    :param hint: optional- offset the fragment was last written at
+    :return: (start, end) including the fragments leading and trailing whitespace, None if it isn't found
+    """
+    chars = [re.escape(char) for char in fragment if not char.isspace()]
+    if not chars:
+        return None
+    matches = list(re.finditer(r'\s*'.join(chars), text))
+    if not matches:
+        return None
+    start, end = min(matches, key=lambda match: abs(match.start() - hint)).span()
+    leading = len(fragment) - len(fragment.lstrip())
+    while leading and start > 0 and text[start - 1].isspace():
+        start -= 1
+        leading -= 1
+    trailing = len(fragment) - len(fragment.rstrip())
+    while trailing and end < len(text) and text[end].isspace():
+        end += 1
+        trailing -= 1
+    return start, end
+
+
+def node_fragments(source_tree, fragments):
+    """
+    Manifest records of fragments written to the tree, see SourceTree.fragments
+    Inserts which aren't at an anchor are left out, they only depend on the nodes name and group
+    """
+    records = []
+    for fragment in fragments:
+        if fragment['kind'] == 'insert' and fragment['anchor'] is None:
+            continue
+        records.append({'file': path.relpath(fragment['file'], source_tree.get_source_path()).replace(os.sep, '/'),
+                        'kind': fragment['kind'], 'anchor': fragment['anchor'], 'start': fragment['start'],
+                        'end': fragment['end'], 'hash': fragment_hash(fragment['text']), 'text': fragment['text'],
+                        'formatted': fragment['formatted']})
+    return records
+
+
+def _keyed(records):
+    """Records by file, kind, anchor and their order at the anchor"""
+    keyed = {}
+    for record in records:
+        key = (record['file'], record['kind'], record['anchor'])
+        i = 0
+        while key + (i,) in keyed:
+            i += 1
+        keyed[key + (i,)] = record
+    return keyed
+
+
+def update(source_tree, old_records, new_records):
+    """
+    Rewrites the fragments of a node whose code changed, unchanged fragments aren't touched
+    Every changed fragment is found before the tree is edited, code edited by hand since it was generated fails
+    :param old_records: records of the code in the tree
+    :param new_records: records of the code generated for the edited node
+    :return: records of the nodes code once the tree is updated
+    """
+    old = _keyed(old_records)
+    new = _keyed(new_records)
+
+    def file_path(record):
+        return path.join(source_tree.get_source_path(), *record['file'].split('/'))
+
+    def unchanged(key):
+        return key in old and key in new and old[key]['hash'] == new[key]['hash']
+
+    replaced = []
+    errors = []
+    for key, record in old.items():
+        if record['kind'] != 'insert' or unchanged(key):
+            continue
+        found = locate(source_tree.read(file_path(record)), record['text'], record['start'])
+        if found is None:
+            errors.append('{0}: code inserted at {1} not found'.format(record['file'], record['anchor']))
+        else:
+            replaced.append((file_path(record), found, new.get(key)))
+    if errors:
+        raise Exception("Generated code was edited, the node can't be updated:\n  {errors}".format(
+            errors='\n  '.join(errors)))
+
+    # Later fragments of a file are replaced first, so the offsets found for earlier ones stay valid
+    for record_path, (start, end), record in sorted(replaced, key=lambda item: (item[0], item[1]), reverse=True):
+        source_tree.replace(record_path, start, end, record['text'] if record is not None else '',
+                            formatted=record is not None and record['formatted'])
+    for key, record in new.items():
+        if unchanged(key):
+            continue
+        if record['kind'] == 'file':
+            source_tree.write(file_path(record), record['text'], formatted=record['formatted'])
+        elif key not in old:
+            source_tree.insert(file_path(record), source_tree.anchor(file_path(record), record['anchor']),
+                               record['text'], formatted=record['formatted'])
+    return [old[key] if unchanged(key) else record for key, record in new.items()]
+
+
+class Manifest:
+    """Code generated for the nodes of a blender source directory, by the nodes type id define name"""
+
+    def __init__(self, source_path):
+        self._key = cache.digest(MANIFEST_VERSION, path.abspath(source_path))
+        self._nodes = cache.load(CACHE_NAMESPACE, self._key) or {}
+
+    def get(self, name):
+        """The nodes entry of group and fragment records, None if it wasn't generated"""
+        return self._nodes.get(name)
+
+    def set(self, name, group, records):
+        self._nodes[name] = {'group': group, 'fragments': records}
+
+    def restore(self, name, entry):
+        """Puts back an entry returned by get, None removes the nodes entry"""
+        if entry is None:
+            self._nodes.pop(name, None)
+        else:
+            self._nodes[name] = entry
+
+    def save(self):
+        cache.store(CACHE_NAMESPACE, self._key, self._nodes)
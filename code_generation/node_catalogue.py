@@ -0,0 +1,125 @@
+"""
+Catalogue of the shader nodes which already exist in the blender source tree
+
+Built in one pass over NOD_static_types.h, NOD_shader.h, shader_nodes.h and the svm and osl shader directories.
+The names parsed from the headers are cached on disk and only parsed again when one of them changes,
+so checking a batch of specs for conflicts doesn't read the headers again. Directories are listed every time
+"""
+import os
+from os import path
+import re
+
+from code_generation import cache, node_ids
+
+# Bump when the catalogue contents change so stale cache entries aren't used
+CATALOGUE_VERSION = 1
+CACHE_NAMESPACE = 'catalogue'
+
+STATIC_TYPES_PATH = ("source", "blender", "nodes", "NOD_static_types.h")
+SHADER_HEADER_PATH = ("source", "blender", "nodes", "NOD_shader.h")
+CYCLES_CLASSES_PATH = ("intern", "cycles", "scene", "shader_nodes.h")
+SVM_DIR_PATH = ("intern", "cycles", "kernel", "svm")
+OSL_DIR_PATH = ("intern", "cycles", "kernel", "osl", "shaders")
+
+CATEGORIES = {'rna': 'RNA struct', 'define': 'type define', 'register': 'register function',
+              'class': 'cycles class', 'svm': 'SVM header', 'osl': 'OSL shader'}
+
+_DEF_NODE = re.compile(r'^DefNode\(\s*ShaderNode\s*,\s*(\w+)\s*,[^,]*,\s*"[^"]*"\s*,\s*(\w+)', re.MULTILINE)
+_REGISTER = re.compile(r'^void (register_node_type_sh_\w+)\(void\);', re.MULTILINE)
+_CLASS = re.compile(r'^class (\w+)', re.MULTILINE)
+
+
+def node_names(spec):
+    """Names of the structs, functions and files which are generated for the node, by category"""
+    type_suffix = spec.type_suffix()
+    return {
+        'rna': 'ShaderNode{0}{1}'.format(spec.type_suffix_abbreviated().capitalize(), spec.name_capitalized_no_space),
+        'define': node_ids.define_name(spec),
+        'register': 'register_node_type_sh_{0}{1}'.format(spec.suffix_abbreviated_prefix, spec.name_lower_underscored),
+        'class': '{0}{1}Node'.format(spec.name_capitalized_no_space, type_suffix.capitalize()),
+        'svm': '{0}.h'.format(spec.name_lower_underscored),
+        'osl': 'node_{0}{1}.osl'.format(spec.name_lower_underscored, '_' + type_suffix if type_suffix else ''),
+    }
+
+
+def _list_dir(dir_path, extension):
+    try:
+        return [name for name in os.listdir(dir_path) if name.endswith(extension)]
+    except OSError:
+        return []
+
+
+class NodeCatalogue:
+    """Names of the existing shader nodes by category, see node_names"""
+
+    def __init__(self, source_tree):
+        self._source_tree = source_tree
+        self._source_path = source_tree.get_source_path()
+        self.names = self._load()
+
+    def _path(self, parts):
+        return path.join(self._source_path, *parts)
+
+    def _fingerprint(self):
+        """mtime and size of each catalogued header"""
+        fingerprint = []
+        for parts in (STATIC_TYPES_PATH, SHADER_HEADER_PATH, CYCLES_CLASSES_PATH):
+            try:
+                stat = os.stat(self._path(parts))
+                fingerprint.append([stat.st_mtime_ns, stat.st_size])
+            except OSError:
+                fingerprint.append(None)
+        return fingerprint
+
+    def _read(self, parts):
+        try:
+            return self._source_tree.read(self._path(parts))
+        except OSError:
+            return ''
+
+    def _scan(self):
+        """Names declared in the headers"""
+        names = {'define': [], 'rna': []}
+        for match in _DEF_NODE.finditer(self._read(STATIC_TYPES_PATH)):
+            names['define'].append(match.group(1))
+            names['rna'].append('ShaderNode' + match.group(2))
+        names['register'] = _REGISTER.findall(self._read(SHADER_HEADER_PATH))
+        names['class'] = _CLASS.findall(self._read(CYCLES_CLASSES_PATH))
+        return names
+
+    def _load(self):
+        key = cache.digest(CATALOGUE_VERSION, path.abspath(self._source_path))
+        fingerprint = self._fingerprint()
+        entry = cache.load(CACHE_NAMESPACE, key)
+        if entry is not None and entry['fingerprint'] == fingerprint:
+            names = entry['names']
+        else:
+            names = self._scan()
+            cache.store(CACHE_NAMESPACE, key, {'fingerprint': fingerprint, 'names': names})
+        names = dict(names, svm=_list_dir(self._path(SVM_DIR_PATH), '.h'),
+                     osl=_list_dir(self._path(OSL_DIR_PATH), '.osl'))
+        return {category: set(names[category]) for category in CATEGORIES}
+
+    def contains(self, category, name):
+        return name in self.names[category]
+
+    def conflicts(self, spec):
+        """Descriptions of every generated name of the node which already exists"""
+        return ['{0} {1} already exists'.format(CATEGORIES[category], name)
+                for category, name in node_names(spec).items() if self.contains(category, name)]
+
+
+def check(source_tree, specs):
+    """Raises if any of the nodes conflict with existing nodes or each other, every conflict is reported at once"""
+    catalogue = NodeCatalogue(source_tree)
+    errors = []
+    generated = {}
+    for spec in specs:
+        errors.extend('{0}: {1}'.format(spec.get_node_name(), conflict) for conflict in catalogue.conflicts(spec))
+        for category, name in node_names(spec).items():
+            if (category, name) in generated:
+                errors.append('{0}: {1} {2} is also generated by {3}'.format(
+                    spec.get_node_name(), CATEGORIES[category], name, generated[(category, name)]))
+            generated.setdefault((category, name), spec.get_node_name())
+    if errors:
+        raise Exception("Node name conflicts:\n  {errors}".format(errors='\n  '.join(errors)))
@@ -1,5 +1,4 @@
 from os import path
-from sys import flags
 from node_types.prop_bool import BoolProp
 from node_types.prop_enum import EnumProp
 from node_types.prop_int import IntProp
@@ -9,30 +8,34 @@ from node_types.socket_vector import VectorSocket
 from node_types.socket_color import ColorSocket
 
 import code_generation.code_generator_util as code_generator_util
+from code_generation import render_cache
 from code_generation.glsl_writer import GLSLWriter
 from code_generation.node_register_writer import NodeRegisterWriter
+from code_generation.node_spec import NodeSpec
+from code_generation.source_tree import SourceTree
 
 
 class NodeDefinitionWriter:
     """Writes node_shader_*.c"""
-    def __init__(self, gui):
-        self._node_register_writer = NodeRegisterWriter(gui)
-        self._glsl_writer = GLSLWriter(gui)
-        self._node_sockets = gui.get_node_sockets()
-        self._type_suffix_abbreviated = gui.type_suffix_abbreviated()
-        self._node_name = gui.get_node_name()
-        self._node_has_properties = gui.node_has_properties()
-        self._props = gui.get_props()
-        self._node_type = gui.get_node_type()
-        self._is_texture_node = gui.is_texture_node()
-        self._uses_texture_mapping = gui.uses_texture_mapping()
-        self._source_path = gui.get_source_path()
+    def __init__(self, gui, source_tree=None):
+        self._spec = NodeSpec.from_gui(gui)
+        self._node_register_writer = NodeRegisterWriter(self._spec)
+        self._glsl_writer = GLSLWriter(self._spec)
+        self._node_sockets = self._spec.get_node_sockets()
+        self._type_suffix_abbreviated = self._spec.type_suffix_abbreviated()
+        self._node_name = self._spec.get_node_name()
+        self._node_has_properties = self._spec.node_has_properties()
+        self._props = self._spec.get_props()
+        self._node_type = self._spec.get_node_type()
+        self._is_texture_node = self._spec.is_texture_node()
+        self._uses_texture_mapping = self._spec.uses_texture_mapping()
+        self._source_path = self._spec.get_source_path()
+        self._source_tree = source_tree if source_tree is not None else SourceTree(self._source_path)
     
     def _generate_node_namespace(self):
         return 'namespace blender::nodes::node_shader_{suff}{name}_cc {{\n\n'.format(
-            suff="{suff}_".format(suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-                                  name=code_generator_util.string_lower_underscored(
-                                      self._node_name)
+            suff=self._spec.suffix_abbreviated_prefix,
+                                  name=self._spec.name_lower_underscored
         )
 
     def _generate_node_shader_sockets(self):
@@ -50,7 +53,7 @@ class NodeDefinitionWriter:
             socket_text = 'b.add_{type}<decl::{Type}>(N_("{Name}")){options};\n'.format(
                 type=sock['type'].lower(),
                 Type=sock['data-type'].type_name.capitalize(),
-                Name=code_generator_util.string_capitalized_spaced(sock['name']),
+                Name=sock.name_capitalized_spaced,
                 options='{min}{max}{default}{flags}'.format(
                     min='.min({})'.format(sock['min']) if 'min' in sock else '',
                     max='.max({})'.format(sock['max']) if 'max' in sock else '',
@@ -95,16 +98,15 @@ class NodeDefinitionWriter:
                 if isinstance(prop['data-type'], EnumProp):
                     defaults.append('{struct}->{prop} = {default};'.format(
                         struct=struct,
-                        prop=code_generator_util.string_lower_underscored(prop['name']),
+                        prop=prop.name_lower_underscored,
                         default='SHD_{NAME}_{PROP}'.format(
-                            NAME=code_generator_util.string_upper_underscored(
-                                self._node_name),
+                            NAME=self._spec.name_upper_underscored,
                             PROP=code_generator_util.string_upper_underscored(
                                 prop['default']))))
                 elif isinstance(prop['data-type'], (BoolProp, IntProp)):
                     defaults.append('{struct}->{prop} = {default};'.format(
                         struct=struct,
-                        prop=code_generator_util.string_lower_underscored(prop['name']),
+                        prop=prop.name_lower_underscored,
                         default=prop['default']))
 
             prop_init = ''.join(defaults)
@@ -116,8 +118,7 @@ class NodeDefinitionWriter:
                 if isinstance(prop['data-type'], EnumProp):
                     defaults.append('node->custom{i} = {default};'.format(i=s_custom_i,
                                                                           default='SHD_{NAME}_{PROP}'.format(
-                                                                              NAME=code_generator_util.string_upper_underscored(
-                                                                                  self._node_name),
+                                                                              NAME=self._spec.name_upper_underscored,
                                                                               PROP=code_generator_util.string_upper_underscored(
                                                                                   prop['default']))))
                     s_custom_i += 1
@@ -145,15 +146,13 @@ class NodeDefinitionWriter:
                     '{prop_init}\n\n' \
                     '{set_storage}' \
                     '}}\n\n'.format(
-            suff='{suff}_'.format(
-                suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-            name=code_generator_util.string_lower_underscored(self._node_name),
+            suff=self._spec.suffix_abbreviated_prefix,
+            name=self._spec.name_lower_underscored,
             get_storage='Node{Suff}{Name} *{struct} = MEM_cnew<Node{Suff}{Name}>(__func__);'.format(
                 Suff=self._type_suffix_abbreviated.capitalize(),
-                Name=code_generator_util.string_capitalized_no_space(self._node_name),
+                Name=self._spec.name_capitalized_no_space,
                 struct=struct) if uses_dna else '',
-            Name=code_generator_util.string_capitalized_no_space(
-                self._node_name),
+            Name=self._spec.name_capitalized_no_space,
             texture_mapping='BKE_texture_mapping_default(&tex->base.tex_mapping, TEXMAP_TYPE_POINT);'
                             'BKE_texture_colormapping_default(&tex->base.color_mapping);'
             if self._uses_texture_mapping else '',
@@ -161,32 +160,31 @@ class NodeDefinitionWriter:
             set_storage='node->storage = {struct};'.format(struct=struct) if uses_dna else '')
         return init_func
 
-    def write_node_definition_file(self):
-        """node_shader_*.cc"""
-        file_path = path.join(self._source_path, "source", "blender", "nodes", "shader", "nodes",
-                              "node_shader_{suff}{name}.cc".format(
-                                  suff="{suff}_".format(
-                                      suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-                                  name=code_generator_util.string_lower_underscored(
-                                      self._node_name)))
-        with open(file_path, "w") as f:
-            code_generator_util.write_license(f)
+    @render_cache.rendered
+    def _generate_node_definition_file(self):
+        """Contents of the node definition file"""
+        file_lines = [code_generator_util.license_text(), '#include "node_shader_util.hh"\n\n', '\n\n'.
+            format(NAME=self._spec.name_upper_underscored)]
 
-            file_lines = ['', '#include "node_shader_util.hh"\n\n', '\n\n'.
-                format(NAME=code_generator_util.string_upper_underscored(self._node_name))]
+        file_lines.append(self._generate_node_namespace())
 
-            file_lines.append(self._generate_node_namespace())
+        file_lines.append(self._generate_node_shader_sockets())
 
-            file_lines.append(self._generate_node_shader_sockets())
+        file_lines.append(self._generate_node_shader_init())
 
-            file_lines.append(self._generate_node_shader_init())
+        file_lines.append(self._glsl_writer.generate_gpu_func())
 
-            file_lines.append(self._glsl_writer.generate_gpu_func())
+        file_lines.append('\n}\n')
 
-            file_lines.append('\n}\n')
+        file_lines.append(self._node_register_writer.generate_node_shader_register())
 
-            file_lines.append(self._node_register_writer.generate_node_shader_register())
+        return ''.join(file_lines)
 
-            f.writelines(file_lines)
+    def write_node_definition_file(self):
+        """node_shader_*.cc"""
+        file_path = path.join(self._source_path, "source", "blender", "nodes", "shader", "nodes",
+                              "node_shader_{suff}{name}.cc".format(
+                                  suff=self._spec.suffix_abbreviated_prefix,
+                                  name=self._spec.name_lower_underscored))
+        self._source_tree.write(file_path, self._generate_node_definition_file(), formatted=True)
 
-        code_generator_util.apply_clang_formatting(file_path, self._source_path)
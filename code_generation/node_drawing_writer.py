@@ -1,72 +1,67 @@
 from os import path
 
-import code_generation.code_generator_util as code_generator_util
+from code_generation import render_cache
+from code_generation.node_spec import NodeSpec
+from code_generation.source_tree import SourceTree
 from node_types.prop_enum import EnumProp
 
 
 class NodeDrawingWriter:
     """Write code related to drawing of the node"""
-    def __init__(self, gui):
-        self._source_path = gui.get_source_path()
-        self._node_has_properties = gui.node_has_properties()
-        self._props = gui.get_props()
-        self._type_suffix_abbreviated = gui.type_suffix_abbreviated()
-        self._node_name = gui.get_node_name()
+    def __init__(self, gui, source_tree=None):
+        self._spec = NodeSpec.from_gui(gui)
+        self._source_path = self._spec.get_source_path()
+        self._source_tree = source_tree if source_tree is not None else SourceTree(self._source_path)
+        self._node_has_properties = self._spec.node_has_properties()
+        self._props = self._spec.get_props()
+        self._type_suffix_abbreviated = self._spec.type_suffix_abbreviated()
+        self._node_name = self._spec.get_node_name()
 
-    def write_node_drawing(self):
-        """drawnode.cc"""
-        drawnode_path = path.join(self._source_path, "source", "blender", "editors", "space_node",
-                                  "drawnode.cc")
-        with open(drawnode_path, "r+") as f:
-            if self._node_has_properties:
-                draw_props = ''
-                if self._node_has_properties:
-                    prop_lines = []
-                    for prop in self._props:
-                        name = "NULL"
-                        if isinstance(prop['data-type'], EnumProp):
-                            name = '""'
-
-                        prop_lines.append(
-                            'uiItemR(layout, ptr, "{propname}", 0, {name}, ICON_NONE);'.format(
-                                propname=code_generator_util.string_lower_underscored(prop['name']),
-                                name=name))
+    def required_anchors(self):
+        """(file path, anchor name) of the insertion points used by the writer"""
+        if not self._node_has_properties:
+            return []
+        drawnode_path = path.join(self._source_path, "source", "blender", "editors", "space_node", "drawnode.cc")
+        return [(drawnode_path, 'shader_buttons_end'), (drawnode_path, 'shader_button_cases_end')]
 
-                    draw_props = ''.join(prop_lines)
-                func = 'static void node_shader_buts_{suff}{name}(uiLayout *layout, bContext *UNUSED(C), PointerRNA *ptr)' \
-                       '{{{props}}}\n\n'.format(
-                    suff='{suff}_'.format(
-                        suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-                    name=code_generator_util.string_lower_underscored(self._node_name),
-                    props=draw_props)
-                lines = f.readlines()
-                line_i = lines.index("static void node_shader_set_butfunc(bNodeType *ntype)\n") - 1
+    @render_cache.rendered
+    def _generate_draw_buttons(self):
+        """Function drawing the nodes props"""
+        prop_lines = []
+        for prop in self._props:
+            name = "NULL"
+            if isinstance(prop['data-type'], EnumProp):
+                name = '""'
 
-                lines.insert(line_i, func)
+            prop_lines.append(
+                'uiItemR(layout, ptr, "{propname}", 0, {name}, ICON_NONE);'.format(
+                    propname=prop.name_lower_underscored,
+                    name=name))
 
-                case = [
-                    "case SH_NODE_{SUFF}{name}:\n".format(SUFF="{SUFF}_".format(
-                        SUFF=self._type_suffix_abbreviated.upper()) if self._type_suffix_abbreviated else '',
-                                                          name=code_generator_util.string_upper_underscored(
-                                                              self._node_name)),
-                    "ntype->draw_buttons = node_shader_buts_{tex}{name};\n".format(
-                        tex="{suff}_".format(
-                            suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-                        name=code_generator_util.string_lower_underscored(self._node_name)),
-                    "break;\n"]
+        return 'static void node_shader_buts_{suff}{name}(uiLayout *layout, bContext *UNUSED(C), PointerRNA *ptr)' \
+               '{{{props}}}\n\n'.format(
+            suff=self._spec.suffix_abbreviated_prefix,
+            name=self._spec.name_lower_underscored,
+            props=''.join(prop_lines))
 
-                for i in range(line_i, len(lines)):
-                    if "break" in lines[i] and '}' in lines[i + 1]:
-                        line_i = i + 1
-                        break
-                else:
-                    print("Not Found")
-                    return
+    @render_cache.rendered
+    def _generate_draw_buttons_case(self):
+        """Case assigning the draw function to the node type"""
+        case = [
+            "case SH_NODE_{SUFF}{name}:\n".format(SUFF=self._spec.suffix_abbreviated_prefix_upper,
+                                                  name=self._spec.name_upper_underscored),
+            "ntype->draw_buttons = node_shader_buts_{tex}{name};\n".format(
+                tex=self._spec.suffix_abbreviated_prefix,
+                name=self._spec.name_lower_underscored),
+            "break;\n"]
+        return ''.join(case)
 
-                for line in reversed(case):
-                    lines.insert(line_i, line)
-
-                f.seek(0)
-                f.writelines(lines)
-                f.truncate()
-        code_generator_util.apply_clang_formatting(drawnode_path, self._source_path)
+    def write_node_drawing(self):
+        """drawnode.cc"""
+        drawnode_path = path.join(self._source_path, "source", "blender", "editors", "space_node",
+                                  "drawnode.cc")
+        if self._node_has_properties:
+            self._source_tree.insert(drawnode_path, self._source_tree.anchor(drawnode_path, 'shader_buttons_end'),
+                                     self._generate_draw_buttons(), formatted=True)
+            self._source_tree.insert(drawnode_path, self._source_tree.anchor(drawnode_path, 'shader_button_cases_end'),
+                                     self._generate_draw_buttons_case(), formatted=True)
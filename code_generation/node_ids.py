@@ -0,0 +1,88 @@
+"""
+Shader node type ids defined in BKE_node.h
+
+The ids are parsed once into an index of id to name and name to id. New ids are allocated after the highest id
+for a whole batch of nodes at once, so every collision is reported before any file is edited
+"""
+import functools
+from os import path
+import re
+
+_DEFINE = re.compile(r'^(//)?[ \t]*#define[ \t]+(SH_NODE_\w+)[ \t]+(\d+)[ \t]*$', re.MULTILINE)
+
+
+def file_path(source_path):
+    return path.join(source_path, "source", "blender", "blenkernel", "BKE_node.h")
+
+
+def define_name(spec):
+    """Name of the nodes type id define"""
+    return 'SH_NODE_{0}{1}'.format(spec.suffix_abbreviated_prefix_upper, spec.name_upper_underscored)
+
+
+class NodeIdRegistry:
+    """
+    Index of the shader node ids of BKE_node.h
+    The ids are the defines in the block of lines containing the highest id, other SH_NODE_ defines
+    such as the material node options only reserve their names.
+    Commented out ids are retired, they aren't allocated again so old files don't load as the new node
+    """
+
+    def __init__(self, text):
+        self.ids = {}  # id -> name
+        self.names = {}  # name -> id, every SH_NODE_ define in the file
+        self.retired = set()
+        self.block_end = None  # Offset after the line of the last id in the block
+        self._parse(text)
+
+    def _parse(self, text):
+        defines = [match for match in _DEFINE.finditer(text) if match.group(1) is None]
+        if not defines:
+            return
+        for match in defines:
+            self.names.setdefault(match.group(2), int(match.group(3)))
+
+        highest = max(defines, key=lambda match: int(match.group(3)))
+        block_start = text.rfind('\n\n', 0, highest.start()) + 1
+        block_end = text.find('\n\n', highest.end())
+        block_end = len(text) if block_end == -1 else block_end
+        for match in _DEFINE.finditer(text, block_start, block_end):
+            if match.group(1) is not None:
+                self.retired.add(int(match.group(3)))
+            else:
+                self.ids.setdefault(int(match.group(3)), match.group(2))
+                self.block_end = min(match.end() + 1, len(text))
+
+    @property
+    def last_id(self):
+        return max(self.ids) if self.ids else None
+
+    def allocate(self, names):
+        """
+        Allocates consecutive free ids after the highest id for the defines
+        :param names: define names of the new nodes, see define_name
+        :return: dict of define name to id
+        """
+        if not self.ids:
+            raise Exception("No shader node ids found in BKE_node.h")
+        errors = []
+        for name in names:
+            if name in self.names:
+                errors.append('{0} is already defined as {1}'.format(name, self.names[name]))
+        for name in sorted(set(name for name in names if names.count(name) > 1)):
+            errors.append('{0} is added more than once'.format(name))
+        if errors:
+            raise Exception("Node id collisions:\n  {errors}".format(errors='\n  '.join(errors)))
+
+        allocated = {}
+        next_id = max(self.ids.keys() | self.retired) + 1
+        for name in names:
+            allocated[name] = next_id
+            next_id += 1
+        return allocated
+
+
+@functools.lru_cache(maxsize=8)
+def index_text(text):
+    """The registry of the BKE_node.h text, cached so the file is parsed once"""
+    return NodeIdRegistry(text)
@@ -1,20 +1,24 @@
 from os import path
-import re
 
-import code_generation.code_generator_util as code_generator_util
+from code_generation import render_cache
+from code_generation.node_spec import NodeSpec
+from code_generation.source_tree import SourceTree
 
 
 class NodeRegisterWriter:
     """Writes references to node register function"""
-    def __init__(self, gui):
-        self._source_path = gui.get_source_path()
-        self._type_suffix_abbreviated = gui.type_suffix_abbreviated()
-        self._node_name = gui.get_node_name()
-        self._node_group = gui.get_node_group()
-        self._node_sockets = gui.get_node_sockets()
-        self._node_has_properties = gui.node_has_properties()
-        self._props = gui.get_props()
+    def __init__(self, gui, source_tree=None):
+        self._spec = NodeSpec.from_gui(gui)
+        self._source_path = self._spec.get_source_path()
+        self._source_tree = source_tree if source_tree is not None else SourceTree(self._source_path)
+        self._type_suffix_abbreviated = self._spec.type_suffix_abbreviated()
+        self._node_name = self._spec.get_node_name()
+        self._node_group = self._spec.get_node_group()
+        self._node_sockets = self._spec.get_node_sockets()
+        self._node_has_properties = self._spec.node_has_properties()
+        self._props = self._spec.get_props()
 
+    @render_cache.rendered
     def generate_node_shader_register(self):
         register_text = 'void register_node_type_sh_{suff}{name}(void)' \
                         '{{' \
@@ -27,83 +31,54 @@ class NodeRegisterWriter:
                         'node_type_gpu(&ntype, file_ns::gpu_shader_{suff}{name});' \
                         '\n\n' \
                         'nodeRegisterType(&ntype);' \
-                        '}}\n'.format(suff='{suff}_'.format(
-            suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-                                      name=code_generator_util.string_lower_underscored(self._node_name),
-                                      SUFF='{SUFF}_'.format(
-                                          SUFF=self._type_suffix_abbreviated.upper()) if self._type_suffix_abbreviated else '',
-                                      NAME=code_generator_util.string_upper_underscored(self._node_name),
-                                      Name=code_generator_util.string_capitalized_spaced(self._node_name),
+                        '}}\n'.format(suff=self._spec.suffix_abbreviated_prefix,
+                                      name=self._spec.name_lower_underscored,
+                                      SUFF=self._spec.suffix_abbreviated_prefix_upper,
+                                      NAME=self._spec.name_upper_underscored,
+                                      Name=self._spec.name_capitalized_spaced,
                                       CLASS=self._node_group.upper(),
                                       sockets_in='sh_node_{suff}{name}_in'.format(
-                                          suff='{suff}_'.format(
-                                              suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-                                          name=code_generator_util.string_lower_underscored(
-                                              self._node_name)) if len(
+                                          suff=self._spec.suffix_abbreviated_prefix,
+                                          name=self._spec.name_lower_underscored) if len(
                                           [sock for sock in self._node_sockets if
                                            sock['type'] == 'Input']) > 0 else 'NULL',
                                       sockets_out='sh_node_{suff}{name}_out'.format(
-                                          suff='{suff}_'.format(
-                                              suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-                                          name=code_generator_util.string_lower_underscored(
-                                              self._node_name)) if len(
+                                          suff=self._spec.suffix_abbreviated_prefix,
+                                          name=self._spec.name_lower_underscored) if len(
                                           [sock for sock in self._node_sockets if
                                            sock['type'] == 'Output']) > 0 else 'NULL',
                                       init='node_type_init(&ntype, file_ns::node_shader_init_{tex}{name});'.format(
-                                          tex='{suff}_'.format(
-                                              suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-                                          name=code_generator_util.string_lower_underscored(
-                                              self._node_name)) if self._node_has_properties else '',
+                                          tex=self._spec.suffix_abbreviated_prefix,
+                                          name=self._spec.name_lower_underscored) if self._node_has_properties else '',
                                       storage='node_type_storage(&ntype, "Node{Suff}{Name}", node_free_standard_storage, node_copy_standard_storage);'.format(
                                           Suff=self._type_suffix_abbreviated.capitalize(),
-                                          Name=code_generator_util.string_capitalized_no_space(
-                                              self._node_name)
+                                          Name=self._spec.name_capitalized_no_space
                                       ),
                                       Suff=self._type_suffix_abbreviated.capitalize())
         return register_text
 
+    def required_anchors(self):
+        """(file path, anchor name) of the insertion points used by the writer"""
+        return [(path.join(self._source_path, "source", "blender", "nodes", "NOD_shader.h"),
+                 'register_declarations_end'),
+                (path.join(self._source_path, "source", "blender", "blenkernel", "intern", "node.cc"),
+                 'register_calls_end')]
+
     def write_node_register(self):
         """NOD_shader.h"""
         file_path = path.join(self._source_path, "source", "blender", "nodes", "NOD_shader.h")
-        with open(file_path, 'r+') as f:
-
-            func = 'void register_node_type_sh_{suff}{name}(void);\n'. \
-                format(suff="{suff}_".format(
-                suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-                       name=code_generator_util.string_lower_underscored(self._node_name))
+        func = 'void register_node_type_sh_{suff}{name}(void);\n'. \
+            format(suff=self._spec.suffix_abbreviated_prefix,
+                   name=self._spec.name_lower_underscored)
 
-            # Find insertion point. Parse file in reverse to put new line near the bottom.
-            contents = f.readlines()
-            for i, line in enumerate(reversed(contents)):
-                if re.search(r'^void register_node_type_sh.*void\);$', line) != None:
-                    break
-            
-            # Insert new register call.
-            contents.insert(len(contents) - i, func)
-            # Clear file contents.
-            f.truncate(0)
-            # Write new content.
-            f.seek(0)
-            f.writelines(contents)
+        # Put new line after the last register declaration, near the bottom
+        self._source_tree.insert(file_path, self._source_tree.anchor(file_path, 'register_declarations_end'), func)
 
     def write_call_node_register(self):
         """node.c"""
         file_path = path.join(self._source_path, "source", "blender", "blenkernel", "intern", "node.cc")
-        with open(file_path, 'r+') as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                if line == 'static void registerShaderNodes()\n':
-                    while lines[i] != '}\n':
-                        i += 1
-                    lines.insert(i, 'register_node_type_sh_{suff}{name}();'.format(
-                        suff='{suff}_'.format(suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-                        name=code_generator_util.string_lower_underscored(self._node_name)
-                    ))
-                    break
-            else:
-                raise Exception("Match not found")
-
-            f.seek(0)
-            f.writelines(lines)
-            f.truncate()
-        code_generator_util.apply_clang_formatting(file_path, self._source_path)
+        self._source_tree.insert(file_path, self._source_tree.anchor(file_path, 'register_calls_end'),
+                                 'register_node_type_sh_{suff}{name}();\n'.format(
+                                     suff=self._spec.suffix_abbreviated_prefix,
+                                     name=self._spec.name_lower_underscored),
+                                 formatted=True)
@@ -0,0 +1,193 @@
+from collections.abc import Mapping
+import hashlib
+import json
+
+import code_generation.code_generator_util as code_generator_util
+from node_types.prop_bool import BoolProp
+from node_types.socket_vector import VectorSocket
+
+
+def _canonical(value):
+    """Json compatible form of a spec value, prop and socket types are identified by their class name"""
+    if isinstance(value, Mapping):
+        return {key: _canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return type(value).__name__
+
+
+def _frozen(value):
+    """Immutable copy of a prop/socket value, enum options become item specs"""
+    if isinstance(value, list):
+        return tuple(ItemSpec(item) if isinstance(item, dict) else item for item in value)
+    return value
+
+
+class ItemSpec(Mapping):
+    """
+    Read only prop, socket or enum option with its name forms precomputed
+    Still behaves as the dict it was created from, so writers can index it as before
+    """
+    __slots__ = ('_values', 'name_lower_underscored', 'name_upper_underscored', 'name_capitalized_no_space',
+                 'name_capitalized_spaced', 'name_capitalized_underscored')
+
+    def __init__(self, values):
+        object.__setattr__(self, '_values', {key: _frozen(value) for key, value in values.items()})
+        name = self._values.get('name', '')
+        object.__setattr__(self, 'name_lower_underscored', code_generator_util.string_lower_underscored(name))
+        object.__setattr__(self, 'name_upper_underscored', code_generator_util.string_upper_underscored(name))
+        object.__setattr__(self, 'name_capitalized_no_space', code_generator_util.string_capitalized_no_space(name))
+        object.__setattr__(self, 'name_capitalized_spaced', code_generator_util.string_capitalized_spaced(name))
+        object.__setattr__(self, 'name_capitalized_underscored',
+                           code_generator_util.string_capitalized_underscored(name))
+
+    def __getitem__(self, key):
+        return self._values[key]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("ItemSpec is immutable")
+
+    def __repr__(self):
+        return 'ItemSpec({values})'.format(values=self._values)
+
+
+class NodeSpec:
+    """
+    Immutable snapshot of everything the writers need to know about a node
+    Taken once from the gui so the widgets are only read once per generation,
+    implements the same accessors as the gui so it can be passed to any writer in its place
+    """
+    __slots__ = ('_source_path', '_node_name', '_node_type', '_node_group', '_props', '_sockets',
+                 '_type_suffix', '_type_suffix_abbreviated', '_is_texture_node', '_uses_texture_mapping',
+                 '_node_has_properties', '_node_has_check_box',
+                 'name_lower_underscored', 'name_upper_underscored', 'name_capitalized_no_space',
+                 'name_capitalized_spaced', 'name_capitalized_underscored',
+                 'suffix_prefix', 'suffix_prefix_upper', 'suffix_abbreviated_prefix',
+                 'suffix_abbreviated_prefix_upper', '_constant_fold', '_content_hash')
+
+    def __init__(self, source_path, node_name, node_type, node_group, props, sockets, type_suffix,
+                 type_suffix_abbreviated, is_texture_node, uses_texture_mapping, node_has_properties,
+                 node_has_check_box, constant_fold=False):
+        """
+        :param constant_fold: optional- whether a cycles constant_fold skeleton is generated for the node
+        """
+        values = {
+            '_source_path': source_path,
+            '_node_name': node_name,
+            '_node_type': node_type,
+            '_node_group': node_group,
+            '_props': tuple(prop if isinstance(prop, ItemSpec) else ItemSpec(prop) for prop in props),
+            '_sockets': tuple(socket if isinstance(socket, ItemSpec) else ItemSpec(socket) for socket in sockets),
+            '_type_suffix': type_suffix,
+            '_type_suffix_abbreviated': type_suffix_abbreviated,
+            '_is_texture_node': is_texture_node,
+            '_uses_texture_mapping': uses_texture_mapping,
+            '_node_has_properties': node_has_properties,
+            '_node_has_check_box': node_has_check_box,
+            '_constant_fold': constant_fold,
+            'name_lower_underscored': code_generator_util.string_lower_underscored(node_name),
+            'name_upper_underscored': code_generator_util.string_upper_underscored(node_name),
+            'name_capitalized_no_space': code_generator_util.string_capitalized_no_space(node_name),
+            'name_capitalized_spaced': code_generator_util.string_capitalized_spaced(node_name),
+            'name_capitalized_underscored': code_generator_util.string_capitalized_underscored(node_name),
+            # Type suffixes as they are prefixed to names, e.g. 'tex_' for node_shader_tex_{name}
+            'suffix_prefix': '{0}_'.format(type_suffix) if type_suffix else '',
+            'suffix_prefix_upper': '{0}_'.format(type_suffix.upper()) if type_suffix else '',
+            'suffix_abbreviated_prefix': '{0}_'.format(type_suffix_abbreviated) if type_suffix_abbreviated else '',
+            'suffix_abbreviated_prefix_upper':
+                '{0}_'.format(type_suffix_abbreviated.upper()) if type_suffix_abbreviated else '',
+        }
+        for key, value in values.items():
+            object.__setattr__(self, key, value)
+        object.__setattr__(self, '_content_hash', None)
+
+    @classmethod
+    def create(cls, source_path, node_name, node_type, node_group, props, sockets, constant_fold=False):
+        """Spec for a node defined without the gui, the derived values follow the guis rules"""
+        if node_type == 'Texture':
+            type_suffix, type_suffix_abbreviated = 'texture', 'tex'
+        elif node_type in ['Bsdf', 'BsdfBase']:
+            type_suffix, type_suffix_abbreviated = 'bsdf', 'bsdf'
+        else:
+            type_suffix, type_suffix_abbreviated = '', ''
+        is_texture_node = node_type == 'Texture'
+        uses_texture_mapping = is_texture_node and any(
+            socket['type'] == 'Input' and isinstance(socket['data-type'], VectorSocket) for socket in sockets)
+        return cls(source_path, node_name, node_type, node_group, props, sockets, type_suffix, type_suffix_abbreviated,
+                   is_texture_node, uses_texture_mapping, len(props) > 0,
+                   any(isinstance(prop['data-type'], BoolProp) for prop in props), constant_fold)
+
+    @classmethod
+    def from_gui(cls, gui):
+        """Snapshot of the guis current state, a NodeSpec is returned unchanged"""
+        if isinstance(gui, NodeSpec):
+            return gui
+        return cls(gui.get_source_path(), gui.get_node_name(), gui.get_node_type(), gui.get_node_group(),
+                   gui.get_props(), gui.get_node_sockets(), gui.type_suffix(), gui.type_suffix_abbreviated(),
+                   gui.is_texture_node(), gui.uses_texture_mapping(), gui.node_has_properties(),
+                   gui.node_has_check_box())
+
+    def __setattr__(self, key, value):
+        raise AttributeError("NodeSpec is immutable")
+
+    def content_hash(self):
+        """
+        Stable digest of everything the generated code depends on, equal specs have equal hashes across runs
+        The source path isn't included as it only decides where the code is written
+        """
+        if self._content_hash is None:
+            content = [self._node_name, self._node_type, self._node_group, self._type_suffix,
+                       self._type_suffix_abbreviated, self._is_texture_node, self._uses_texture_mapping,
+                       self._node_has_properties, self._node_has_check_box, self._constant_fold,
+                       _canonical(self._props), _canonical(self._sockets)]
+            object.__setattr__(self, '_content_hash',
+                               hashlib.sha256(json.dumps(content, sort_keys=True).encode('utf-8')).hexdigest())
+        return self._content_hash
+
+    def get_source_path(self):
+        return self._source_path
+
+    def get_node_name(self):
+        return self._node_name
+
+    def get_node_type(self):
+        return self._node_type
+
+    def get_node_group(self):
+        return self._node_group
+
+    def get_props(self):
+        return self._props
+
+    def get_node_sockets(self):
+        return self._sockets
+
+    def type_suffix(self):
+        return self._type_suffix
+
+    def type_suffix_abbreviated(self):
+        return self._type_suffix_abbreviated
+
+    def is_texture_node(self):
+        return self._is_texture_node
+
+    def uses_texture_mapping(self):
+        return self._uses_texture_mapping
+
+    def node_has_properties(self):
+        return self._node_has_properties
+
+    def node_has_check_box(self):
+        return self._node_has_check_box
+
+    def uses_constant_fold(self):
+        """Whether a constant_fold skeleton was asked for, off unless the spec turns it on"""
+        return self._constant_fold
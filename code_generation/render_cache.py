@@ -0,0 +1,121 @@
+"""
+Cache of the code the writers render for a node
+
+Fragments are keyed by the nodes content hash and the generator version, so an unchanged node
+is only rendered once no matter how often it is generated. The fragments of recently rendered nodes are kept
+in memory with least recently used eviction and stored on disk when a generation finishes.
+Caching is only enabled during a generation, writers used on their own always render
+"""
+from collections import OrderedDict
+from contextlib import contextmanager
+import functools
+import glob
+from os import path
+import threading
+
+from code_generation import cache
+
+# Bump when the cached format changes, changes to the generators source invalidate the cache automatically
+RENDER_CACHE_VERSION = 1
+CACHE_NAMESPACE = 'renders'
+# Number of nodes whose fragments are kept in memory
+RENDER_CACHE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=None)
+def generator_version():
+    """Digest of the generators source and templates, renders of another version of the generator are never used"""
+    root = path.abspath(path.join(path.dirname(__file__), path.pardir))
+    file_paths = sorted(glob.glob(path.join(root, 'code_generation', '*.py')) +
+                        glob.glob(path.join(root, 'node_types', '*.py')) +
+                        glob.glob(path.join(root, 'templates', '*')))
+    parts = [RENDER_CACHE_VERSION]
+    for file_path in file_paths:
+        with open(file_path, 'rb') as f:
+            parts.extend([path.relpath(file_path, root).replace(path.sep, '/'), f.read()])
+    return cache.digest(*parts)
+
+
+class RenderCache:
+    """Rendered fragments by node, the least recently used nodes are evicted once the cache is full"""
+
+    def __init__(self, size=RENDER_CACHE_SIZE):
+        self._size = size
+        self._entries = OrderedDict()  # node key -> dict of fragment name -> text
+        self._dirty = set()  # Node keys with fragments which aren't stored on disk yet
+        self._lock = threading.RLock()
+
+    def _key(self, spec):
+        return cache.digest(generator_version(), spec.content_hash())
+
+    def _fragments(self, key):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        fragments = cache.load(CACHE_NAMESPACE, key) or {}
+        self._entries[key] = fragments
+        while len(self._entries) > self._size:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            if evicted_key in self._dirty:
+                cache.store(CACHE_NAMESPACE, evicted_key, evicted)
+                self._dirty.discard(evicted_key)
+        return fragments
+
+    def render(self, spec, name, render):
+        """The cached fragment of the node, rendering and caching it on a miss"""
+        key = self._key(spec)
+        with self._lock:
+            fragments = self._fragments(key)
+            if name in fragments:
+                return fragments[name]
+        text = render()
+        with self._lock:
+            self._fragments(key)[name] = text
+            self._dirty.add(key)
+        return text
+
+    def save(self):
+        """Stores the fragments rendered since the last save on disk"""
+        with self._lock:
+            for key in self._dirty:
+                cache.store(CACHE_NAMESPACE, key, self._entries[key])
+            self._dirty.clear()
+
+    def clear(self):
+        """Drops the fragments held in memory, the disk store is kept"""
+        with self._lock:
+            self._entries.clear()
+            self._dirty.clear()
+
+
+_cache = RenderCache()
+_enabled = 0
+_enabled_lock = threading.Lock()
+
+
+@contextmanager
+def enabled():
+    """Caches the fragments rendered within the block, they are stored on disk when it exits"""
+    global _enabled
+    with _enabled_lock:
+        _enabled += 1
+    try:
+        yield _cache
+    finally:
+        with _enabled_lock:
+            _enabled -= 1
+        _cache.save()
+
+
+def rendered(method):
+    """
+    Caches the text a writer method renders
+    The method may only depend on the writers spec and its arguments, which are part of the fragment name
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args):
+        if not _enabled:
+            return method(self, *args)
+        name = '{0}.{1}{2}'.format(type(self).__name__, method.__name__, repr(args) if args else '')
+        return _cache.render(self._spec, name, lambda: method(self, *args))
+    return wrapper
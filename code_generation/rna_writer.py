@@ -1,19 +1,24 @@
-from os import path, SEEK_SET
+from os import path
 
 import code_generation.code_generator_util as code_generator_util
+from code_generation import render_cache
+from code_generation.node_spec import NodeSpec
+from code_generation.source_tree import SourceTree
 from node_types.prop_bool import BoolProp
 from node_types.prop_enum import EnumProp
 from node_types.prop_int import IntProp
 
 
 class RNAWriter:
-    def __init__(self, gui):
-        self._node_has_properties = gui.node_has_properties()
-        self._type_suffix_abbreviated = gui.type_suffix_abbreviated()
-        self._source_path = gui.get_source_path()
-        self._props = gui.get_props()
-        self._node_type = gui.get_node_type()
-        self._node_name = gui.get_node_name()
+    def __init__(self, gui, source_tree=None):
+        self._spec = NodeSpec.from_gui(gui)
+        self._node_has_properties = self._spec.node_has_properties()
+        self._type_suffix_abbreviated = self._spec.type_suffix_abbreviated()
+        self._source_path = self._spec.get_source_path()
+        self._source_tree = source_tree if source_tree is not None else SourceTree(self._source_path)
+        self._props = self._spec.get_props()
+        self._node_type = self._spec.get_node_type()
+        self._node_name = self._spec.get_node_name()
         self._is_texture_node = self._node_type == 'Texture'
 
     def _generate_enum_prop_item(self, enum):
@@ -24,104 +29,99 @@ class RNAWriter:
         return 'static const EnumPropertyItem rna_enum_node_{suff}{enum}_items[] = {{' \
                '{options}' \
                '{{0, NULL, 0, NULL, NULL}},' \
-               '}};\n\n'.format(suff='{suff}_'.format(
-            suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-                                enum=code_generator_util.string_lower_underscored(enum['name']),
+               '}};\n\n'.format(suff=self._spec.suffix_abbreviated_prefix,
+                                enum=enum.name_lower_underscored,
                                 options=''.join('{{{i}, "{OPTION}", 0, "{Option}", "{desc}"}},'.format(
                                     i=i + 1,
-                                    OPTION=code_generator_util.string_upper_underscored(option['name']),
-                                    Option=code_generator_util.string_capitalized_spaced(option['name']),
+                                    OPTION=option.name_upper_underscored,
+                                    Option=option.name_capitalized_spaced,
                                     desc=option['desc']
                                 ) for i, option in enumerate(enum['options'])))
 
+    def required_anchors(self):
+        """(file path, anchor name) of the insertion points used by the writer"""
+        if not self._node_has_properties:
+            return []
+        file_path = path.join(self._source_path, "source", "blender", "makesrna", "intern", "rna_nodetree.c")
+        anchors = [(file_path, 'compositor_nodes_start')]
+        if [prop for prop in self._props if isinstance(prop['data-type'], EnumProp)]:
+            anchors.append((file_path, 'rna_runtime_enums_end'))
+        return anchors
+
+    @render_cache.rendered
+    def _generate_rna_enums(self):
+        """Enum items of the enum props"""
+        return ''.join(self._generate_enum_prop_item(prop) for prop in self._props
+                       if isinstance(prop['data-type'], EnumProp))
+
+    @render_cache.rendered
+    def _generate_rna_function(self):
+        """def_sh_* function defining the props"""
+        props = []
+        s_custom_i = 1
+        uses_dna = code_generator_util.uses_dna(self._props, self._node_type)
+        bool_values = code_generator_util.bool_prop_values(self._props)
+        for prop in self._props:
+            if not uses_dna:
+                if isinstance(prop['data-type'], (EnumProp, IntProp)):
+                    custom_i = s_custom_i
+                    s_custom_i += 1
+                elif isinstance(prop['data-type'], BoolProp):
+                    custom_i = s_custom_i
+            if isinstance(prop['data-type'], EnumProp):
+                enum_name = 'rna_enum_node_{suff}{name}_items'. \
+                    format(suff=self._spec.suffix_abbreviated_prefix,
+                           name=prop.name_lower_underscored)
+
+            props.append('prop = RNA_def_property(srna, "{name}", PROP_{TYPE}, {SUBTYPE});'
+                         'RNA_def_property_{type}_sdna(prop, NULL, "{sdna}"{enum});'
+                         '{enum_items}'
+                         '{prop_range}'
+                         'RNA_def_property_ui_text(prop, "{Name}", "{desc}");'
+                         'RNA_def_property_update(prop, NC_NODE | NA_EDITED, "rna_ShaderNode_socket_update");'.
+                format(
+                name=prop.name_lower_underscored,
+                TYPE=code_generator_util.string_upper_underscored(prop['data-type'].type_name),
+                SUBTYPE=prop['sub-type'],
+                type=code_generator_util.string_lower_underscored(prop['data-type'].type_name),
+                sdna=code_generator_util.string_lower_underscored(
+                    prop['name'] if uses_dna else "custom{index}".format(index=custom_i)),
+                # NOD_shader.h which defines SHD_* is only included by RNA_RUNTIME code, makesrna needs the value
+                enum=', {bit}'.format(bit=bool_values[prop['name']])
+                if isinstance(prop['data-type'], BoolProp) else '',
+                enum_items='RNA_def_property_enum_items(prop, {enum_name});'.format(enum_name=enum_name) if
+                isinstance(prop['data-type'], EnumProp) else '',
+                prop_range='RNA_def_property_range(prop, {min}, {max});'.format(min=prop['min'],
+                                                                                max=prop['max']) if prop[
+                                                                                                        'data-type'] == "Int" or
+                                                                                                    prop[
+                                                                                                        'data-type'] == "Float" else '',
+                Name=prop.name_capitalized_spaced,
+                desc=""))
+
+        return 'static void def_sh_{suff}{name}(StructRNA *srna)\n' \
+               '{{\n' \
+               'PropertyRNA *prop;\n\n' \
+               '{sdna}' \
+               '{define_tex}\n\n' \
+               '{props}\n' \
+               '}}\n\n'.format(suff=self._spec.suffix_abbreviated_prefix,
+                               name=self._node_name.replace(" ", "_").lower(),
+                               sdna='RNA_def_struct_sdna_from(srna, "Node{Tex}{Name}", "storage");'. \
+                               format(Name=self._spec.name_capitalized_no_space,
+                                   Tex="Tex" if self._is_texture_node else "")
+                               if code_generator_util.uses_dna(self._props, self._node_type) else '',
+                               define_tex='\ndef_sh_tex(srna);' if self._is_texture_node else '',
+                               props="\n\n".join(props))
+
     def write_rna_properties(self):
         """rna_nodetree.c"""
         if self._node_has_properties:
             file_path = path.join(self._source_path, "source", "blender", "makesrna", "intern",
                                   "rna_nodetree.c")
-            with open(file_path, 'r+') as f:
-                props = []
-                enum_defs = []
-                s_custom_i = 1
-                uses_dna = code_generator_util.uses_dna(self._props, self._node_type)
-                for prop in self._props:
-                    if not uses_dna:
-                        if isinstance(prop['data-type'], (EnumProp, IntProp)):
-                            custom_i = s_custom_i
-                            s_custom_i += 1
-                        elif isinstance(prop['data-type'], BoolProp):
-                            custom_i = s_custom_i
-                    if isinstance(prop['data-type'], EnumProp):
-                        enum_name = 'rna_enum_node_{suff}{name}_items'. \
-                            format(suff='{suff}_'.format(
-                            suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-                                   name=code_generator_util.string_lower_underscored(prop['name']))
-                        enum_defs.append(self._generate_enum_prop_item(prop))
-
-                    props.append('prop = RNA_def_property(srna, "{name}", PROP_{TYPE}, {SUBTYPE});'
-                                 'RNA_def_property_{type}_sdna(prop, NULL, "{sdna}"{enum});'
-                                 '{enum_items}'
-                                 '{prop_range}'
-                                 'RNA_def_property_ui_text(prop, "{Name}", "{desc}");'
-                                 'RNA_def_property_update(prop, NC_NODE | NA_EDITED, "rna_ShaderNode_socket_update");'.
-                        format(
-                        name=code_generator_util.string_lower_underscored(prop['name']),
-                        TYPE=code_generator_util.string_upper_underscored(prop['data-type'].type_name),
-                        SUBTYPE=prop['sub-type'],
-                        type=code_generator_util.string_lower_underscored(prop['data-type'].type_name),
-                        sdna=code_generator_util.string_lower_underscored(
-                            prop['name'] if uses_dna else "custom{index}".format(index=custom_i)),
-                        enum=', SHD_{NAME}_{PROP}'.format(
-                            NAME=code_generator_util.string_upper_underscored(self._node_name),
-                            PROP=code_generator_util.string_upper_underscored(prop['name']))
-                        if isinstance(prop['data-type'], BoolProp) else '',
-                        enum_items='RNA_def_property_enum_items(prop, {enum_name});'.format(enum_name=enum_name) if
-                        isinstance(prop['data-type'], EnumProp) else '',
-                        prop_range='RNA_def_property_range(prop, {min}, {max});'.format(min=prop['min'],
-                                                                                        max=prop['max']) if prop[
-                                                                                                                'data-type'] == "Int" or
-                                                                                                            prop[
-                                                                                                                'data-type'] == "Float" else '',
-                        Name=code_generator_util.string_capitalized_spaced(prop['name']),
-                        desc=""))
-
-                func = 'static void def_sh_{suff}{name}(StructRNA *srna)\n' \
-                       '{{\n' \
-                       'PropertyRNA *prop;\n\n' \
-                       '{sdna}' \
-                       '{define_tex}\n\n' \
-                       '{props}\n' \
-                       '}}\n\n'.format(suff="{suff}_".format(
-                    suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-                                       name=self._node_name.replace(" ", "_").lower(),
-                                       sdna='RNA_def_struct_sdna_from(srna, "Node{Tex}{Name}", "storage");'. \
-                                       format(Name=code_generator_util.string_capitalized_no_space(
-                                           self._node_name),
-                                           Tex="Tex" if self._is_texture_node else "")
-                                       if code_generator_util.uses_dna(self._props, self._node_type) else '',
-                                       define_tex='\ndef_sh_tex(srna);' if self._is_texture_node else '',
-                                       props="\n\n".join(props))
-                lines = f.readlines()
-                for i, line in enumerate(lines):
-                    if line == '/* -- Compositor Nodes ------------------------------------------------------ */\n':
-                        lines.insert(i, func)
-                        break
-                else:
-                    raise Exception("Reached end of file without match")
-
-                if len(enum_defs) > 0:
-                    for i, line in enumerate(lines):
-                        if line == '#ifndef RNA_RUNTIME\n':
-                            j = i
-                            while lines[j] != '#endif\n':
-                                j += 1
-                            for enum in enum_defs:
-                                lines.insert(j + 1, enum)
-                            break
-                    else:
-                        raise Exception("Reached end of file without match")
-
-                f.seek(0, SEEK_SET)
-                f.writelines(lines)
-                f.truncate()
-            code_generator_util.apply_clang_formatting(file_path, self._source_path)
+            self._source_tree.insert(file_path, self._source_tree.anchor(file_path, 'compositor_nodes_start'),
+                                     self._generate_rna_function(), formatted=True)
+            enum_defs = self._generate_rna_enums()
+            if len(enum_defs) > 0:
+                self._source_tree.insert(file_path, self._source_tree.anchor(file_path, 'rna_runtime_enums_end'),
+                                         enum_defs, formatted=True)
@@ -0,0 +1,308 @@
+import difflib
+import os
+from os import path
+import shutil
+import tempfile
+
+from code_generation import anchor_index
+from code_generation.formatter import LazyClangFormatter
+
+PREFLIGHT_WORKERS = 8
+
+
+class SourceTree:
+    """
+    In memory view of the blender source files which are modified or created during generation
+    Each file is read at most once, writers edit the cached text and every modified file
+    is written back once when the tree is flushed, no matter how many nodes were added
+    Nothing touches the disk until flush, so a failed generation leaves the source tree unchanged
+    """
+
+    def __init__(self, source_path='', formatter=None, journal=None, base=None):
+        """
+        :param formatter: optional- formats files after they are written, uses blenders clang format by default
+        :param journal: optional- journal the written files are backed up to before each flush so it can be undone
+        :param base: optional- tree files are read from instead of the disk, edits aren't applied to it
+        """
+        self._source_path = source_path
+        self._formatter = formatter if formatter is not None else LazyClangFormatter(source_path)
+        self._journal = journal
+        self._base = base
+        self._texts = {}
+        self._originals = {}  # Text of each file as it is on disk, used to find the lines which were changed
+        self._dirty = {}  # Ordered set of modified file paths
+        self._formatted = {}  # Ordered set of file paths which need clang formatting after being written
+        self._anchor_index = anchor_index.AnchorIndex(source_path)
+        self._anchors = {}  # Anchors of each file, kept in step with the cached text by insert
+        self._fragments = []  # Text inserted into files and files written whole, in the order they were written
+        self._last_anchors = {}  # Name of the anchor last looked up in each file, inserts are attributed to it
+
+    def get_source_path(self):
+        return self._source_path
+
+    def _key(self, file_path):
+        return path.normpath(file_path)
+
+    def read(self, file_path):
+        """Returns the current text of the file, only reading it from disk on first access"""
+        key = self._key(file_path)
+        if key not in self._texts:
+            if self._base is not None:
+                self._texts[key] = self._base.read(file_path)
+            else:
+                with open(file_path, 'r') as f:
+                    self._texts[key] = f.read()
+            self._originals[key] = self._texts[key]
+        return self._texts[key]
+
+    def write(self, file_path, text, formatted=False):
+        """
+        Replaces the cached text of the file, or creates it if it doesn't exist
+        The file is only written to disk on flush
+        :param formatted: whether clang formatting should be applied to the file once it has been written
+        """
+        key = self._key(file_path)
+        if key not in self._originals:
+            self._fragments.append(self._fragment(key, 'file', None, 0, text, formatted))
+        self._set_text(key, text, formatted)
+        # Offsets into the replaced text can't be carried over, anchors are found again when next needed
+        self._anchors.pop(key, None)
+
+    def _set_text(self, key, text, formatted):
+        self._texts[key] = text
+        self._dirty[key] = None
+        if formatted:
+            self._formatted[key] = None
+
+    def _file_anchors(self, key):
+        if key not in self._anchors:
+            text = self.read(key)
+            if text is self._originals.get(key):
+                self._anchors[key] = dict(self._anchor_index.anchors(key, text))
+            else:
+                self._anchors[key] = anchor_index.scan(self._anchor_index.relative_path(key), text)
+        return self._anchors[key]
+
+    def anchor(self, file_path, name):
+        """Offset of the named insertion point in the current text of the file"""
+        key = self._key(file_path)
+        anchors = self._file_anchors(key)
+        if name not in anchors:
+            raise Exception("Anchor {name} not found in {path}".format(name=name, path=file_path))
+        self._last_anchors[key] = name
+        return anchors[name]
+
+    def preflight(self, anchors):
+        """
+        Resolves insertion points before anything is edited, files are read and scanned in parallel
+        Every missing file and anchor is reported at once, so a tree the node can't be added to fails before any edit
+        :param anchors: (file path, anchor name) pairs
+        """
+        # Imported here as concurrent.futures is slow to import
+        from concurrent.futures import ThreadPoolExecutor
+
+        names = {}
+        for file_path, name in anchors:
+            names.setdefault(self._key(file_path), {})[name] = None
+
+        def resolve(key):
+            relative_path = self._anchor_index.relative_path(key)
+            try:
+                found = self._file_anchors(key)
+            except OSError as e:
+                return ['{0}: {1}'.format(relative_path, e.strerror or e)]
+            return ['{0}: {1} not found'.format(relative_path, name) for name in names[key] if name not in found]
+
+        with ThreadPoolExecutor(max_workers=PREFLIGHT_WORKERS) as executor:
+            errors = [error for file_errors in executor.map(resolve, names) for error in file_errors]
+        if errors:
+            raise Exception("Insertion points not found, nothing was changed:\n  {errors}".format(
+                errors='\n  '.join(errors)))
+
+    def _fragment(self, key, kind, anchor, start, text, formatted):
+        return {'file': key, 'kind': kind, 'anchor': anchor, 'start': start, 'end': start + len(text), 'text': text,
+                'formatted': formatted}
+
+    def insert(self, file_path, offset, text, formatted=False):
+        """
+        Inserts text into the file at the offset
+        Anchors at or after the offset move with the text following them,
+        so repeated inserts at an anchor keep the order they were made in
+        """
+        key = self._key(file_path)
+        anchors = self._file_anchors(key)
+        # Several anchors can share an offset, the one the offset was looked up with is preferred
+        names = [name for name, anchor_offset in anchors.items() if anchor_offset == offset]
+        anchor = self._last_anchors.get(key) if self._last_anchors.get(key) in names else next(iter(names), None)
+        self.replace(file_path, offset, offset, text, formatted)
+        self._fragments.append(self._fragment(key, 'insert', anchor, offset, text, formatted))
+
+    def replace(self, file_path, start, end, text, formatted=False):
+        """
+        Replaces the text between the offsets
+        Anchors at or after the end move with the text following it, anchors inside the replaced text move to its end
+        """
+        key = self._key(file_path)
+        current = self.read(file_path)
+        anchors = self._file_anchors(key)
+        self._set_text(key, current[:start] + text + current[end:], formatted)
+        shift = len(text) - (end - start)
+        for name, anchor_offset in anchors.items():
+            if anchor_offset >= end:
+                anchors[name] = anchor_offset + shift
+            elif anchor_offset > start:
+                anchors[name] = start + len(text)
+        for fragment in self._fragments:
+            if fragment['file'] == key:
+                if fragment['start'] >= end:
+                    fragment['start'] += shift
+                if fragment['end'] >= end and fragment['end'] > start:
+                    fragment['end'] += shift
+
+    def fragments(self):
+        """
+        Text inserted into files and files written whole, in the order they were written
+        :return: list of dicts of file path, kind ('insert' or 'file'), anchor name of the insertion point if any,
+        start and end offsets in the current text, text and whether it's formatted
+        """
+        return list(self._fragments)
+
+    def dirty_files(self):
+        """Paths of the files which have been modified since the last flush"""
+        return list(self._dirty)
+
+    def changed_lines(self, file_path):
+        """
+        Line ranges of the file which differ from the file on disk
+        :return: list of 1 based inclusive (first, last) line ranges, None if the file is new
+        """
+        key = self._key(file_path)
+        if key not in self._originals:
+            return None
+        return changed_line_ranges(self._originals[key], self._texts[key])
+
+    def diff(self):
+        """
+        Unified diff of every modified file against the file on disk, nothing is written
+        Paths are relative to the source path, so the patch can be applied from the blender source directory
+        with git apply
+        """
+        patches = []
+        for key in self._dirty:
+            original = self._originals.get(key)
+            if original is None and path.exists(key):
+                with open(key, 'r') as f:
+                    original = f.read()
+            patches.append(unified_diff(self._anchor_index.relative_path(key), original, self._texts[key]))
+        return ''.join(patches)
+
+    def discard(self):
+        """Drops every edit which hasn't been flushed"""
+        self._fragments = [fragment for fragment in self._fragments if fragment['file'] not in self._dirty]
+        for file_path in self._dirty:
+            del self._texts[file_path]
+            self._originals.pop(file_path, None)
+            self._anchors.pop(file_path, None)
+        self._dirty.clear()
+        self._formatted.clear()
+
+    def _write_temp_file(self, file_path):
+        """Writes the files text to a temporary file next to it, returns the temporary file path"""
+        directory, file_name = path.split(file_path)
+        fd, temp_path = tempfile.mkstemp(prefix='.{0}.'.format(file_name), suffix='.tmp', dir=directory)
+        try:
+            with open(fd, 'w') as f:
+                f.write(self._texts[file_path])
+            if path.exists(file_path):
+                shutil.copymode(file_path, temp_path)
+            else:
+                os.chmod(temp_path, 0o644)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        return temp_path
+
+    def flush(self):
+        """
+        Writes every modified file to disk then formats the files which require it
+        All files are written to temporary files before any of them replace the originals,
+        so a failure never leaves a half written file behind
+        :return: paths of the written files
+        """
+        written = self.dirty_files()
+        entry = self._journal.record(written) if self._journal is not None and written else None
+        temp_paths = {}
+        try:
+            for file_path in written:
+                temp_paths[file_path] = self._write_temp_file(file_path)
+        except BaseException:
+            for temp_path in temp_paths.values():
+                os.remove(temp_path)
+            raise
+        try:
+            for file_path in written:
+                os.replace(temp_paths[file_path], file_path)
+                del temp_paths[file_path]
+        finally:
+            for temp_path in temp_paths.values():
+                os.remove(temp_path)
+
+        # Only the changed lines of existing files are formatted, new files are formatted entirely
+        line_ranges = {file_path: self.changed_lines(file_path) for file_path in self._formatted}
+        self._formatter.format(
+            [file_path for file_path in self._formatted if line_ranges[file_path] != []],
+            {file_path: ranges for file_path, ranges in line_ranges.items() if ranges})
+        if entry is not None:
+            self._journal.complete(entry)
+        for file_path in written:
+            self._originals[file_path] = self._texts[file_path]
+        # Clang format changes the files on disk, so the cached text is no longer accurate
+        for file_path in self._formatted:
+            del self._texts[file_path]
+            del self._originals[file_path]
+            self._anchors.pop(file_path, None)
+        self._dirty.clear()
+        self._formatted.clear()
+        return written
+
+
+def changed_line_ranges(old_text, new_text):
+    """
+    Line ranges of the new text which were inserted or replaced
+    Common leading and trailing lines are skipped before diffing, edits are small compared to the files
+    :return: list of 1 based inclusive (first, last) line ranges
+    """
+    old_lines = old_text.splitlines(keepends=True)
+    new_lines = new_text.splitlines(keepends=True)
+    start = 0
+    while start < len(old_lines) and start < len(new_lines) and old_lines[start] == new_lines[start]:
+        start += 1
+    old_end = len(old_lines)
+    new_end = len(new_lines)
+    while old_end > start and new_end > start and old_lines[old_end - 1] == new_lines[new_end - 1]:
+        old_end -= 1
+        new_end -= 1
+
+    matcher = difflib.SequenceMatcher(None, old_lines[start:old_end], new_lines[start:new_end], autojunk=False)
+    ranges = []
+    for tag, _, _, j1, j2 in matcher.get_opcodes():
+        if tag in ('replace', 'insert'):
+            ranges.append((start + j1 + 1, start + j2))
+    return ranges
+
+
+def unified_diff(relative_path, old_text, new_text):
+    """
+    Git style unified diff of a file
+    :param old_text: text on disk, None if the file is new
+    """
+    if old_text == new_text:
+        return ''
+    lines = ['diff --git a/{0} b/{0}\n'.format(relative_path)]
+    if old_text is None:
+        lines.append('new file mode 100644\n')
+    from_file = 'a/' + relative_path if old_text is not None else '/dev/null'
+    for line in difflib.unified_diff((old_text or '').splitlines(keepends=True), new_text.splitlines(keepends=True),
+                                     from_file, 'b/' + relative_path):
+        lines.append(line if line.endswith('\n') else line + '\n\\ No newline at end of file\n')
+    return ''.join(lines)
@@ -0,0 +1,197 @@
+"""
+Loads node specs from files so nodes can be generated without the gui
+
+Spec files are json objects, or the equivalent toml tables in files ending in .toml:
+{
+    "name": "node name",
+    "type": "Shader",
+    "group": "Shader",
+    "constant_fold": false,
+    "props": [{"name": "dropdown1", "data-type": "Enum", "sub-type": "PROP_NONE", "default": "prop1",
+               "options": [{"name": "prop1", "desc": "Short description"}]}],
+    "sockets": [{"type": "Input", "name": "socket1", "data-type": "Float", "sub-type": "PROP_NONE", "flags": [],
+                 "min": "0.0f", "max": "1.0f", "default": "0.5f"}]
+}
+
+constant_fold is optional, when true Shader and Curves nodes with inputs and outputs get a cycles constant_fold
+skeleton to fill in
+
+Specs are validated once, the validated spec is cached by the hash of the file so unchanged specs
+aren't parsed or validated again
+"""
+import json
+from os import path
+
+from code_generation import cache
+from code_generation.node_spec import NodeSpec
+from node_types.prop_bool import BoolProp
+from node_types.prop_enum import EnumProp
+from node_types.prop_int import IntProp
+from node_types.socket_color import ColorSocket
+from node_types.socket_float import FloatSocket
+from node_types.socket_vector import VectorSocket
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+# Bump when validation or the validated format changes so stale cache entries aren't used
+SPEC_FORMAT_VERSION = 4
+CACHE_NAMESPACE = 'specs'
+
+NODE_TYPES = ['Shader', 'Texture', 'Curves', 'Bsdf', 'BsdfBase', 'ImageSlotTexture', 'Volume']
+NODE_GROUPS = ['Input', 'Output', 'Shader', 'Texture', 'OP_Color', 'OP_Vector', 'Converter', 'Script', 'Group',
+               'Layout']
+SOCKET_FLAGS = ['hide_label', 'hide_value', 'multi_input', 'no_muted_links', 'is_attribute_name',
+                'is_default_link_socket', 'supports_field', 'implicit_field', 'field_source', 'dependent_field']
+PROP_TYPES = {'Boolean': BoolProp, 'Enum': EnumProp, 'Int': IntProp}
+SOCKET_TYPES = {'Float': FloatSocket, 'Vector': VectorSocket, 'Color': ColorSocket}
+# Orders the gui sorts props and sockets in
+PROP_ORDER = {'Enum': 0, 'Int': 1, 'Boolean': 2}
+SOCKET_ORDER = {'Input': 0, 'Output': 1}
+
+_compiled = {}  # (file hash, source path) -> NodeSpec, specs loaded during this run
+
+
+def _is_objects(items):
+    return isinstance(items, list) and all(isinstance(item, dict) for item in items)
+
+
+def _validate_prop(prop, errors, where):
+    if not prop.get('name'):
+        errors.append('{0} has no name'.format(where))
+    if not prop.get('sub-type'):
+        errors.append('{0} has no sub-type'.format(where))
+    data_type = prop.get('data-type')
+    if data_type not in PROP_TYPES:
+        errors.append('{0} has invalid data-type {1!r}, expected one of {2}'.format(
+            where, data_type, ', '.join(PROP_TYPES)))
+    elif data_type == 'Int':
+        for key in ('min', 'max', 'default'):
+            if not isinstance(prop.get(key), int):
+                errors.append('{0} {1} must be an integer'.format(where, key))
+    elif data_type == 'Boolean':
+        if prop.get('default') not in (0, 1):
+            errors.append('{0} default must be 0 or 1'.format(where))
+    elif data_type == 'Enum':
+        options = prop.get('options')
+        if not options:
+            errors.append('{0} has no options'.format(where))
+        elif not _is_objects(options):
+            errors.append('{0} options must be a list of objects'.format(where))
+        else:
+            names = [option.get('name') for option in options]
+            if not all(names):
+                errors.append('{0} has an option without a name'.format(where))
+            for option in options:
+                if 'desc' not in option:
+                    errors.append('{0} option {1!r} has no desc'.format(where, option.get('name')))
+            if prop.get('default') not in names:
+                errors.append('{0} default {1!r} is not one of its options'.format(where, prop.get('default')))
+
+
+def _validate_socket(socket, errors, where):
+    if not socket.get('name'):
+        errors.append('{0} has no name'.format(where))
+    if socket.get('type') not in SOCKET_ORDER:
+        errors.append('{0} type must be Input or Output'.format(where))
+    if socket.get('data-type') not in SOCKET_TYPES:
+        errors.append('{0} has invalid data-type {1!r}, expected one of {2}'.format(
+            where, socket.get('data-type'), ', '.join(SOCKET_TYPES)))
+    if not socket.get('sub-type'):
+        errors.append('{0} has no sub-type'.format(where))
+    if socket.get('type') == 'Input':
+        for key in ('min', 'max', 'default'):
+            if socket.get(key) is None:
+                errors.append('{0} has no {1}'.format(where, key))
+    if not isinstance(socket.get('flags', []), list):
+        errors.append('{0} flags must be a list'.format(where))
+        return
+    for flag in socket.get('flags', []):
+        if flag not in SOCKET_FLAGS:
+            errors.append('{0} has unknown flag {1!r}'.format(where, flag))
+
+
+def validate_spec(data):
+    """
+    Checks the parsed spec file, every problem is reported at once
+    :return: the spec with optional values filled and props/sockets sorted in the order the writers expect
+    """
+    if not isinstance(data, dict):
+        raise Exception("Invalid node spec: expected an object")
+    errors = []
+    if not data.get('name'):
+        errors.append('node has no name')
+    if data.get('type') not in NODE_TYPES:
+        errors.append('node type must be one of {0}'.format(', '.join(NODE_TYPES)))
+    if data.get('group') not in NODE_GROUPS:
+        errors.append('node group must be one of {0}'.format(', '.join(NODE_GROUPS)))
+    if not isinstance(data.get('constant_fold', False), bool):
+        errors.append('constant_fold must be true or false')
+    props = data.get('props', [])
+    if not _is_objects(props):
+        errors.append('props must be a list of objects')
+        props = []
+    sockets = data.get('sockets', [])
+    if not _is_objects(sockets):
+        errors.append('sockets must be a list of objects')
+        sockets = []
+    sockets = [dict(socket, flags=socket.get('flags', [])) for socket in sockets]
+    for i, prop in enumerate(props):
+        _validate_prop(prop, errors, 'prop {0} ({1})'.format(i, prop.get('name')))
+    for i, socket in enumerate(sockets):
+        _validate_socket(socket, errors, 'socket {0} ({1})'.format(i, socket.get('name')))
+    names = [item.get('name') for item in props + sockets]
+    for name in sorted(set(name for name in names if name and names.count(name) > 1)):
+        errors.append('name {0!r} is used more than once'.format(name))
+    if errors:
+        raise Exception("Invalid node spec:\n  {errors}".format(errors='\n  '.join(errors)))
+
+    return dict(data,
+                props=sorted(props, key=lambda p: PROP_ORDER[p['data-type']]),
+                sockets=sorted(sockets, key=lambda s: SOCKET_ORDER[s['type']]))
+
+
+def parse_spec(text, file_path):
+    """Parses spec file text, the format is chosen by the file extension"""
+    if file_path.endswith('.toml'):
+        if tomllib is None:
+            raise Exception("Loading toml specs requires python 3.11 or the tomli package")
+        return tomllib.loads(text)
+    return json.loads(text)
+
+
+def build_node_spec(data, source_path):
+    """Builds the node spec described by a validated spec"""
+    props = [dict(prop, **{'data-type': PROP_TYPES[prop['data-type']]()}) for prop in data['props']]
+    sockets = [dict(socket, **{'data-type': SOCKET_TYPES[socket['data-type']]()}) for socket in data['sockets']]
+    return NodeSpec.create(source_path, data['name'], data['type'], data['group'], props, sockets,
+                           data.get('constant_fold', False))
+
+
+def load_node_spec(file_path, source_path):
+    """
+    Loads the node spec file at the given path
+    Files which were loaded before, in this run or a previous one, aren't parsed or validated again
+    """
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    file_hash = cache.digest(SPEC_FORMAT_VERSION, path.splitext(file_path)[1], content)
+    if (file_hash, source_path) in _compiled:
+        return _compiled[(file_hash, source_path)]
+
+    data = cache.load(CACHE_NAMESPACE, file_hash)
+    if data is None:
+        try:
+            data = validate_spec(parse_spec(content.decode('utf-8'), file_path))
+        except Exception as e:
+            raise Exception("{path}: {error}".format(path=file_path, error=e))
+        cache.store(CACHE_NAMESPACE, file_hash, data)
+
+    spec = build_node_spec(data, source_path)
+    _compiled[(file_hash, source_path)] = spec
+    return spec
@@ -1,14 +1,45 @@
 from os import path
-from socket import SocketType
-from node_types.prop_bool import BoolProp
 from node_types.prop_enum import EnumProp
-from node_types.prop_int import IntProp
 
+from node_types.socket_color import ColorSocket
 from node_types.socket_vector import VectorSocket
 
 from node_types.socket_float import FloatSocket
 
 import code_generation.code_generator_util as code_generator_util
+from code_generation import render_cache
+from code_generation.node_spec import NodeSpec
+from code_generation.source_tree import SourceTree
+
+# Words of the first svm node after its type, and of the nodes read after it
+FIRST_NODE_WORDS = 3
+NODE_WORDS = 4
+# Props and stack offsets are below 256 so 4 fit in a word with encode_uchar4
+PARAMS_PER_WORD = 4
+
+
+def pack_params(count, constant_count=0):
+    """
+    Layout of the params over the words of the fewest svm nodes, so the kernel reads as few nodes as possible
+    Each param has its own word when the nodes have enough words, otherwise 4 are packed into each word
+    :param constant_count: optional- no. of constants after the params, each takes a whole word after the params words
+    :return: list of nodes, lists of words, lists of the param indices in the word,
+    constants are indexed from count
+    """
+    nodes = 1
+    while True:
+        node_words = FIRST_NODE_WORDS + (nodes - 1) * NODE_WORDS
+        if count + constant_count <= node_words:
+            per_word = 1
+            break
+        if -(-count // PARAMS_PER_WORD) + constant_count <= node_words:
+            per_word = PARAMS_PER_WORD
+            break
+        nodes += 1
+    words = [list(range(count))[i:i + per_word] for i in range(0, count, per_word)]
+    words += [[count + i] for i in range(constant_count)]
+    return [words[:FIRST_NODE_WORDS]] + [words[i:i + NODE_WORDS]
+                                         for i in range(FIRST_NODE_WORDS, len(words), NODE_WORDS)]
 
 
 class SVMWriter:
@@ -17,107 +48,112 @@ class SVMWriter:
     Keeps svm parameters consistent between files
     """
 
-    def __init__(self, gui):
-        self._props = gui.get_props()
-        self._sockets = gui.get_node_sockets()
-        self._node_name = gui.get_node_name()
-        self._is_texture_node = gui.is_texture_node()
-        self._type_suffix = gui.type_suffix()
-        self._type_suffix_abbreviated = gui.type_suffix_abbreviated()
-        self._uses_texture_mapping = gui.uses_texture_mapping()
-        self._source_path = gui.get_source_path()
-
-    def _generate_param_names(self):
-        """How the props/sockets are passed to the compiler"""
-        names = []
-        for prop in self._props:
-            names.append(code_generator_util.string_lower_underscored(
-                code_generator_util.string_lower_underscored(prop['name'])))
+    def __init__(self, gui, source_tree=None):
+        self._spec = NodeSpec.from_gui(gui)
+        self._props = self._spec.get_props()
+        self._sockets = self._spec.get_node_sockets()
+        self._node_name = self._spec.get_node_name()
+        self._is_texture_node = self._spec.is_texture_node()
+        self._type_suffix = self._spec.type_suffix()
+        self._type_suffix_abbreviated = self._spec.type_suffix_abbreviated()
+        self._uses_texture_mapping = self._spec.uses_texture_mapping()
+        self._source_path = self._spec.get_source_path()
+        self._source_tree = source_tree if source_tree is not None else SourceTree(self._source_path)
+
+    def _param_name(self, item):
+        """How the prop/socket is passed to the compiler and unpacked in the shader"""
+        if self._is_socket(item):
+            return '{name}_stack_offset'.format(name=item.name_lower_underscored)
+        return item.name_lower_underscored
+
+    def _is_mapped_vector(self, socket):
+        """Returns if the socket is the vector input whose stack offset comes from the texture mapping"""
+        vectors = [s for s in self._sockets if isinstance(s['data-type'], VectorSocket) and s['type'] == 'Input']
+        return self._is_texture_node and len(vectors) > 0 and socket == vectors[0]
+
+    def _default_words(self):
+        """
+        Words the defaults of the inputs are passed to the shader in, used when the input isn't linked
+        :return: list of (socket, component), the component of vectors/colors is 'x', 'y' or 'z', None for floats
+        """
+        words = []
         for socket in self._sockets:
-            names.append(
-                '{name}_stack_offset'.format(name=code_generator_util.string_lower_underscored(socket['name'])))
-        return names
+            if socket['type'] != 'Input' or self._is_mapped_vector(socket):
+                continue
+            if isinstance(socket['data-type'], FloatSocket):
+                words.append((socket, None))
+            elif isinstance(socket['data-type'], (VectorSocket, ColorSocket)):
+                words.extend((socket, component) for component in 'xyz')
+        return words
+
+    def _param_layout(self):
+        """
+        Words of the svm nodes the props/sockets are passed in, see pack_params
+        A word is a list of the props/sockets packed in it, or the (socket, component) of the default it holds
+        """
+        items = self._props + self._sockets
+        defaults = self._default_words()
+        return [[[items[i] for i in word] if word[0] < len(items) else defaults[word[0] - len(items)]
+                 for word in node] for node in pack_params(len(items), len(defaults))]
+
+    def _is_default_word(self, word):
+        """Returns if the word holds the default of an input"""
+        return isinstance(word, tuple)
+
+    def _default_word_name(self, word):
+        socket, component = word
+        return '{name}_default{component}'.format(name=socket.name_lower_underscored,
+                                                  component='_' + component if component else '')
+
+    def _generate_svm_word(self, word):
+        """A word of an svm node, a single param is passed as is"""
+        if self._is_default_word(word):
+            socket, component = word
+            return '__float_as_int({name}{component})'.format(name=socket.name_lower_underscored,
+                                                              component='.' + component if component else '')
+        names = [self._param_name(item) for item in word]
+        if len(names) == 1:
+            return names[0]
+        return 'compiler.encode_uchar4({params})'.format(params=', '.join(names))
 
     def _generate_svm_params(self):
-        """Generates svm node parameters"""
-        param_names = self._generate_param_names()
-        uchar4 = 'compiler.encode_uchar4({params})'
-        if len(param_names) < 4:
-            return ', '.join(param_names)
-        elif len(param_names) == 4:
-            return ', '.join([', '.join(param_names[:2]), uchar4.format(params=', '.join(param_names[2:]))])
-        elif len(param_names) == 5:
-            return ', '.join([uchar4.format(params=', '.join(param_names[:2])),
-                              uchar4.format(params=', '.join(param_names[2:4])),
-                              param_names[-1]])
-        elif len(param_names) == 6:
-            return ', '.join([uchar4.format(params=', '.join(param_names[:3])),
-                              uchar4.format(params=', '.join(param_names[3:]))])
-        elif len(param_names) == 7:
-            return ', '.join([uchar4.format(params=', '.join(param_names[:3])),
-                              uchar4.format(params=', '.join(param_names[3:6])),
-                              param_names[-1]])
-        elif len(param_names) == 8:
-            return ', '.join([uchar4.format(params=', '.join(param_names[:4])),
-                              uchar4.format(params=', '.join(param_names[4:7])),
-                              param_names[-1]])
-        elif len(param_names) == 9:
-            return ', '.join([uchar4.format(params=', '.join(param_names[:4])),
-                              uchar4.format(params=', '.join(param_names[4:8])),
-                              param_names[-1]])
-        elif len(param_names) >= 10 and len(param_names) <= 12:
-            return ', '.join(uchar4.format(
-                params=', '.join(
-                    param_names[i:(i + 4) if i + 4 < len(param_names) else 2 * (i + 4) - len(param_names)]))
-                             for i in range(0, len(param_names), 4))
+        """Generates the words of each svm node the props/sockets are passed in"""
+        return [[self._generate_svm_word(word) for word in node] for node in self._param_layout()]
 
     def _generate_get_sockets(self):
         """Generate retrieving """
         return ''.join('Shader{Type} *{name}_{type} = {type}put("{Name}");'.format(
             Type=socket['type'].capitalize(),
-            name=code_generator_util.string_lower_underscored(socket['name']),
+            name=socket.name_lower_underscored,
             type=socket['type'][:-3].lower(),
-            Name=code_generator_util.string_capitalized_spaced(socket['name'])) for socket in self._sockets)
+            Name=socket.name_capitalized_spaced) for socket in self._sockets)
 
     def _generate_stack_offsets(self):
-
-        def is_first_vector(socket, sockets):
-            return socket == list(filter(lambda s: isinstance(s['data-type'], VectorSocket) and s['type'] == 'Input', sockets))[0]
-
         socket_type_map = {"Input": 'in', "Output": 'out'}
 
         stack_offsets = []
         for socket in self._sockets:
-            if isinstance(socket['data-type'], VectorSocket) and self._is_texture_node and socket['type'] == 'Input' and is_first_vector(socket, self._sockets):
+            if socket['type'] == 'Input' and self._is_mapped_vector(socket):
                 stack_offsets.append('int {name}_stack_offset = tex_mapping.compile_begin(compiler, {name}_in);'.format(
-                    name=code_generator_util.string_lower_underscored(socket['name'])))
-            elif isinstance(socket['data-type'], FloatSocket) and socket['type'] == 'Input':
-                stack_offsets.append('int {name}_stack_offset = compiler.stack_assign_if_linked({name}_in);'.format(
-                    name=code_generator_util.string_lower_underscored(socket['name'])))
+                    name=socket.name_lower_underscored))
             else:
-                stack_offsets.append('int {name}_stack_offset = compiler.stack_assign({name}_{type});'.format(
-                    name=code_generator_util.string_lower_underscored(socket['name']),
+                # Unlinked inputs get an invalid offset so the shader uses their default, and outputs so it skips them
+                stack_offsets.append('int {name}_stack_offset = compiler.stack_assign_if_linked({name}_{type});'.format(
+                    name=socket.name_lower_underscored,
                     type=socket_type_map[socket['type']]))
         return ''.join(stack_offsets)
 
-    def _generate_float_optimizations(self):
-        """Generate code for passing floats directly to shader for optimization"""
-        inputs = ['__float_as_int({socket})'.format(socket=code_generator_util.string_lower_underscored(socket['name']))
-                  for socket in self._sockets if isinstance(socket['data-type'], FloatSocket) and socket['type'] == 'Input']
-
-        return ''.join('compiler.add_node({params});'.format(
-            params=', '.join(inputs[i:(i + 4) if i + 4 < len(inputs) else 2 * (i + 4) - len(inputs)])) for i in
-                       range(0, len(inputs), 4))
-
     def _generate_add_node(self):
-        # TODO For nodes with less than 3 params, add any float optimizations to the same node
-        return 'compiler.add_node(NODE_{SUFF}{NAME}, ' \
-               '{params});{optimizations}'.format(
-            SUFF='{SUFF}_'.format(SUFF=self._type_suffix_abbreviated.upper()) if self._type_suffix_abbreviated else '',
-            NAME=code_generator_util.string_upper_underscored(self._node_name),
-            params=self._generate_svm_params(),
-            optimizations=self._generate_float_optimizations()) if len(self._props) + len(self._sockets) < 13 else ''
-
+        nodes = self._generate_svm_params()
+        return 'compiler.add_node(NODE_{SUFF}{NAME}{params});{nodes}'.format(
+            SUFF=self._spec.suffix_abbreviated_prefix_upper,
+            NAME=self._spec.name_upper_underscored,
+            params=''.join(', {word}'.format(word=word) for word in nodes[0]),
+            # add_node only takes all 4 words of the following nodes
+            nodes=''.join('compiler.add_node({words});'.format(
+                words=', '.join(node + ['0'] * (NODE_WORDS - len(node)))) for node in nodes[1:]))
+
+    @render_cache.rendered
     def generate_svm_compile_func(self):
         """SVM compile function for nodes.cpp"""
         if self._uses_texture_mapping:
@@ -128,188 +164,99 @@ class SVMWriter:
                '{{' \
                '{body}' \
                '{texture_mapping}' \
-               '}}\n\n'.format(Name=code_generator_util.string_capitalized_no_space(self._node_name),
+               '}}\n\n'.format(Name=self._spec.name_capitalized_no_space,
                                Suffix=self._type_suffix.capitalize(),
                                body='\n\n'.join(
                                    [self._generate_get_sockets(), self._generate_stack_offsets(),
                                     self._generate_add_node()]),
                                texture_mapping='\n\ntex_mapping.compile_end(compiler, {name}_in, {name}_stack_offset);'.format(
-                                   name=code_generator_util.string_lower_underscored(first_input_vector['name'])
+                                   name=first_input_vector.name_lower_underscored
                                ) if self._uses_texture_mapping else '')
 
-    def _passed_params_count(self):
-        """Returns the no. of props/sockets passed to the shader"""
-        return len(self._props) + len(self._sockets)
-
-    def _unpack_names(self):
-        def unpack_name(item):
-            name = code_generator_util.string_lower_underscored(item['name'])
-            if isinstance(item['data-type'], (BoolProp, IntProp, EnumProp)):
-                return name
-            else:
-                return '{name}_stack_offset'.format(name=name)
-
-        return [unpack_name(item) for item in self._props + self._sockets]
+    def _shader_word_names(self):
+        """Names of the words of each svm node in the shader, packed words are unpacked from stack_offsets"""
+        names = []
+        packed = 0
+        for node in self._param_layout():
+            node_names = []
+            for word in node:
+                if self._is_default_word(word):
+                    node_names.append(self._default_word_name(word))
+                elif len(word) == 1:
+                    node_names.append(self._param_name(word[0]))
+                else:
+                    packed += 1
+                    node_names.append('stack_offsets{i}'.format(i=packed))
+            names.append(node_names)
+        return names
 
     def _generate_offset_definitions(self):
-        names = self._unpack_names()
-
-        offset_def = 'uint {names};'
-
-        if len(names) < 4:
-            return ''
-        if len(names) == 4:
-            return offset_def.format(names=', '.join(names[2:]))
-        elif len(names) == 5:
-            return offset_def.format(names=', '.join(names[:4]))
-        elif len(names) == 6:
-            return ''.join([offset_def.format(names=', '.join(names[:3])),
-                            offset_def.format(names=', '.join(names[3:]))])
-        elif len(names) == 7:
-            return ''.join([offset_def.format(names=', '.join(names[:3])),
-                            offset_def.format(names=', '.join(names[3:6]))])
-        elif len(names) == 8 or len(names) == 9:
-            return ''.join([offset_def.format(names=', '.join(names[:4])),
-                            offset_def.format(names=', '.join(names[4:8]))])
-        elif len(names) >= 10 and len(names) <= 12:
-            return ''.join([offset_def.format(
-                names=', '.join(names[i:(i + 4) if i + 4 < len(names) else 2 * (i + 4) - len(names)]))
-                for i in range(0, len(names), 4)])
+        return ''.join('uint {names};'.format(names=', '.join(self._param_name(item) for item in word))
+                       for node in self._param_layout() for word in node
+                       if not self._is_default_word(word) and len(word) > 1)
 
     def _generate_unpack(self):
-        names = self._unpack_names()
-        unpack_uchar = 'svm_unpack_node_uchar{count}(stack_offsets{offset_count}, {params});'
-
-        if len(names) < 4:
-            return ''
-        elif len(names) == 4:
-            return unpack_uchar.format(
-                count=2,
-                offset_count='',
-                params=', '.join('&{name}'.format(name=name) for name in names[2:])
-            )
-        elif len(names) == 5:
-            return ''.join([unpack_uchar.format(
-                count=2,
-                offset_count=1,
-                params=', '.join('&{name}'.format(name=name) for name in names[:2])
-            ), unpack_uchar.format(
-                count=2,
-                offset_count=2,
-                params=', '.join('&{name}'.format(name=name) for name in names[2:4])
-            )])
-        elif len(names) == 6:
-            return ''.join([unpack_uchar.format(
-                count=3,
-                offset_count=1,
-                params=', '.join('&{name}'.format(name=name) for name in names[:3])
-            ), unpack_uchar.format(
-                count=3,
-                offset_count=2,
-                params=', '.join('&{name}'.format(name=name) for name in names[3:])
-            )])
-        elif len(names) == 7:
-            return ''.join([unpack_uchar.format(
-                count=3,
-                offset_count=1,
-                params=', '.join('&{name}'.format(name=name) for name in names[:3])
-            ), unpack_uchar.format(
-                count=3,
-                offset_count=2,
-                params=', '.join('&{name}'.format(name=name) for name in names[3:6])
-            )
-            ])
-        elif len(names) == 8:
-            return ''.join([unpack_uchar.format(
-                count=4,
-                offset_count=1,
-                params=', '.join('&{name}'.format(name=name) for name in names[:4])
-            ), unpack_uchar.format(
-                count=3,
-                offset_count=2,
-                params=', '.join('&{name}'.format(name=name) for name in names[4:7])
-            )
-            ])
-        elif len(names) == 9:
-            return ''.join([unpack_uchar.format(
-                count=4,
-                offset_count=1,
-                params=', '.join('&{name}'.format(name=name) for name in names[:4])
-            ), unpack_uchar.format(
-                count=4,
-                offset_count=2,
-                params=', '.join('&{name}'.format(name=name) for name in names[4:8])
-            )
-            ])
-        elif len(names) >= 10 and len(names) <= 12:
-            return ''.join([unpack_uchar.format(
-                count=4 if i + 4 <= len(names) else i + 4 - len(names),
-                offset_count=i // 4 + 1,
-                params=', '.join('&{name}'.format(
-                    name=name) for name in names[i:(i + 4) if i + 4 < len(names) else 2 * (i + 4) - len(names)]))
-                for i in range(0, len(names), 4)
-            ])
+        """Reads the nodes after the first and unpacks the packed words"""
+        unpack = []
+        for i, (node, names) in enumerate(zip(self._param_layout(), self._shader_word_names())):
+            if i > 0:
+                unpack.append('uint4 node{i} = read_node(kg, &offset);'.format(i=i + 1))
+            for j, (word, name) in enumerate(zip(node, names)):
+                address = 'node{i}.{address}'.format(i=i + 1, address='xyzw'[j]) if i > 0 else name
+                if not self._is_default_word(word) and len(word) > 1:
+                    unpack.append('svm_unpack_node_uchar{count}({word}, {params});'.format(
+                        count=len(word),
+                        word=address,
+                        params=', '.join('&{name}'.format(name=self._param_name(item)) for item in word)))
+                elif i > 0:
+                    unpack.append('uint {name} = {address};'.format(name=name, address=address))
+        return ''.join(unpack)
 
     def _generate_load_params(self):
-        load = ['uint4 defaults{i} = read_node(kg, &offset);'.format(i=i // 4 + 1) for i in range(0, len(
-            [socket for socket in self._sockets if socket['type'] == 'Input' and isinstance(socket['data-type'], FloatSocket)]), 4)]
-        if len(load) > 0:
-            load.append('\n\n')
-
-        float_i = 0
-        type_map = {'Float': 'float', 'Vector': 'float3', 'Color': 'float3', 'Int': 'int', 'Shader': 'float3'}
+        """Loads the inputs, inputs which aren't linked use the default passed in the words of the svm nodes"""
+        load = []
         for socket in self._sockets:
-            if socket['type'] == 'Input':
-                load.append(
-                    '{type} {name} = stack_load_{type}{default}(stack, {name}_stack_offset{default_address});'.format(
-                        type=socket['data-type'].svm_name,
-                        name=code_generator_util.string_lower_underscored(socket['name']),
-                        default='_default' if isinstance(socket['data-type'], FloatSocket) else '',
-                        default_address=', {node}.{address}'.format(
-                            node='defaults{i}'.format(i=float_i // 4 + 1),
-                            address=['x', 'y', 'z', 'w'][float_i % 4]) if isinstance(socket['data-type'], FloatSocket) else ''
-                    ))
-                if isinstance(socket['data-type'], FloatSocket):
-                    float_i += 1
+            if socket['type'] != 'Input':
+                continue
+            name = socket.name_lower_underscored
+            if isinstance(socket['data-type'], FloatSocket):
+                load.append('float {name} = stack_load_float_default(stack, {name}_stack_offset, {name}_default);'.format(
+                    name=name))
+            elif isinstance(socket['data-type'], (VectorSocket, ColorSocket)) and not self._is_mapped_vector(socket):
+                load.append('float3 {name} = stack_valid({name}_stack_offset) ? '
+                            'stack_load_float3(stack, {name}_stack_offset) : '
+                            'make_float3(__uint_as_float({name}_default_x), __uint_as_float({name}_default_y), '
+                            '__uint_as_float({name}_default_z));'.format(name=name))
+            else:
+                load.append('{type} {name} = stack_load_{type}(stack, {name}_stack_offset);'.format(
+                    type=socket['data-type'].svm_name, name=name))
         return ''.join(load)
 
+    def _generate_store_outputs(self):
+        """Stores each output in its own block, skipped when the output isn't linked"""
+        defaults = {'float': '0.0f', 'float3': 'zero_float3()'}
+        return ''.join('if (stack_valid({name}_stack_offset)) {{'
+                       '/* Compute {name} from the inputs */'
+                       '{type} {name} = {default};'
+                       'stack_store_{type}(stack, {name}_stack_offset, {name});'
+                       '}}'.format(type=socket['data-type'].svm_name,
+                                   name=socket.name_lower_underscored,
+                                   default=defaults[socket['data-type'].svm_name])
+                       for socket in self._sockets if socket['type'] == 'Output')
+
     def _is_socket(self, item):
         """Returns if the item is a sockets"""
         return 'type' in item
 
     def _generate_shader_params(self):
         """Parameters in shader"""
-        num_params = self._passed_params_count()
-        items = [item for item in self._props + self._sockets]
-        if num_params < 4:
-            params = ', '.join('uint {name}{suffix}'.format(
-                name=code_generator_util.string_lower_underscored(item['name']),
-                suffix='_stack_offset' if self._is_socket(item) else '') for item in items)
-        elif num_params == 4:
-            params = ', '.join('uint {name}{suffix}'.format(
-                name=code_generator_util.string_lower_underscored(item['name']),
-                suffix='_stack_offset' if self._is_socket(item) else '') for item in items[:2]
-                               ) + ', uint stack_offsets'
-        elif num_params == 5:
-            params = 'uint stack_offsets1, uint stack_offsets2, uint {name}{suffix}'.format(
-                name=code_generator_util.string_lower_underscored(items[-1]['name']),
-                suffix='_stack_offset' if self._is_socket(items[-1]) else '')
-        elif num_params == 6:
-            params = 'uint stack_offsets1, uint stack_offsets2'
-        elif num_params == 7 or num_params == 8 or num_params == 9:
-            params = 'uint stack_offsets1, uint stack_offsets2, uint {name}{suffix}'.format(
-                name=code_generator_util.string_lower_underscored(items[-1]['name']),
-                suffix='_stack_offset' if self._is_socket(items[-1]) else '')
-        elif num_params >= 10 and num_params <= 12:
-            params = 'uint stack_offsets1, uint stack_offsets2, uint stack_offsets3'
-
         return '{params}{offset}'.format(
-            params=params,
-            offset=', int offset' if any(isinstance(socket['data-type'], FloatSocket) for socket in self._sockets) else '')
+            params=', '.join('uint {name}'.format(name=name) for name in self._shader_word_names()[0]),
+            offset=', int offset' if self._has_multiple_nodes() else '')
 
     def _generate_shader_file_name(self):
         return "{name}".format(
-            name=code_generator_util.string_lower_underscored(self._node_name)
+            name=self._spec.name_lower_underscored
         )
 
     def _generate_svm_shader(self):
@@ -325,28 +272,32 @@ class SVMWriter:
                '{{' \
                '{offset_defs}\n\n' \
                '{unpack_params}\n\n' \
-               '{load_params}' \
+               '{load_params}\n\n' \
+               '{store_outputs}' \
                '{return_statement}' \
                '}}\n\n' \
                'CCL_NAMESPACE_END\n\n'.format(return_type='int' if self._has_multiple_nodes() else 'void',
-                   suff='{suff}_'.format(suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-                                              name=code_generator_util.string_lower_underscored(self._node_name),
+                   suff=self._spec.suffix_abbreviated_prefix,
+                                              name=self._spec.name_lower_underscored,
                                               params=',{params}'.format(params=params) if params else '',
                                               offset_defs=self._generate_offset_definitions(),
                                               unpack_params=self._generate_unpack(),
                                               load_params=self._generate_load_params(),
+                                              store_outputs=self._generate_store_outputs(),
                                               return_statement='return offset;' if self._has_multiple_nodes() else '')
 
+    @render_cache.rendered
+    def _generate_svm_shader_file(self):
+        """Contents of the svm shader file"""
+        return code_generator_util.license_text() + self._generate_svm_shader()
+
     def add_svm_shader(self):
         """svm_*.h"""
         file_path = path.join(self._source_path, "intern", "cycles", "kernel", "svm", "{shader_file_name}.h".format(
             shader_file_name=self._generate_shader_file_name()))
-        with open(file_path, 'w') as f:
-            code_generator_util.write_license(f)
-            if len(self._props) + len(self._sockets) < 13:
-                f.write(self._generate_svm_shader())
-        code_generator_util.apply_clang_formatting(file_path, self._source_path)
+        self._source_tree.write(file_path, self._generate_svm_shader_file(), formatted=True)
 
+    @render_cache.rendered
     def _generate_svm_shader_include(self):
         """Include statement for svm.h"""
         return '#include "kernel/svm/{shader_file_name}.h"\n'.format(
@@ -354,101 +305,65 @@ class SVMWriter:
 
     def _has_multiple_nodes(self):
         """Returns whether the shader requires multiple nodes for passing parameters"""
-        param_count = 0
-        for param in self._props + self._sockets:
-            if param['data-type'] == 'Float' or isinstance(param['data-type'], FloatSocket):
-                # Float optimizations are added in a separate node
-                return True
-            else:
-                param_count += 1
-        # 3 uchar4's = 3*4 = 12 max params for one node
-        return param_count > 12
+        return len(self._param_layout()) > 1
 
     def _generate_svm_shader_passed_params(self):
-        """Params passed when the shader is called"""
-        num_params = self._passed_params_count()
-        if num_params in [2, 6]:
-            return 'node.y, node.z'
-        elif num_params > 2:
-            return 'node.y, node.z, node.w'
-        elif num_params == 1:
-            return 'node.y'
-        elif num_params == 0:
-            return ''
+        """Params passed when the shader is called, the words of the first node"""
+        return ', '.join('node.{address}'.format(address='yzw'[i]) for i in range(len(self._param_layout()[0])))
 
+    @render_cache.rendered
     def _generate_svm_shader_case(self):
         """Case to pass parameters to shader in svm.h"""
         params=self._generate_svm_shader_passed_params()
         return 'case NODE_{SUFF}{NAME}:' \
                '{set_offset}svm_node_{suff}{name}(kg, sd, stack{params}{offset});' \
                'break;\n'.format(
-            SUFF='{SUFF}_'.format(SUFF=self._type_suffix_abbreviated.upper()) if self._type_suffix_abbreviated else '',
-            NAME=code_generator_util.string_upper_underscored(self._node_name),
+            SUFF=self._spec.suffix_abbreviated_prefix_upper,
+            NAME=self._spec.name_upper_underscored,
             set_offset='offset = ' if self._has_multiple_nodes() else '',
-            suff='{suff}_'.format(suff=self._type_suffix_abbreviated) if self._type_suffix_abbreviated else '',
-            name=code_generator_util.string_lower_underscored(self._node_name),
+            suff=self._spec.suffix_abbreviated_prefix,
+            name=self._spec.name_lower_underscored,
             params=', {params}'.format(params=params) if params else '',
             offset=', offset' if self._has_multiple_nodes() else ''
         )
 
+    def required_anchors(self):
+        """(file path, anchor name) of the insertion points used by the writer"""
+        svm_path = path.join(self._source_path, "intern", "cycles", "kernel", "svm", "svm.h")
+        types_path = path.join(self._source_path, "intern", "cycles", "kernel", "svm", "types.h")
+        return [(svm_path, 'svm_includes_end'), (svm_path, 'svm_cases_start'),
+                (types_path, 'shader_node_types_end'), (types_path, 'shader_node_types_after')]
+
     def add_register_svm(self):
         """Include and register svm shader in svm.h"""
         file_path = path.join(self._source_path, "intern", "cycles", "kernel", "svm", "svm.h")
-        with open(file_path, 'r+') as f:
-            include_statement = self._generate_svm_shader_include()
-
-            shader_case = self._generate_svm_shader_case()
+        include_statement = self._generate_svm_shader_include()
 
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                if line == '#ifdef __SHADER_RAYTRACE__\n':
-                    lines.insert(i - 1, include_statement)
-                    break
-            else:
-                raise Exception("No match found")
+        shader_case = self._generate_svm_shader_case()
 
-            for i, line in enumerate(lines):
-                if line == '    switch (node.x) {\n':
-                    lines.insert(i + 1, shader_case)
-                    break
-            else:
-                raise Exception("No match found")
-
-            f.seek(0)
-            f.writelines(lines)
-            f.truncate()
-        code_generator_util.apply_clang_formatting(file_path, self._source_path)
+        self._source_tree.insert(file_path, self._source_tree.anchor(file_path, 'svm_includes_end'),
+                                 include_statement, formatted=True)
+        self._source_tree.insert(file_path, self._source_tree.anchor(file_path, 'svm_cases_start'),
+                                 shader_case, formatted=True)
 
+    @render_cache.rendered
     def _generate_enum_typedefs(self):
         """Generate enum typedefs"""
         return ''.join(['typedef enum Node{Name}{Prop} {{{options}}} Node{Name}{Prop};\n\n'.format(
-            Name=code_generator_util.string_capitalized_no_space(self._node_name),
-            Prop=code_generator_util.string_capitalized_no_space(prop['name']),
+            Name=self._spec.name_capitalized_no_space,
+            Prop=prop.name_capitalized_no_space,
             options=','.join(['NODE_{NAME}_{OPTION} = {i}'.format(
-                NAME=code_generator_util.string_upper_underscored(self._node_name),
-                OPTION=code_generator_util.string_upper_underscored(option['name']),
+                NAME=self._spec.name_upper_underscored,
+                OPTION=option.name_upper_underscored,
                 i=i + 1) for i, option in enumerate(prop['options'])]))
             for prop in self._props if isinstance(prop['data-type'], EnumProp)])
 
     def add_svm_types(self):
         """Register node types in types.h"""
         file_path = path.join(self._source_path, "intern", "cycles", "kernel", "svm", "types.h")
-        with open(file_path, 'r+') as f:
-            lines = f.readlines()
-            for i, line in enumerate(lines):
-                if line == '} ShaderNodeType;\n':
-                    lines.insert(i, 'NODE_{SUFF}{NAME},'.format(
-                        SUFF='{SUFF}_'.format(
-                            SUFF=self._type_suffix_abbreviated.upper()) if self._type_suffix_abbreviated else '',
-                        NAME=code_generator_util.string_upper_underscored(self._node_name)
-                    ))
-                    lines.insert(i + 2, '\n')
-                    lines.insert(i + 3, self._generate_enum_typedefs())
-                    break
-            else:
-                raise Exception("Match not found")
-
-            f.seek(0)
-            f.writelines(lines)
-            f.truncate()
-        code_generator_util.apply_clang_formatting(file_path, self._source_path)
+        self._source_tree.insert(file_path, self._source_tree.anchor(file_path, 'shader_node_types_end'),
+                                 'NODE_{SUFF}{NAME},\n'.format(SUFF=self._spec.suffix_abbreviated_prefix_upper,
+                                                               NAME=self._spec.name_upper_underscored),
+                                 formatted=True)
+        self._source_tree.insert(file_path, self._source_tree.anchor(file_path, 'shader_node_types_after'),
+                                 '\n' + self._generate_enum_typedefs(), formatted=True)
@@ -0,0 +1,182 @@
+"""
+Minimal stand in for a blender source tree, containing just enough of each file edited by the generator
+"""
+import os
+from os import path
+from unittest import mock
+from unittest.mock import patch
+
+from code_generation import cache
+
+from node_types.prop_bool import BoolProp
+from node_types.prop_enum import EnumProp
+from node_types.prop_int import IntProp
+from node_types.socket_float import FloatSocket
+
+FILES = {
+    ('release', 'scripts', 'startup', 'nodeitems_builtins.py'):
+        'shader_node_categories = [\n'
+        '    ShaderNodeCategory("SH_NEW_SHADER", "Shader", items=[\n'
+        '        NodeItem("ShaderNodeMixShader", poll=eevee_cycles_shader_nodes_poll),\n'
+        '        NodeItem("ShaderNodeAddShader", poll=eevee_cycles_shader_nodes_poll)\n'
+        '    ]),\n'
+        ']\n',
+    ('source', 'blender', 'blenkernel', 'BKE_node.h'):
+        '#define SH_NODE_VOLUME_INFO 705\n'
+        '#define SH_NODE_VERTEX_COLOR 706\n'
+        '\n'
+        '/* custom defines options for Material node */\n'
+        '#define SH_NODE_MAT_DIFF 1\n',
+    ('source', 'blender', 'blenkernel', 'intern', 'node.cc'):
+        'static void registerShaderNodes()\n'
+        '{\n'
+        '  register_node_type_sh_add_shader();\n'
+        '}\n',
+    ('source', 'blender', 'nodes', 'NOD_static_types.h'):
+        'DefNode(ShaderNode,     SH_NODE_TEX_WHITE_NOISE,    def_sh_tex_white_noise, "TEX_WHITE_NOISE",    TexWhiteNoise,    "White Noise",       ""       )\n'
+        '\n'
+        'DefNode(CompositorNode, CMP_NODE_VIEWER,         def_cmp_viewer,         "VIEWER",         Viewer,           "Viewer",            ""              )\n',
+    ('source', 'blender', 'nodes', 'NOD_shader.h'):
+        'void register_node_type_sh_add_shader(void);\n'
+        '\n'
+        'void register_node_type_sh_custom_group(bNodeType *ntype);\n',
+    ('source', 'blender', 'nodes', 'shader', 'CMakeLists.txt'):
+        'set(SRC\n'
+        '  nodes/node_shader_add_shader.cc\n'
+        ')\n',
+    ('source', 'blender', 'makesdna', 'DNA_node_types.h'):
+        'typedef struct NodeTexWhiteNoise {\n'
+        '  NodeTexBase base;\n'
+        '  int dimensions;\n'
+        '} NodeTexWhiteNoise;\n'
+        '\n'
+        '/* Output shader node */\n'
+        '#define SHD_OUTPUT_ALL 0\n',
+    ('source', 'blender', 'makesrna', 'intern', 'rna_nodetree.c'):
+        '#ifndef RNA_RUNTIME\n'
+        'static const EnumPropertyItem node_filter_items[] = {\n'
+        '  {0, NULL, 0, NULL, NULL},\n'
+        '};\n'
+        '#endif\n'
+        '\n'
+        '/* -- Compositor Nodes ------------------------------------------------------ */\n',
+    ('source', 'blender', 'editors', 'space_node', 'drawnode.cc'):
+        '/* only once called */\n'
+        'static void node_shader_set_butfunc(bNodeType *ntype)\n'
+        '{\n'
+        '  switch (ntype->type) {\n'
+        '    case SH_NODE_TEX_WHITE_NOISE:\n'
+        '      ntype->draw_buttons = node_shader_buts_white_noise;\n'
+        '      break;\n'
+        '  }\n'
+        '}\n',
+    ('intern', 'cycles', 'scene', 'shader_nodes.h'):
+        'class VectorDisplacementNode : public ShaderNode {\n'
+        ' public:\n'
+        '  SHADER_NODE_CLASS(VectorDisplacementNode)\n'
+        '};\n'
+        '\n'
+        'CCL_NAMESPACE_END\n'
+        '\n'
+        '#endif /* __NODES_H__ */\n',
+    ('intern', 'cycles', 'scene', 'shader_nodes.cpp'):
+        'CCL_NAMESPACE_BEGIN\n'
+        '\n'
+        'CCL_NAMESPACE_END\n',
+    ('intern', 'cycles', 'blender', 'shader.cpp'):
+        'static ShaderNode *add_node(Scene *scene,\n'
+        '                            BL::ShaderNode &b_node)\n'
+        '{\n'
+        '  ShaderNode *node = NULL;\n'
+        '  if (b_node.is_a(&RNA_ShaderNodeRGBCurve)) {\n'
+        '    node = graph->create_node<RGBCurvesNode>();\n'
+        '  }\n'
+        '  else if (b_node.is_a(&RNA_ShaderNodeVectorDisplacement)) {\n'
+        '    node = graph->create_node<VectorDisplacementNode>();\n'
+        '  }\n'
+        '\n'
+        '  if (node) {\n'
+        '    graph->add(node);\n'
+        '  }\n'
+        '  return node;\n'
+        '}\n',
+    ('intern', 'cycles', 'kernel', 'CMakeLists.txt'):
+        'set(SRC_KERNEL_SVM_HEADERS\n'
+        '  svm/svm.h\n'
+        '  svm/ao.h\n'
+        ')\n',
+    ('intern', 'cycles', 'kernel', 'osl', 'shaders', 'CMakeLists.txt'):
+        'set(SRC_OSL\n'
+        '  node_add_closure.osl\n'
+        ')\n',
+    ('intern', 'cycles', 'kernel', 'svm', 'svm.h'):
+        '#include "kernel/svm/ao.h"\n'
+        '\n'
+        '#ifdef __SHADER_RAYTRACE__\n'
+        '#  include "kernel/svm/bevel.h"\n'
+        '#endif\n'
+        '\n'
+        '    switch (node.x) {\n'
+        '      case NODE_END:\n'
+        '        return;\n'
+        '    }\n',
+    ('intern', 'cycles', 'kernel', 'svm', 'types.h'):
+        'typedef enum ShaderNodeType {\n'
+        '  NODE_END = 0,\n'
+        '} ShaderNodeType;\n',
+}
+
+NEW_FILE_DIRECTORIES = [
+    ('intern', 'cycles', 'kernel', 'osl', 'shaders'),
+    ('source', 'blender', 'gpu', 'shaders', 'material'),
+    ('source', 'blender', 'nodes', 'shader', 'nodes'),
+]
+
+
+def create(root):
+    """Writes the fake blender tree to the given directory and returns the source path"""
+    for parts, text in FILES.items():
+        file_path = path.join(root, *parts)
+        os.makedirs(path.dirname(file_path), exist_ok=True)
+        with open(file_path, 'w') as f:
+            f.write(text)
+    for parts in NEW_FILE_DIRECTORIES:
+        os.makedirs(path.join(root, *parts), exist_ok=True)
+    return root
+
+
+def isolated_cache(root):
+    """Patch which keeps the generators on disk cache inside the fake tree's directory"""
+    return patch.dict(os.environ, {cache.CACHE_DIR_ENV: path.join(root, '.cache')})
+
+
+def read(root, *parts):
+    with open(path.join(root, *parts)) as f:
+        return f.read()
+
+
+def mock_gui(source_path, node_name='node name'):
+    """Mock gui for a shader node with the default props and sockets used across the tests"""
+    gui = mock.Mock()
+    gui.get_node_name.return_value = node_name
+    gui.get_node_type.return_value = 'Shader'
+    gui.get_node_group.return_value = 'Shader'
+    gui.get_source_path.return_value = source_path
+    gui.get_props.return_value = [
+        {"name": "dropdown1", 'data-type': EnumProp(), "sub-type": "PROP_NONE",
+         "options": [{"name": "prop1", "desc": "Short description"},
+                     {"name": "prop2", "desc": "Short description"}],
+         "default": 'prop1'},
+        {"name": "int1", 'data-type': IntProp(), "sub-type": "PROP_NONE", "default": 0, "min": -1, "max": 1},
+        {"name": "box1", 'data-type': BoolProp(), "sub-type": "PROP_NONE", "default": 0}]
+    gui.get_node_sockets.return_value = [
+        {'type': "Input", 'name': "socket1", 'data-type': FloatSocket(), 'sub-type': 'PROP_NONE', 'flags': [],
+         'min': "-1.0", 'max': "1.0", 'default': "0.5"},
+        {'type': "Output", 'name': "socket2", 'data-type': FloatSocket(), 'sub-type': 'PROP_NONE', 'flags': []}]
+    gui.is_texture_node.return_value = False
+    gui.node_has_properties.return_value = True
+    gui.node_has_check_box.return_value = True
+    gui.uses_texture_mapping.return_value = False
+    gui.type_suffix_abbreviated.return_value = ''
+    gui.type_suffix.return_value = ''
+    return gui
@@ -0,0 +1,202 @@
+import os
+import re
+from os import path
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from code_generation import anchor_index
+from code_generation.anchor_index import AnchorIndex
+from code_generation.source_tree import SourceTree
+from tests import fake_blender_tree
+
+
+class TestScanners(unittest.TestCase):
+    def test_fake_tree_every_anchor_found(self):
+        expected = {
+            'source/blender/blenkernel/BKE_node.h': ['node_ids_end'],
+            'source/blender/nodes/NOD_static_types.h': ['shader_node_definitions_end'],
+            'intern/cycles/scene/shader_nodes.h': ['cycles_classes_end'],
+            'intern/cycles/blender/shader.cpp': ['add_node_cases_end'],
+            'intern/cycles/scene/shader_nodes.cpp': ['cycles_nodes_end'],
+            'release/scripts/startup/nodeitems_builtins.py': ['menu_end:SHADER'],
+            'intern/cycles/kernel/svm/svm.h': ['svm_includes_end', 'svm_cases_start'],
+            'intern/cycles/kernel/svm/types.h': ['shader_node_types_end', 'shader_node_types_after'],
+            'source/blender/makesdna/DNA_node_types.h': ['node_structs_end'],
+            'source/blender/nodes/NOD_shader.h': ['register_declarations_end', 'shader_defines_end'],
+            'source/blender/blenkernel/intern/node.cc': ['register_calls_end'],
+            'source/blender/makesrna/intern/rna_nodetree.c': ['compositor_nodes_start', 'rna_runtime_enums_end'],
+            'source/blender/editors/space_node/drawnode.cc': ['shader_buttons_end', 'shader_button_cases_end'],
+            'intern/cycles/kernel/CMakeLists.txt': ['svm_headers_start'],
+            'intern/cycles/kernel/osl/shaders/CMakeLists.txt': ['osl_sources_start'],
+            'source/blender/nodes/shader/CMakeLists.txt': ['node_sources_start'],
+        }
+        for parts, text in fake_blender_tree.FILES.items():
+            relative_path = '/'.join(parts)
+            self.assertTrue(sorted(anchor_index.scan(relative_path, text)) == sorted(expected[relative_path]),
+                            relative_path)
+
+    def test_svm_types_anchors_correct_offsets(self):
+        text = 'typedef enum ShaderNodeType {\n  NODE_END = 0,\n} ShaderNodeType;\n\nnext\n'
+        anchors = anchor_index.scan('intern/cycles/kernel/svm/types.h', text)
+
+        self.assertTrue(text[anchors['shader_node_types_end']:].startswith('} ShaderNodeType;'))
+        self.assertTrue(text[anchors['shader_node_types_after']:] == '\nnext\n')
+
+    def test_static_types_last_shader_node_found(self):
+        text = 'DefNode(ShaderNode, A)\nDefNode(ShaderNode, B)\n\nDefNode(CompositorNode, C)\n'
+        anchors = anchor_index.scan('source/blender/nodes/NOD_static_types.h', text)
+
+        self.assertTrue(text[:anchors['shader_node_definitions_end']].endswith('DefNode(ShaderNode, B)\n'))
+
+    def test_cycles_instances_braces_in_comments_ignored(self):
+        text = ('static ShaderNode *add_node(Scene *scene,\n'
+                '                            BL::ShaderNode &b_node)\n'
+                '{\n'
+                '  if (b_node.is_a(&RNA_ShaderNodeA)) {\n'
+                '    /* } */\n'
+                '  }\n'
+                '  else if (b_node.is_a(&RNA_ShaderNodeB)) {\n'
+                '    node = graph->create_node<BNode>("{");\n'
+                '  }\n'
+                '\n'
+                '  if (node) {\n'
+                '  }\n'
+                '  return node;\n'
+                '}\n')
+        anchors = anchor_index.scan('intern/cycles/blender/shader.cpp', text)
+
+        self.assertTrue(text[:anchors['add_node_cases_end']].endswith('create_node<BNode>("{");\n  }\n'))
+
+    def test_register_declarations_after_last_declaration(self):
+        text = 'void register_node_type_sh_a(void);\nvoid register_node_type_sh_b(void);\n\nvoid other(void);\n'
+        anchors = anchor_index.scan('source/blender/nodes/NOD_shader.h', text)
+
+        self.assertTrue(text[anchors['register_declarations_end']:] == '\nvoid other(void);\n')
+
+    def test_shader_defines_before_extern_c_end(self):
+        text = 'extern "C" {\n#endif\nvoid register_node_type_sh_a(void);\n\n#ifdef __cplusplus\n}\n#endif\n'
+        anchors = anchor_index.scan('source/blender/nodes/NOD_shader.h', text)
+
+        self.assertTrue(text[anchors['shader_defines_end']:] == '#ifdef __cplusplus\n}\n#endif\n')
+
+    def test_find_last_string_last_occurrence(self):
+        self.assertTrue(anchor_index.find_last('ab ab ab', 'ab') == (6, 8))
+        self.assertTrue(anchor_index.find_last('ab ab ab', 'ab', end=7) == (3, 5))
+        self.assertTrue(anchor_index.find_last('ab ab ab', 'cd') is None)
+
+    def test_find_last_pattern_across_chunks(self):
+        text = 'x1 ' + 'y' * 20 + ' x22 ' + 'z' * 20
+        match = anchor_index.find_last(text, re.compile(r'x\d+'), chunk_size=8)
+
+        self.assertTrue(match.group() == 'x22')
+        self.assertTrue(anchor_index.find_last(text, re.compile(r'x\d+'), end=10, chunk_size=4).group() == 'x1')
+        self.assertTrue(anchor_index.find_last(text, re.compile('w'), chunk_size=8) is None)
+
+    def test_find_last_pattern_straddling_chunk_boundary(self):
+        text = 'a' * 10 + 'x123456' + 'b' * 10
+
+        self.assertTrue(anchor_index.find_last(text, re.compile(r'x\d+'), chunk_size=12, overlap=4).span() == (10, 17))
+        # Matches longer than the overlap are completed from the rest of the text
+        self.assertTrue(anchor_index.find_last(text, re.compile(r'x\d+'), chunk_size=12, overlap=1).span() == (10, 17))
+
+    def test_find_last_window_bounded(self):
+        windows = []
+
+        class Pattern:
+            def finditer(self, text, start, end):
+                windows.append((start, end))
+                return iter([])
+
+        anchor_index.find_last('a' * 100, Pattern(), chunk_size=10, overlap=3)
+
+        self.assertTrue(len(windows) == 10)
+        self.assertTrue(all(end - start <= 13 for start, end in windows))
+
+    def test_missing_anchor_not_in_index(self):
+        self.assertTrue(anchor_index.scan('intern/cycles/kernel/svm/types.h', 'no enum here\n') == {})
+
+
+class TestAnchorIndex(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._cache = fake_blender_tree.isolated_cache(self._dir.name)
+        self._cache.start()
+        self.file_path = path.join(self._dir.name, 'intern', 'cycles', 'kernel', 'svm', 'types.h')
+        os.makedirs(path.dirname(self.file_path))
+        self._write('typedef enum ShaderNodeType {\n  NODE_END = 0,\n} ShaderNodeType;\n')
+
+    def tearDown(self):
+        self._cache.stop()
+        self._dir.cleanup()
+
+    def _write(self, text):
+        with open(self.file_path, 'w') as f:
+            f.write(text)
+        return text
+
+    def test_unchanged_file_not_scanned_again(self):
+        text = self._write('typedef enum ShaderNodeType {\n  NODE_END = 0,\n} ShaderNodeType;\n')
+        first = AnchorIndex(self._dir.name).anchors(self.file_path, text)
+        with patch('code_generation.anchor_index.scan') as mock_scan:
+            second = AnchorIndex(self._dir.name).anchors(self.file_path, text)
+
+        self.assertFalse(mock_scan.called)
+        self.assertTrue(first == second)
+
+    def test_changed_file_scanned_again(self):
+        AnchorIndex(self._dir.name).anchors(self.file_path, self._write('} ShaderNodeType;\n'))
+        text = self._write('typedef enum ShaderNodeType {\n  NODE_A,\n  NODE_END = 0,\n} ShaderNodeType;\n')
+        anchors = AnchorIndex(self._dir.name).anchors(self.file_path, text)
+
+        self.assertTrue(text[anchors['shader_node_types_end']:] == '} ShaderNodeType;\n')
+
+    def test_missing_file_scanned_without_cache(self):
+        anchors = AnchorIndex(self._dir.name).anchors(path.join(self._dir.name, 'missing', 'svm', 'types.h'),
+                                                      '} ShaderNodeType;\n')
+
+        self.assertTrue(anchors == {})
+        self.assertFalse(path.exists(path.join(self._dir.name, '.cache', 'anchors', 'missing')))
+
+
+class TestSourceTreeAnchors(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._cache = fake_blender_tree.isolated_cache(self._dir.name)
+        self._cache.start()
+        self.source_path = fake_blender_tree.create(self._dir.name)
+        self.file_path = path.join(self.source_path, 'intern', 'cycles', 'kernel', 'svm', 'types.h')
+
+    def tearDown(self):
+        self._cache.stop()
+        self._dir.cleanup()
+
+    def test_insert_at_anchor_keeps_insertion_order(self):
+        source_tree = SourceTree(self.source_path)
+        for name in ['NODE_A,\n', 'NODE_B,\n']:
+            source_tree.insert(self.file_path, source_tree.anchor(self.file_path, 'shader_node_types_end'), name)
+
+        self.assertTrue('NODE_END = 0,\nNODE_A,\nNODE_B,\n} ShaderNodeType;\n' in source_tree.read(self.file_path))
+
+    def test_insert_before_anchor_shifts_anchor(self):
+        source_tree = SourceTree(self.source_path)
+        source_tree.insert(self.file_path, 0, '/* header */\n')
+
+        i = source_tree.anchor(self.file_path, 'shader_node_types_end')
+        self.assertTrue(source_tree.read(self.file_path)[i:] == '} ShaderNodeType;\n')
+
+    def test_write_anchors_found_in_new_text(self):
+        source_tree = SourceTree(self.source_path)
+        source_tree.write(self.file_path, 'typedef enum ShaderNodeType {\n} ShaderNodeType;\n')
+
+        self.assertTrue(source_tree.anchor(self.file_path, 'shader_node_types_end') == 30)
+
+    def test_missing_anchor_raises(self):
+        source_tree = SourceTree(self.source_path)
+
+        with self.assertRaises(Exception):
+            source_tree.anchor(self.file_path, 'not_an_anchor')
+
+
+if __name__ == '__main__':
+    unittest.main()
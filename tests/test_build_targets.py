@@ -0,0 +1,97 @@
+import os
+from os import path
+import tempfile
+import unittest
+
+from code_generation import build_targets, generate_nodes
+from code_generation.build_targets import TargetIndex
+from code_generation.formatter import NullFormatter
+from tests import fake_blender_tree
+
+
+def _write(root, parts, text):
+    file_path = path.join(root, *parts)
+    os.makedirs(path.dirname(file_path), exist_ok=True)
+    with open(file_path, 'w') as f:
+        f.write(text)
+    return file_path
+
+
+class TestBuildTargets(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.root = self._dir.name
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_cmake_file_target_library_preferred(self):
+        text = 'add_custom_target(shaders ALL)\n' \
+               'blender_add_lib(bf_nodes_shader "${SRC}" "${INC}" "${INC_SYS}" "${LIB}")\n'
+
+        self.assertTrue(build_targets.cmake_file_target(text) == 'bf_nodes_shader')
+
+    def test_cmake_file_target_custom_target(self):
+        self.assertTrue(build_targets.cmake_file_target('add_custom_target(cycles_osl_shaders ALL)\n') ==
+                        'cycles_osl_shaders')
+
+    def test_cmake_file_target_library_preferred_over_executable(self):
+        text = 'set(DEFSRC\n  rna_nodetree.c\n)\n\n' \
+               'add_executable(makesrna ${SRC} ${SRC_RNA_INC} ${SRC_DNA_INC})\n' \
+               'target_link_libraries(makesrna bf_dna)\n\n' \
+               'add_custom_command(\n  OUTPUT ${GENSRC}\n  COMMAND "$<TARGET_FILE:makesrna>" ${CMAKE_CURRENT_BINARY_DIR}/\n)\n\n' \
+               'add_custom_target(bf_rna_gen DEPENDS ${GENSRC})\n\n' \
+               'blender_add_lib(bf_rna "${SRC}" "${INC}" "${INC_SYS}" "${LIB}")\n'
+
+        self.assertTrue(build_targets.cmake_file_target(text) == 'bf_rna')
+
+    def test_cmake_file_target_executable_preferred_over_custom_target(self):
+        text = 'add_custom_target(shaders ALL)\nadd_executable(makesdna makesdna.c)\n'
+
+        self.assertTrue(build_targets.cmake_file_target(text) == 'makesdna')
+
+    def test_cmake_file_target_no_target_none(self):
+        self.assertTrue(build_targets.cmake_file_target('set(SRC\n  a.cc\n)\n') is None)
+
+    def test_target_nearest_cmake_file_with_target_used(self):
+        _write(self.root, ('intern', 'cycles', 'CMakeLists.txt'), 'add_subdirectory(scene)\n')
+        _write(self.root, ('intern', 'cycles', 'scene', 'CMakeLists.txt'),
+               'cycles_add_library(cycles_scene "${LIB}" ${SRC})\n')
+        index = TargetIndex(self.root)
+
+        self.assertTrue(index.target(path.join(self.root, 'intern', 'cycles', 'scene', 'shader_nodes.cpp')) ==
+                        'cycles_scene')
+        self.assertTrue(index.target(path.join(self.root, 'intern', 'cycles', 'scene', 'nodes', 'a.h')) ==
+                        'cycles_scene')
+        self.assertTrue(index.target(path.join(self.root, 'intern', 'cycles', 'blender', 'shader.cpp')) is None)
+
+    def test_target_source_directory_cmake_file_not_used(self):
+        _write(self.root, ('CMakeLists.txt',), 'add_executable(blender main.c)\n')
+
+        self.assertTrue(TargetIndex(self.root).target(path.join(self.root, 'release', 'scripts', 'a.py')) is None)
+
+    def test_generate_nodes_targets_reported(self):
+        with fake_blender_tree.isolated_cache(self.root):
+            source_path = fake_blender_tree.create(path.join(self.root, 'blender'))
+            _write(source_path, ('intern', 'cycles', 'scene', 'CMakeLists.txt'),
+                   'cycles_add_library(cycles_scene "${LIB}" ${SRC})\n')
+            _write(source_path, ('source', 'blender', 'makesrna', 'intern', 'CMakeLists.txt'),
+                   'blender_add_lib(bf_rna "${SRC}" "${INC}" "${INC_SYS}" "${LIB}")\n')
+
+            report = generate_nodes([fake_blender_tree.mock_gui(source_path)], NullFormatter(), targets=True)
+
+        files = {file['path']: file for file in report['files']}
+        self.assertTrue(files['intern/cycles/scene/shader_nodes.cpp'] ==
+                        {'path': 'intern/cycles/scene/shader_nodes.cpp', 'created': False, 'target': 'cycles_scene'})
+        self.assertTrue(files['intern/cycles/kernel/svm/node_name.h']['created'])
+        self.assertTrue(files['source/blender/makesrna/intern/rna_nodetree.c']['target'] == 'bf_rna')
+        self.assertTrue(sorted(report['targets']) == ['bf_rna', 'cycles_scene'])
+        self.assertTrue(report['dna_rebuild'] == ['source/blender/makesdna/DNA_node_types.h'])
+
+    def test_forces_dna_rebuild_dna_headers_only(self):
+        self.assertTrue(build_targets.forces_dna_rebuild('source/blender/makesdna/DNA_node_types.h'))
+        self.assertFalse(build_targets.forces_dna_rebuild('source/blender/nodes/NOD_shader.h'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,12 @@ from unittest.mock import patch
 from code_generation.cmake_writer import CMakeWriter
 
 
+def _written_text(writer):
+    """Text of the file the writer modified"""
+    source_tree = writer._source_tree
+    return source_tree.read(source_tree.dirty_files()[0])
+
+
 class TestCMake(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -17,6 +23,8 @@ class TestCMake(unittest.TestCase):
         self.mock_gui.is_texture_node.return_value = False
         self.mock_gui.type_suffix.return_value = ''
         self.mock_gui.type_suffix_abbreviated.return_value = ''
+        self.mock_gui.get_props.return_value = []
+        self.mock_gui.get_node_sockets.return_value = []
 
     def _create_default_cmake_manager(self):
         return CMakeWriter(self.mock_gui)
@@ -452,7 +460,7 @@ class TestCMake(unittest.TestCase):
             cmake._add_svm()
 
             self.assertTrue('  svm/vertex_color.h\n'
-                            '  svm/z.h\n)' in mf.mock_calls[-3][1][0])
+                            '  svm/z.h\n)' in _written_text(cmake))
 
     def test_write_osl_cmake_correct_formatting(self):
         with patch('builtins.open', mock.mock_open(read_data=
@@ -556,7 +564,7 @@ class TestCMake(unittest.TestCase):
             cmake = self._create_default_cmake_manager()
             cmake._add_osl()
 
-            self.assertTrue('  node_node_name.osl\n' in mf.mock_calls[-3][1][0])
+            self.assertTrue('  node_node_name.osl\n' in _written_text(cmake))
 
     def test_write_node_cmake_correct_formatting(self):
         with patch('builtins.open', mock.mock_open(read_data=
@@ -786,7 +794,7 @@ class TestCMake(unittest.TestCase):
                                                    ')\n')) as mf:
             cmake = self._create_default_cmake_manager()
             cmake._add_node()
-            self.assertTrue('  nodes/node_shader_node_name.c' in mf.mock_calls[-3][1][0])
+            self.assertTrue('  nodes/node_shader_node_name.c' in _written_text(cmake))
 
     def test_write_node_cmake_texture_node_correct_formatting(self):
         self.mock_gui.is_texture_node.return_value = True
@@ -1019,7 +1027,7 @@ class TestCMake(unittest.TestCase):
                                                    ')\n')) as mf:
             cmake = self._create_default_cmake_manager()
             cmake._add_node()
-            self.assertTrue('  nodes/node_shader_tex_node_name.c' in mf.mock_calls[-3][1][0])
+            self.assertTrue('  nodes/node_shader_tex_node_name.c' in _written_text(cmake))
 
 
 if __name__ == '__main__':
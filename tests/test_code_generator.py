@@ -1,8 +1,15 @@
+import os
+import tempfile
 import unittest
+from collections import Counter
+from os import path
 from unittest import mock
 from unittest.mock import patch, mock_open, call
 
-from code_generation import CodeGenerator
+from code_generation import CodeGenerator, generate_nodes
+from code_generation.node_spec import NodeSpec
+from code_generation.source_tree import SourceTree
+from tests import fake_blender_tree
 from node_types.prop_bool import BoolProp
 from node_types.prop_enum import EnumProp
 from node_types.prop_int import IntProp
@@ -10,6 +17,12 @@ from node_types.socket_float import FloatSocket
 from node_types.socket_vector import VectorSocket
 
 
+def _written_text(writer):
+    """Text of the file the writer modified"""
+    source_tree = writer._source_tree
+    return source_tree.read(source_tree.dirty_files()[0])
+
+
 class TestCodeGeneration(unittest.TestCase):
 
     @classmethod
@@ -86,7 +99,7 @@ class TestCodeGeneration(unittest.TestCase):
             code_gen = CodeGenerator(self.mock_gui)
             code_gen._add_to_node_menu()
 
-            self.assertTrue('        NodeItem("ShaderNodeNodeName")\n' in mf.mock_calls[4][1][0])
+            self.assertTrue('        NodeItem("ShaderNodeNodeName")\n' in _written_text(code_gen))
 
     def test_write_node_id_correct_formatting(self):
         with patch('builtins.open', mock_open(read_data='#define SH_NODE_TEX_WHITE_NOISE 704\n'
@@ -100,7 +113,7 @@ class TestCodeGeneration(unittest.TestCase):
                                               )) as mf:
             code_gen = CodeGenerator(self.mock_gui)
             code_gen._add_node_type_id()
-            self.assertTrue(mf.mock_calls[-3][1][0] == '#define SH_NODE_TEX_WHITE_NOISE 704\n'
+            self.assertTrue(_written_text(code_gen) == '#define SH_NODE_TEX_WHITE_NOISE 704\n'
                                                        '#define SH_NODE_VOLUME_INFO 705\n'
                                                        '#define SH_NODE_VERTEX_COLOR 706\n'
                                                        '#define SH_NODE_NODE_NAME 707\n'
@@ -354,13 +367,16 @@ class TestCodeGeneration(unittest.TestCase):
                                                         '\n'
                                                         '#endif /* __NODES_H__ */\n'
                                                         '\n')) as mf:
-            with patch('code_generation.code_generator_util.apply_clang_formatting'):
+            with patch('code_generation.formatter.LazyClangFormatter.format'):
                 code_gen = CodeGenerator(self.mock_gui)
                 code_gen._add_cycles_class()
 
-                self.assertTrue(mf.mock_calls[-3][1][0] == 'class NodeNameNode : public ShaderNode {'
-                                                           'public:SHADER_NODE_CLASS(NodeNameNode)\n'
-                                                           '};')
+                self.assertTrue(' float scale;\n'
+                                '};\n'
+                                '\n'
+                                'class NodeNameNode : public ShaderNode {'
+                                'public:SHADER_NODE_CLASS(NodeNameNode)\n'
+                                '};\n' in _written_text(code_gen))
 
     # def test_add_cycles_class_instance_correct_formatting(self):
     #     with patch('builtins.open', mock_open(read_data=
@@ -658,13 +674,13 @@ class TestCodeGeneration(unittest.TestCase):
                                               'return node;\n'
                                               '}\n'
                                               )) as mf:
-            with patch('code_generation.code_generator_util.apply_clang_formatting'):
+            with patch('code_generation.formatter.LazyClangFormatter.format'):
                 code_gen = CodeGenerator(self.mock_gui)
                 code_gen._add_cycles_class_instance()
 
                 self.assertTrue('else if (b_node.is_a(&RNA_ShaderNodeNodeName)) {'
                                 'node = graph->create_node<NodeNameNode>();'
-                                '}\n' in mf.mock_calls[-3][1][0])
+                                '}\n' in _written_text(code_gen))
 
     def test_add_cycles_class_instance_texture_node_no_props_with_vector_correct_formatting(self):
         self.mock_gui.is_texture_node.return_value = True
@@ -719,7 +735,7 @@ class TestCodeGeneration(unittest.TestCase):
                                               'return node;\n'
                                               '}\n'
                                               )) as mf:
-            with patch('code_generation.code_generator_util.apply_clang_formatting'):
+            with patch('code_generation.formatter.LazyClangFormatter.format'):
                 code_gen = CodeGenerator(self.mock_gui)
                 code_gen._add_cycles_class_instance()
 
@@ -729,7 +745,7 @@ class TestCodeGeneration(unittest.TestCase):
                                 'BL::TexMapping b_texture_mapping(b_node_name_node.texture_mapping());'
                                 'get_tex_mapping(node_name, b_texture_mapping);'
                                 'node = node_name;'
-                                '}\n' in mf.mock_calls[-3][1][0])
+                                '}\n' in _written_text(code_gen))
 
     def test_add_cycles_class_instance_texture_node_no_props_no_vector_correct_formatting(self):
         self.mock_gui.is_texture_node.return_value = True
@@ -779,13 +795,13 @@ class TestCodeGeneration(unittest.TestCase):
                                               'return node;\n'
                                               '}\n'
                                               )) as mf:
-            with patch('code_generation.code_generator_util.apply_clang_formatting'):
+            with patch('code_generation.formatter.LazyClangFormatter.format'):
                 code_gen = CodeGenerator(self.mock_gui)
                 code_gen._add_cycles_class_instance()
 
                 self.assertTrue('else if (b_node.is_a(&RNA_ShaderNodeTexNodeName)) {'
                                 'node = graph->create_node<NodeNameTextureNode>();'
-                                '}\n' in mf.mock_calls[-3][1][0])
+                                '}\n' in _written_text(code_gen))
 
     # def test_add_cycles_node_correct_formatting(self):
     #     mock_svm_manager = mock.Mock()
@@ -1158,7 +1174,7 @@ class TestCodeGeneration(unittest.TestCase):
             code_gen = CodeGenerator(self.mock_gui)
             code_gen._add_node_definition()
 
-            self.assertTrue(mf.mock_calls[-3][1][0] ==
+            self.assertTrue(_written_text(code_gen) ==
                             'DefNode(ShaderNode,     SH_NODE_TEX_WHITE_NOISE,    def_sh_tex_white_noise, "TEX_WHITE_NOISE",    TexWhiteNoise,    "White Noise",       ""       )\n'
                             'DefNode(ShaderNode,     SH_NODE_OUTPUT_AOV,         def_sh_output_aov,      "OUTPUT_AOV",         OutputAOV,        "AOV Output",        ""       )\n'
                             'DefNode(ShaderNode,     SH_NODE_TEX_TRUCHET,        def_sh_tex_truchet,     "TEX_TRUCHET",        TexTruchet,       "Truchet Texture",   ""       )\n'
@@ -1180,7 +1196,7 @@ class TestCodeGeneration(unittest.TestCase):
                 'DefNode(CompositorNode, CMP_NODE_RGB,            0,                      "RGB",            RGB,              "RGB",               ""              )\n')) as mf:
             code_gen = CodeGenerator(self.mock_gui)
             code_gen._add_node_definition()
-            self.assertTrue(mf.mock_calls[-3][1][0] ==
+            self.assertTrue(_written_text(code_gen) ==
                             'DefNode(ShaderNode,     SH_NODE_TEX_WHITE_NOISE,    def_sh_tex_white_noise, "TEX_WHITE_NOISE",    TexWhiteNoise,    "White Noise",       ""       )\n'
                             'DefNode(ShaderNode,     SH_NODE_OUTPUT_AOV,         def_sh_output_aov,      "OUTPUT_AOV",         OutputAOV,        "AOV Output",        ""       )\n'
                             'DefNode(ShaderNode,     SH_NODE_TEX_TRUCHET,        def_sh_tex_truchet,     "TEX_TRUCHET",        TexTruchet,       "Truchet Texture",   ""       )\n'
@@ -1190,5 +1206,121 @@ class TestCodeGeneration(unittest.TestCase):
                             'DefNode(CompositorNode, CMP_NODE_RGB,            0,                      "RGB",            RGB,              "RGB",               ""              )\n')
 
 
+
+class TestGenerateNodes(unittest.TestCase):
+    def setUp(self):
+        self._temp_dir = tempfile.TemporaryDirectory()
+        self.source_path = fake_blender_tree.create(self._temp_dir.name)
+        self._cache = fake_blender_tree.isolated_cache(self._temp_dir.name)
+        self._cache.start()
+
+    def tearDown(self):
+        self._cache.stop()
+        self._temp_dir.cleanup()
+
+    def test_generate_nodes_adds_every_node(self):
+        guis = [fake_blender_tree.mock_gui(self.source_path, 'node one'),
+                fake_blender_tree.mock_gui(self.source_path, 'node two')]
+        with patch('code_generation.formatter.LazyClangFormatter.format'):
+            generate_nodes(guis)
+
+        text = fake_blender_tree.read(self.source_path, 'source', 'blender', 'blenkernel', 'BKE_node.h')
+        self.assertTrue('#define SH_NODE_NODE_ONE 707\n'
+                        '#define SH_NODE_NODE_TWO 708\n' in text)
+        text = fake_blender_tree.read(self.source_path, 'intern', 'cycles', 'kernel', 'svm', 'types.h')
+        self.assertTrue('NODE_NODE_ONE,' in text and 'NODE_NODE_TWO,' in text)
+
+    def test_generate_nodes_rna_macros_visible_to_makesrna(self):
+        with patch('code_generation.formatter.LazyClangFormatter.format'):
+            gui = fake_blender_tree.mock_gui(self.source_path)
+            props = gui.get_props.return_value
+            gui.get_props.return_value = props + [dict(props[2], name='box2')]
+            generate_nodes([gui])
+
+        # makesrna compiles rna_nodetree.c without RNA_RUNTIME, where NOD_shader.h isn't included
+        rna = fake_blender_tree.read(self.source_path, 'source', 'blender', 'makesrna', 'intern', 'rna_nodetree.c')
+        self.assertFalse('SHD_' in rna)
+        self.assertTrue('RNA_def_property_boolean_sdna(prop, NULL, "box1", 1);' in rna)
+        self.assertTrue('RNA_def_property_boolean_sdna(prop, NULL, "box2", 2);' in rna)
+
+    def test_generate_nodes_constant_fold_declared_and_defined(self):
+        gui = fake_blender_tree.mock_gui(self.source_path)
+        spec = NodeSpec.create(self.source_path, 'node name', 'Shader', 'Shader', gui.get_props(),
+                               gui.get_node_sockets(), constant_fold=True)
+        with patch('code_generation.formatter.LazyClangFormatter.format'):
+            generate_nodes([spec])
+
+        text = fake_blender_tree.read(self.source_path, 'intern', 'cycles', 'scene', 'shader_nodes.h')
+        self.assertTrue('SHADER_NODE_CLASS(NodeNameNode)\nvoid constant_fold(const ConstantFolder &folder);\n' in text)
+        text = fake_blender_tree.read(self.source_path, 'intern', 'cycles', 'scene', 'shader_nodes.cpp')
+        self.assertTrue('void NodeNameNode::constant_fold(const ConstantFolder &folder)'
+                        '{if (folder.all_inputs_constant()) {if (folder.output == output("Socket2")) {'
+                        '/* Compute Socket2 from the props dropdown1, int1, box1 and the inputs socket1 '
+                        'and pass it to folder.make_constant() */' in text)
+
+    def test_generate_nodes_constant_fold_off_by_default(self):
+        with patch('code_generation.formatter.LazyClangFormatter.format'):
+            generate_nodes([fake_blender_tree.mock_gui(self.source_path)])
+
+        self.assertFalse('constant_fold' in fake_blender_tree.read(self.source_path, 'intern', 'cycles', 'scene',
+                                                                    'shader_nodes.h'))
+        self.assertFalse('constant_fold' in fake_blender_tree.read(self.source_path, 'intern', 'cycles', 'scene',
+                                                                    'shader_nodes.cpp'))
+
+    def test_generate_nodes_missing_anchors_nothing_written(self):
+        drawnode = ('source', 'blender', 'editors', 'space_node', 'drawnode.cc')
+        with open(path.join(self.source_path, *drawnode), 'w') as f:
+            f.write('/* no button functions */\n')
+        guis = [fake_blender_tree.mock_gui(self.source_path, 'node one')]
+        with patch('code_generation.formatter.LazyClangFormatter.format'):
+            with self.assertRaises(Exception) as context:
+                generate_nodes(guis)
+
+        self.assertTrue('shader_buttons_end not found' in str(context.exception))
+        self.assertTrue('shader_button_cases_end not found' in str(context.exception))
+        self.assertTrue(fake_blender_tree.read(self.source_path, 'source', 'blender', 'blenkernel', 'BKE_node.h') ==
+                        fake_blender_tree.FILES[('source', 'blender', 'blenkernel', 'BKE_node.h')])
+
+    def test_required_anchors_match_anchors_used(self):
+        source_tree = SourceTree(self.source_path)
+        code_gen = CodeGenerator(fake_blender_tree.mock_gui(self.source_path), source_tree)
+        required = set((path.normpath(file_path), name) for file_path, name in code_gen.required_anchors())
+        with patch.object(SourceTree, 'anchor', autospec=True, side_effect=SourceTree.anchor) as mock_anchor:
+            code_gen.write_node()
+
+        self.assertTrue(set((path.normpath(c.args[1]), c.args[2]) for c in mock_anchor.call_args_list) == required)
+
+    def test_generate_nodes_reads_and_writes_each_file_once(self):
+        guis = [fake_blender_tree.mock_gui(self.source_path, 'node {0}'.format(name)) for name in 'abc']
+        with patch('code_generation.formatter.LazyClangFormatter.format'):
+            with patch('builtins.open', side_effect=open) as mock_file, \
+                    patch('os.replace', side_effect=os.replace) as mock_replace:
+                generate_nodes(guis)
+
+        read = Counter(path.normpath(c.args[0]) for c in mock_file.call_args_list
+                       if isinstance(c.args[0], str) and (len(c.args) == 1 or c.args[1] == 'r'))
+        written = Counter(path.normpath(c.args[1]) for c in mock_replace.call_args_list)
+        for parts in fake_blender_tree.FILES:
+            file_path = path.normpath(path.join(self.source_path, *parts))
+            self.assertEqual(read[file_path], 1)
+            self.assertEqual(written[file_path], 1)
+
+    def test_generate_nodes_no_storage_struct_dna_not_written(self):
+        gui = fake_blender_tree.mock_gui(self.source_path)
+        gui.get_props.return_value = [gui.get_props.return_value[2]]
+        with patch('code_generation.formatter.LazyClangFormatter.format'):
+            written = generate_nodes([gui])
+
+        self.assertFalse(any('DNA_node_types.h' in file_path for file_path in written))
+        self.assertTrue('/* node name */\n#define SHD_NODE_NAME_BOX1 1\n' in
+                        fake_blender_tree.read(self.source_path, 'source', 'blender', 'nodes', 'NOD_shader.h'))
+
+    def test_generate_nodes_different_source_paths_raises(self):
+        guis = [fake_blender_tree.mock_gui(self.source_path, 'node one'),
+                fake_blender_tree.mock_gui('C:/some/other/path', 'node two')]
+        with self.assertRaises(Exception):
+            generate_nodes(guis)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -57,6 +57,17 @@ class TestUsesDna(unittest.TestCase):
         props = [{'data-type': EnumProp()} for _ in range(3)]
         self.assertTrue(code_generator_util.uses_dna(props, "Texture"))
 
+    def test_can_constant_fold_shader_inputs_outputs_true(self):
+        sockets = [{'type': 'Input'}, {'type': 'Output'}]
+        self.assertTrue(code_generator_util.can_constant_fold("Shader", sockets))
+
+    def test_can_constant_fold_bsdf_false(self):
+        sockets = [{'type': 'Input'}, {'type': 'Output'}]
+        self.assertFalse(code_generator_util.can_constant_fold("Bsdf", sockets))
+
+    def test_can_constant_fold_no_inputs_false(self):
+        self.assertFalse(code_generator_util.can_constant_fold("Shader", [{'type': 'Output'}]))
+
     def test_fill_whitespace_correct_formatting(self):
         items = ['ShaderNode', 'SH_NODE_OUTPUT_MATERIAL', 'def_sh_output', '"OUTPUT_MATERIAL"',
                  'OutputMaterial', '"Material Output"', '""']
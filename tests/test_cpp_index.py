@@ -0,0 +1,77 @@
+import unittest
+
+from code_generation import cpp_index
+
+TEXT = (
+    '#include "node.h"\n'
+    '\n'
+    'namespace blender {\n'
+    '\n'
+    '/* not a brace { */\n'
+    'class Node : public Base {\n'
+    ' public:\n'
+    '  int f() { return 0; }\n'
+    '};\n'
+    '\n'
+    '#ifdef WITH_OSL\n'
+    'static const char *name = "}";\n'
+    '#endif\n'
+    '\n'
+    'static void node_shader_set_butfunc(bNodeType *ntype)\n'
+    '{\n'
+    '  // } in a comment\n'
+    '  switch (ntype->type) {\n'
+    '    case SH_NODE_A:\n'
+    '      break;\n'
+    '    case SH_NODE_B: {\n'
+    "      char c = '{';\n"
+    '      break;\n'
+    '    }\n'
+    '  }\n'
+    '}\n'
+    '\n'
+    '}  // namespace blender\n'
+)
+
+
+class TestCppIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = cpp_index.CppIndex(TEXT)
+
+    def test_braces_in_strings_and_comments_ignored(self):
+        function = self.index.function('node_shader_set_butfunc')
+
+        self.assertTrue(TEXT[function.close:] == '}\n\n}  // namespace blender\n')
+
+    def test_function_start_is_declaration(self):
+        function = self.index.function('node_shader_set_butfunc')
+
+        self.assertTrue(TEXT[function.start:].startswith('static void node_shader_set_butfunc('))
+        self.assertTrue(self.index.function_end('node_shader_set_butfunc') == function.close)
+
+    def test_last_case_found(self):
+        i = self.index.last_case('node_shader_set_butfunc')
+
+        self.assertTrue(TEXT[i:].startswith('    case SH_NODE_B: {\n'))
+        self.assertTrue(len(self.index.switches('node_shader_set_butfunc')[0].cases) == 2)
+
+    def test_classes_and_namespaces_found(self):
+        self.assertTrue([scope.name for scope in self.index.top_level('class')] == ['Node'])
+        self.assertTrue([scope.name for scope in self.index.namespaces] == ['blender'])
+        self.assertTrue(self.index.function('f').parent is self.index.classes['Node'])
+
+    def test_ifdef_block_found(self):
+        block = self.index.ifdef('WITH_OSL')[0]
+
+        self.assertTrue(TEXT[block.start:block.end] == '#ifdef WITH_OSL\nstatic const char *name = "}";\n#endif\n')
+
+    def test_missing_function_no_cases(self):
+        self.assertTrue(self.index.last_case('add_node') is None)
+        self.assertTrue(self.index.function_end('add_node') is None)
+
+    def test_index_text_cached(self):
+        self.assertTrue(cpp_index.index_text(TEXT) is cpp_index.index_text(TEXT))
+
+
+if __name__ == '__main__':
+    unittest.main()
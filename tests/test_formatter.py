@@ -0,0 +1,90 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from os import path
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from code_generation import formatter, generate_nodes
+from tests import fake_blender_tree
+
+
+class TestClangFormatter(unittest.TestCase):
+    def setUp(self):
+        formatter.clang_format_path.cache_clear()
+
+    def tearDown(self):
+        formatter.clang_format_path.cache_clear()
+
+    def test_files_formatted_in_single_call(self):
+        with patch('os.listdir', return_value=['linux_x64']), patch('os.path.exists', return_value=True), \
+                patch('subprocess.call') as mock_call:
+            formatter.ClangFormatter.for_source_path('/src/blender').format(['/src/blender/a.cc', '/src/blender/b.h'])
+
+            mock_call.assert_called_once_with(
+                [path.abspath('/src/lib/linux_x64/llvm/bin/clang-format'), '-i',
+                 path.abspath('/src/blender/a.cc'), path.abspath('/src/blender/b.h')])
+
+    def test_executable_path_resolved_once(self):
+        with patch('os.listdir', return_value=['linux_x64']) as mock_listdir, \
+                patch('os.path.exists', return_value=True), patch('subprocess.call'):
+            formatter.ClangFormatter.for_source_path('/src/blender').format(['/src/blender/a.cc'])
+            formatter.ClangFormatter.for_source_path('/src/blender').format(['/src/blender/b.h'])
+
+            self.assertTrue(mock_listdir.call_count == 1)
+
+    def test_line_ranges_formatted_per_file(self):
+        with patch('subprocess.call') as mock_call:
+            formatter.ClangFormatter('clang-format').format(
+                ['/src/blender/a.cc', '/src/blender/b.h', '/src/blender/c.h'],
+                {'/src/blender/b.h': [(3, 5), (10, 10)]})
+
+            self.assertTrue(mock_call.call_count == 2)
+            mock_call.assert_any_call(['clang-format', '-i',
+                                       path.abspath('/src/blender/a.cc'), path.abspath('/src/blender/c.h')])
+            mock_call.assert_any_call(['clang-format', '-i', '--lines=3:5', '--lines=10:10',
+                                       path.abspath('/src/blender/b.h')])
+
+    def test_working_directory_unchanged(self):
+        with patch('os.listdir', return_value=['linux_x64']), patch('os.path.exists', return_value=True), \
+                patch('subprocess.call'), patch('os.chdir') as mock_chdir:
+            formatter.ClangFormatter.for_source_path('/src/blender').format(['/src/blender/a.cc'])
+
+            self.assertFalse(mock_chdir.called)
+
+    def test_no_files_not_called(self):
+        with patch('subprocess.call') as mock_call:
+            formatter.ClangFormatter('clang-format').format([])
+
+            self.assertFalse(mock_call.called)
+
+    def test_lazy_formatter_no_files_executable_not_resolved(self):
+        with patch('os.listdir') as mock_listdir:
+            formatter.LazyClangFormatter('/src/blender').format([])
+
+            self.assertFalse(mock_listdir.called)
+
+
+class TestRecordingFormatter(unittest.TestCase):
+    def test_used_from_threads_records_every_call(self):
+        recording_formatter = formatter.RecordingFormatter()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda i: recording_formatter.format(['file{0}.h'.format(i)]), range(20)))
+
+        self.assertTrue(sorted(files[0] for files, _ in recording_formatter.calls) ==
+                        sorted('file{0}.h'.format(i) for i in range(20)))
+
+    def test_generate_nodes_uses_given_formatter(self):
+        with tempfile.TemporaryDirectory() as root:
+            source_path = fake_blender_tree.create(root)
+            recording_formatter = formatter.RecordingFormatter()
+            with fake_blender_tree.isolated_cache(root):
+                generate_nodes([fake_blender_tree.mock_gui(source_path)], recording_formatter)
+
+            files, _ = recording_formatter.calls[0]
+            self.assertTrue(path.join(source_path, 'intern', 'cycles', 'kernel', 'svm', 'node_name.h') in files)
+            self.assertTrue(all(os.path.exists(file_path) for file_path in files))
+
+
+if __name__ == '__main__':
+    unittest.main()
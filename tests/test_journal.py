@@ -0,0 +1,101 @@
+import os
+from os import path
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from code_generation import generate_nodes
+from code_generation.formatter import NullFormatter
+from code_generation.journal import Journal
+from tests import fake_blender_tree
+
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._cache = fake_blender_tree.isolated_cache(self._dir.name)
+        self._cache.start()
+        self.source_path = fake_blender_tree.create(path.join(self._dir.name, 'blender'))
+        self.svm_path = path.join(self.source_path, 'intern', 'cycles', 'kernel', 'svm', 'node_name.h')
+
+    def tearDown(self):
+        self._cache.stop()
+        self._dir.cleanup()
+
+    def _generate(self):
+        return generate_nodes([fake_blender_tree.mock_gui(self.source_path)], NullFormatter())
+
+    def _assert_tree_unchanged(self):
+        for parts, text in fake_blender_tree.FILES.items():
+            self.assertTrue(fake_blender_tree.read(self.source_path, *parts) == text, parts)
+        self.assertFalse(path.exists(self.svm_path))
+
+    def test_undo_restores_written_files(self):
+        written = self._generate()
+        restored = Journal(self.source_path).undo()
+
+        self.assertTrue(sorted(restored) == sorted(written))
+        self._assert_tree_unchanged()
+        self.assertTrue(Journal(self.source_path).entries() == [])
+
+    def test_undo_latest_generation_only(self):
+        self._generate()
+        generate_nodes([fake_blender_tree.mock_gui(self.source_path, 'node two')], NullFormatter())
+        Journal(self.source_path).undo()
+
+        self.assertTrue(path.exists(self.svm_path))
+        self.assertFalse(path.exists(path.join(path.dirname(self.svm_path), 'node_two.h')))
+
+    def test_undo_edited_file_requires_force(self):
+        self._generate()
+        with open(self.svm_path, 'a') as f:
+            f.write('/* edited */\n')
+
+        with self.assertRaises(Exception):
+            Journal(self.source_path).undo()
+        self.assertTrue(path.exists(self.svm_path))
+        Journal(self.source_path).undo(force=True)
+        self._assert_tree_unchanged()
+
+    def test_undo_after_partial_flush(self):
+        replace = os.replace
+        replaced = []
+
+        def fail_after_three(src, dst):
+            if len(replaced) == 3:
+                raise OSError('disk full')
+            replaced.append(dst)
+            replace(src, dst)
+
+        with patch('code_generation.source_tree.os.replace', side_effect=fail_after_three):
+            with self.assertRaises(OSError):
+                self._generate()
+        Journal(self.source_path).undo()
+
+        self._assert_tree_unchanged()
+        self.assertFalse([name for _, _, names in os.walk(self.source_path) for name in names
+                          if name.endswith('.tmp')])
+
+    def test_complete_oldest_entries_pruned(self):
+        journal = Journal(self.source_path, size=2)
+        for _ in range(3):
+            journal.complete(journal.record([self.svm_path]))
+
+        self.assertTrue([path.basename(entry) for entry in journal.entries()] == ['000002', '000003'])
+
+    def test_prune_incomplete_older_entries_removed(self):
+        journal = Journal(self.source_path, size=1)
+        journal.record([self.svm_path])
+        os.remove(path.join(journal.entries()[0], 'manifest.json'))
+        journal.complete(journal.record([self.svm_path]))
+        journal.complete(journal.record([self.svm_path]))
+
+        self.assertTrue(os.listdir(path.dirname(journal.entries()[0])) == ['000003'])
+
+    def test_nothing_to_undo_raises(self):
+        with self.assertRaises(Exception):
+            Journal(self.source_path).undo()
+
+
+if __name__ == '__main__':
+    unittest.main()
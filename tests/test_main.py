@@ -0,0 +1,129 @@
+import json
+import os
+import shutil
+from os import path
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from code_generation import cache
+from code_generation.__main__ import main
+from tests import fake_blender_tree
+
+SPEC = {
+    "name": "node name",
+    "type": "Shader",
+    "group": "Shader",
+    "props": [{"name": "box1", "data-type": "Boolean", "sub-type": "PROP_NONE", "default": 0},
+              {"name": "dropdown1", "data-type": "Enum", "sub-type": "PROP_NONE", "default": "prop1",
+               "options": [{"name": "prop1", "desc": "Short description"},
+                           {"name": "prop2", "desc": "Short description"}]}],
+    "sockets": [{"type": "Output", "name": "socket2", "data-type": "Float", "sub-type": "PROP_NONE"},
+                {"type": "Input", "name": "socket1", "data-type": "Float", "sub-type": "PROP_NONE",
+                 "min": "-1.0", "max": "1.0", "default": "0.5"}]
+}
+
+
+class TestMain(unittest.TestCase):
+    def setUp(self):
+        self._cache_dir = tempfile.TemporaryDirectory()
+        self._env = patch.dict(os.environ, {cache.CACHE_DIR_ENV: self._cache_dir.name})
+        self._env.start()
+
+    def tearDown(self):
+        self._env.stop()
+        self._cache_dir.cleanup()
+
+    def test_import_gui_libraries_not_imported(self):
+        result = subprocess.run([sys.executable, '-c',
+                                 'import sys, code_generation.__main__; '
+                                 'print(sorted(m for m in ("tkinter", "numpy", "gui") if m in sys.modules))'],
+                                cwd=path.join(path.dirname(__file__), path.pardir),
+                                stdout=subprocess.PIPE, universal_newlines=True, check=True)
+
+        self.assertTrue(result.stdout.strip() == '[]')
+
+    def test_main_spec_file_node_generated(self):
+        with tempfile.TemporaryDirectory() as root:
+            source_path = fake_blender_tree.create(root)
+            spec_path = path.join(root, 'node.json')
+            with open(spec_path, 'w') as f:
+                json.dump(SPEC, f)
+
+            main(['--source-path', source_path, '--no-format', spec_path])
+
+            self.assertTrue('#define SH_NODE_NODE_NAME 707\n' in
+                            fake_blender_tree.read(source_path, 'source', 'blender', 'blenkernel', 'BKE_node.h'))
+            self.assertTrue(path.exists(path.join(source_path, 'intern', 'cycles', 'kernel', 'svm', 'node_name.h')))
+
+    def test_main_undo_generated_files_restored(self):
+        with tempfile.TemporaryDirectory() as root:
+            source_path = fake_blender_tree.create(root)
+            spec_path = path.join(root, 'node.json')
+            with open(spec_path, 'w') as f:
+                json.dump(SPEC, f)
+
+            main(['--source-path', source_path, '--no-format', spec_path])
+            main(['--source-path', source_path, '--undo'])
+
+            self.assertTrue(fake_blender_tree.read(source_path, 'source', 'blender', 'blenkernel', 'BKE_node.h') ==
+                            fake_blender_tree.FILES[('source', 'blender', 'blenkernel', 'BKE_node.h')])
+            self.assertFalse(path.exists(path.join(source_path, 'intern', 'cycles', 'kernel', 'svm', 'node_name.h')))
+
+    def test_main_targets_printed_as_json(self):
+        with tempfile.TemporaryDirectory() as root:
+            source_path = fake_blender_tree.create(root)
+            spec_path = path.join(root, 'node.json')
+            with open(spec_path, 'w') as f:
+                json.dump(SPEC, f)
+
+            with patch('sys.stdout') as mock_stdout:
+                main(['--source-path', source_path, '--no-format', '--targets', spec_path])
+            report = json.loads(''.join(c.args[0] for c in mock_stdout.write.call_args_list))
+
+            self.assertTrue({'path': 'intern/cycles/kernel/svm/node_name.h', 'created': True, 'target': None}
+                            in report['files'])
+            self.assertTrue(report['targets'] == [])
+
+    def _dry_run(self, source_path, spec_path):
+        with patch('sys.stdout') as mock_stdout:
+            main(['--source-path', source_path, '--dry-run', spec_path])
+        return ''.join(c.args[0] for c in mock_stdout.write.call_args_list)
+
+    def test_main_dry_run_tree_unchanged(self):
+        with tempfile.TemporaryDirectory() as root:
+            source_path = fake_blender_tree.create(root)
+            spec_path = path.join(root, 'node.json')
+            with open(spec_path, 'w') as f:
+                json.dump(SPEC, f)
+
+            patch_text = self._dry_run(source_path, spec_path)
+
+            self.assertTrue('+#define SH_NODE_NODE_NAME 707\n' in patch_text)
+            self.assertTrue('diff --git a/intern/cycles/kernel/svm/node_name.h b/intern/cycles/kernel/svm/node_name.h\n'
+                            'new file mode 100644\n' in patch_text)
+            self.assertFalse(path.exists(path.join(source_path, 'intern', 'cycles', 'kernel', 'svm', 'node_name.h')))
+
+    @unittest.skipUnless(shutil.which('git') and os.name == 'posix', 'git not available')
+    def test_main_dry_run_patch_applies(self):
+        with tempfile.TemporaryDirectory() as root:
+            source_path = fake_blender_tree.create(path.join(root, 'preview'))
+            generated_path = fake_blender_tree.create(path.join(root, 'generated'))
+            spec_path = path.join(root, 'node.json')
+            with open(spec_path, 'w') as f:
+                json.dump(SPEC, f)
+
+            patch_text = self._dry_run(source_path, spec_path)
+            subprocess.run(['git', 'apply', '-'], input=patch_text, cwd=source_path, universal_newlines=True,
+                           check=True)
+            main(['--source-path', generated_path, '--no-format', spec_path])
+
+            for parts in fake_blender_tree.FILES:
+                self.assertTrue(fake_blender_tree.read(source_path, *parts) ==
+                                fake_blender_tree.read(generated_path, *parts), parts)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import os
+from os import path
+import tempfile
+import unittest
+
+from code_generation import generate_nodes, manifest
+from code_generation.formatter import NullFormatter
+from code_generation.journal import Journal
+from tests import fake_blender_tree
+
+
+class WhitespaceFormatter:
+    """Formatter which only changes the whitespace of the socket code, like clang format the fake trees anchors stay"""
+
+    def format(self, file_paths, line_ranges=None):
+        for file_path in file_paths:
+            with open(file_path, 'r') as f:
+                lines = f.readlines()
+            with open(file_path, 'w') as f:
+                f.write(''.join(line.replace(',', ',  ').replace(';', ';\n') if 'ocket1' in line else line
+                                for line in lines))
+
+
+class TestLocate(unittest.TestCase):
+    def test_locate_reformatted_fragment_found(self):
+        text = 'int a;\nvoid f() {\n  return;\n}\nint b;\n'
+
+        self.assertTrue(manifest.locate(text, 'void f(){return;}\n') == (7, 30))
+
+    def test_locate_edited_fragment_none(self):
+        self.assertTrue(manifest.locate('void f() { return 1; }\n', 'void f(){return;}') is None)
+
+    def test_locate_match_closest_to_hint_used(self):
+        text = 'NODE_A,\nNODE_B,\nNODE_A,\n'
+
+        self.assertTrue(manifest.locate(text, 'NODE_A,\n', hint=14) == (16, 24))
+
+
+class TestNodeUpdate(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._cache = fake_blender_tree.isolated_cache(self._dir.name)
+        self._cache.start()
+        self.source_path = fake_blender_tree.create(path.join(self._dir.name, 'blender'))
+
+    def tearDown(self):
+        self._cache.stop()
+        self._dir.cleanup()
+
+    def _read(self, *parts):
+        return fake_blender_tree.read(self.source_path, *parts)
+
+    def _written(self, written):
+        return set(path.relpath(file_path, self.source_path).replace(os.sep, '/') for file_path in written)
+
+    def test_generate_nodes_unchanged_node_nothing_written(self):
+        generate_nodes([fake_blender_tree.mock_gui(self.source_path)], NullFormatter())
+
+        self.assertTrue(generate_nodes([fake_blender_tree.mock_gui(self.source_path)], NullFormatter()) == [])
+
+    def test_generate_nodes_changed_default_only_changed_code_written(self):
+        generate_nodes([fake_blender_tree.mock_gui(self.source_path)], NullFormatter())
+        gui = fake_blender_tree.mock_gui(self.source_path)
+        gui.get_node_sockets.return_value[0]['default'] = '0.25'
+
+        written = generate_nodes([gui], NullFormatter())
+
+        self.assertTrue(self._written(written) == {'intern/cycles/scene/shader_nodes.cpp',
+                                                   'intern/cycles/kernel/osl/shaders/node_node_name.osl',
+                                                   'source/blender/nodes/shader/nodes/node_shader_node_name.cc'})
+        text = self._read('intern', 'cycles', 'scene', 'shader_nodes.cpp')
+        self.assertTrue('SOCKET_IN_FLOAT(socket1, "Socket1", 0.25);' in text)
+        self.assertTrue(text.count('NODE_DEFINE(NodeNameNode)') == 1)
+
+    def test_generate_nodes_removed_prop_code_removed(self):
+        generate_nodes([fake_blender_tree.mock_gui(self.source_path)], NullFormatter())
+        gui = fake_blender_tree.mock_gui(self.source_path)
+        gui.get_props.return_value.pop(0)
+
+        generate_nodes([gui], NullFormatter())
+
+        self.assertTrue(self._read('intern', 'cycles', 'kernel', 'svm', 'types.h') ==
+                        'typedef enum ShaderNodeType {\n'
+                        '  NODE_END = 0,\n'
+                        'NODE_NODE_NAME,\n'
+                        '} ShaderNodeType;\n'
+                        '\n')
+        self.assertFalse('dropdown1' in self._read('source', 'blender', 'makesrna', 'intern', 'rna_nodetree.c'))
+
+    def test_generate_nodes_formatted_code_updated(self):
+        generate_nodes([fake_blender_tree.mock_gui(self.source_path)], WhitespaceFormatter())
+        gui = fake_blender_tree.mock_gui(self.source_path)
+        gui.get_node_sockets.return_value[0]['default'] = '0.25'
+
+        generate_nodes([gui], WhitespaceFormatter())
+
+        text = self._read('intern', 'cycles', 'scene', 'shader_nodes.cpp')
+        self.assertTrue('0.25);' in text and ',  ' in text)
+        self.assertFalse('0.5)' in text)
+        self.assertTrue(text.count('NODE_DEFINE(NodeNameNode)') == 1)
+
+    def test_generate_nodes_edited_code_nothing_written(self):
+        generate_nodes([fake_blender_tree.mock_gui(self.source_path)], NullFormatter())
+        cycles_nodes = path.join(self.source_path, 'intern', 'cycles', 'scene', 'shader_nodes.cpp')
+        with open(cycles_nodes, 'r') as f:
+            text = f.read()
+        with open(cycles_nodes, 'w') as f:
+            f.write(text.replace('"Socket1", 0.5', '"Socket1", 0.75'))
+        gui = fake_blender_tree.mock_gui(self.source_path)
+        gui.get_node_sockets.return_value[0]['default'] = '0.25'
+
+        with self.assertRaises(Exception) as context:
+            generate_nodes([gui], NullFormatter())
+
+        self.assertTrue('intern/cycles/scene/shader_nodes.cpp: code inserted at cycles_nodes_end not found'
+                        in str(context.exception))
+        self.assertTrue('0.5' in self._read('intern', 'cycles', 'kernel', 'osl', 'shaders', 'node_node_name.osl'))
+
+    def test_generate_nodes_changed_group_raises(self):
+        generate_nodes([fake_blender_tree.mock_gui(self.source_path)], NullFormatter())
+        gui = fake_blender_tree.mock_gui(self.source_path)
+        gui.get_node_group.return_value = 'Input'
+
+        with self.assertRaises(Exception) as context:
+            generate_nodes([gui], NullFormatter())
+
+        self.assertTrue('node group changed' in str(context.exception))
+
+    def test_generate_nodes_undone_update_updated_again(self):
+        generate_nodes([fake_blender_tree.mock_gui(self.source_path)], NullFormatter())
+        gui = fake_blender_tree.mock_gui(self.source_path)
+        gui.get_node_sockets.return_value[0]['default'] = '0.25'
+        generate_nodes([gui], NullFormatter())
+        Journal(self.source_path).undo()
+        gui = fake_blender_tree.mock_gui(self.source_path)
+        gui.get_node_sockets.return_value[0]['default'] = '0.75'
+
+        generate_nodes([gui], NullFormatter())
+
+        text = self._read('intern', 'cycles', 'scene', 'shader_nodes.cpp')
+        self.assertTrue('SOCKET_IN_FLOAT(socket1, "Socket1", 0.75);' in text)
+        self.assertTrue(text.count('NODE_DEFINE(NodeNameNode)') == 1)
+
+    def test_generate_nodes_undone_node_added_again(self):
+        generate_nodes([fake_blender_tree.mock_gui(self.source_path)], NullFormatter())
+        Journal(self.source_path).undo()
+
+        written = generate_nodes([fake_blender_tree.mock_gui(self.source_path)], NullFormatter())
+
+        self.assertTrue('source/blender/blenkernel/BKE_node.h' in self._written(written))
+
+
+if __name__ == "__main__":
+    unittest.main()
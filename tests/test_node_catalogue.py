@@ -0,0 +1,71 @@
+from os import path
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from code_generation import node_catalogue
+from code_generation.node_catalogue import NodeCatalogue
+from code_generation.node_spec import NodeSpec
+from code_generation.source_tree import SourceTree
+from tests import fake_blender_tree
+
+
+class TestNodeCatalogue(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._cache = fake_blender_tree.isolated_cache(self._dir.name)
+        self._cache.start()
+        self.source_path = fake_blender_tree.create(self._dir.name)
+
+    def tearDown(self):
+        self._cache.stop()
+        self._dir.cleanup()
+
+    def _spec(self, name):
+        return NodeSpec.from_gui(fake_blender_tree.mock_gui(self.source_path, name))
+
+    def test_existing_nodes_catalogued(self):
+        catalogue = NodeCatalogue(SourceTree(self.source_path))
+
+        self.assertTrue(catalogue.contains('rna', 'ShaderNodeTexWhiteNoise'))
+        self.assertTrue(catalogue.contains('define', 'SH_NODE_TEX_WHITE_NOISE'))
+        self.assertTrue(catalogue.contains('register', 'register_node_type_sh_add_shader'))
+        self.assertFalse(catalogue.contains('register', 'register_node_type_sh_custom_group'))
+        self.assertTrue(catalogue.contains('class', 'VectorDisplacementNode'))
+        self.assertTrue(catalogue.contains('svm', 'types.h'))
+
+    def test_conflicting_node_every_conflict_reported(self):
+        catalogue = NodeCatalogue(SourceTree(self.source_path))
+
+        self.assertTrue(catalogue.conflicts(self._spec('add shader')) ==
+                        ['register function register_node_type_sh_add_shader already exists'])
+        self.assertTrue(catalogue.conflicts(self._spec('node name')) == [])
+
+    def test_check_batch_duplicates_raise(self):
+        with self.assertRaises(Exception) as context:
+            node_catalogue.check(SourceTree(self.source_path),
+                                 [self._spec('types'), self._spec('node name'), self._spec('node name')])
+
+        message = str(context.exception)
+        self.assertTrue('types: SVM header types.h already exists' in message)
+        self.assertTrue('node name: cycles class NodeNameNode is also generated by node name' in message)
+
+    def test_unchanged_tree_not_scanned_again(self):
+        NodeCatalogue(SourceTree(self.source_path))
+        with patch('code_generation.node_catalogue.NodeCatalogue._scan') as mock_scan:
+            catalogue = NodeCatalogue(SourceTree(self.source_path))
+
+        self.assertFalse(mock_scan.called)
+        self.assertTrue(catalogue.contains('svm', 'svm.h'))
+
+    def test_new_shader_file_catalogued(self):
+        NodeCatalogue(SourceTree(self.source_path))
+        with open(path.join(self.source_path, 'intern', 'cycles', 'kernel', 'osl', 'shaders', 'node_new.osl'),
+                  'w') as f:
+            f.write('shader node_new() {}\n')
+
+        self.assertTrue(NodeCatalogue(SourceTree(self.source_path)).contains('osl', 'node_new.osl'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,12 +7,19 @@ from node_types.prop_enum import EnumProp
 from node_types.prop_int import IntProp
 
 
+def _written_text(writer):
+    """Text of the file the writer modified"""
+    source_tree = writer._source_tree
+    return source_tree.read(source_tree.dirty_files()[0])
+
+
 class TestNodeDrawingWriter(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
         cls._mock_gui = Mock()
 
     def _create_default_class(self, props=None, node_type='Shader'):
+        self._mock_gui.get_node_sockets.return_value = []
         self._mock_gui.get_node_name.return_value = 'node name'
         self._mock_gui.get_source_path.return_value = 'C:/some/path'
         self._mock_gui.get_node_type.return_value = node_type
@@ -56,7 +63,7 @@ class TestNodeDrawingWriter(unittest.TestCase):
                                               '           break;\n'
                                               '   }\n'
                                               '}\n')) as mf:
-            with patch('code_generation.code_generator_util.apply_clang_formatting', Mock()):
+            with patch('code_generation.formatter.LazyClangFormatter.format', Mock()):
                 code_gen = self._create_default_class()
                 code_gen.write_node_drawing()
 
@@ -67,9 +74,9 @@ class TestNodeDrawingWriter(unittest.TestCase):
                 'uiItemR(layout, ptr, "int1", 0, NULL, ICON_NONE);'
                 'uiItemR(layout, ptr, "box1", 0, NULL, ICON_NONE);'
                 'uiItemR(layout, ptr, "box2", 0, NULL, ICON_NONE);'
-                '}\n\n' in mf.mock_calls[-3][1][0]
-                and 'case SH_NODE_NODE_NAME:\n' in mf.mock_calls[-3][1][0]
-                and 'ntype->draw_buttons = node_shader_buts_node_name;\n' in mf.mock_calls[-3][1][0])
+                '}\n\n' in _written_text(code_gen)
+                and 'case SH_NODE_NODE_NAME:\n' in _written_text(code_gen)
+                and 'ntype->draw_buttons = node_shader_buts_node_name;\n' in _written_text(code_gen))
 
     def test_write_drawnode_texture_correct_formatting(self):
         with patch('builtins.open', mock_open(read_data=
@@ -90,7 +97,7 @@ class TestNodeDrawingWriter(unittest.TestCase):
                                               '           break;\n'
                                               '   }\n'
                                               '}\n')) as mf:
-            with patch('code_generation.code_generator_util.apply_clang_formatting', Mock()):
+            with patch('code_generation.formatter.LazyClangFormatter.format', Mock()):
                 code_gen = self._create_default_class(node_type='Texture')
                 code_gen.write_node_drawing()
 
@@ -101,9 +108,9 @@ class TestNodeDrawingWriter(unittest.TestCase):
                 'uiItemR(layout, ptr, "int1", 0, NULL, ICON_NONE);'
                 'uiItemR(layout, ptr, "box1", 0, NULL, ICON_NONE);'
                 'uiItemR(layout, ptr, "box2", 0, NULL, ICON_NONE);'
-                '}\n\n' in mf.mock_calls[-3][1][0]
-                and 'case SH_NODE_TEX_NODE_NAME:\n' in mf.mock_calls[-3][1][0]
-                and 'ntype->draw_buttons = node_shader_buts_tex_node_name;\n' in mf.mock_calls[-3][1][0])
+                '}\n\n' in _written_text(code_gen)
+                and 'case SH_NODE_TEX_NODE_NAME:\n' in _written_text(code_gen)
+                and 'ntype->draw_buttons = node_shader_buts_tex_node_name;\n' in _written_text(code_gen))
 
     def test_write_drawnode_bsdf_correct_formatting(self):
         with patch('builtins.open', mock_open(read_data=
@@ -124,7 +131,7 @@ class TestNodeDrawingWriter(unittest.TestCase):
                                               '           break;\n'
                                               '   }\n'
                                               '}\n')) as mf:
-            with patch('code_generation.code_generator_util.apply_clang_formatting', Mock()):
+            with patch('code_generation.formatter.LazyClangFormatter.format', Mock()):
                 code_gen = self._create_default_class(node_type='Bsdf')
                 code_gen.write_node_drawing()
 
@@ -135,9 +142,9 @@ class TestNodeDrawingWriter(unittest.TestCase):
                 'uiItemR(layout, ptr, "int1", 0, NULL, ICON_NONE);'
                 'uiItemR(layout, ptr, "box1", 0, NULL, ICON_NONE);'
                 'uiItemR(layout, ptr, "box2", 0, NULL, ICON_NONE);'
-                '}\n\n' in mf.mock_calls[-3][1][0]
-                and 'case SH_NODE_BSDF_NODE_NAME:\n' in mf.mock_calls[-3][1][0]
-                and 'ntype->draw_buttons = node_shader_buts_bsdf_node_name;\n' in mf.mock_calls[-3][1][0])
+                '}\n\n' in _written_text(code_gen)
+                and 'case SH_NODE_BSDF_NODE_NAME:\n' in _written_text(code_gen)
+                and 'ntype->draw_buttons = node_shader_buts_bsdf_node_name;\n' in _written_text(code_gen))
 
 
 if __name__ == '__main__':
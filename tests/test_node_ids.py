@@ -0,0 +1,62 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from code_generation import generate_nodes
+from code_generation.node_ids import NodeIdRegistry
+from tests import fake_blender_tree
+
+TEXT = ('//#define SH_NODE_MATERIAL 100\n'
+        '#define SH_NODE_RGB 101\n'
+        '// #define SH_NODE_RETIRED 1000\n'
+        '#define SH_NODE_VERTEX_COLOR 999\n'
+        '\n'
+        '/* custom defines options for Material node */\n'
+        '#define SH_NODE_MAT_DIFF 1\n'
+        '#define SH_NODE_MAT_SPEC 2\n')
+
+
+class TestNodeIdRegistry(unittest.TestCase):
+    def test_ids_parsed(self):
+        registry = NodeIdRegistry(TEXT)
+
+        self.assertTrue(registry.ids == {101: 'SH_NODE_RGB', 999: 'SH_NODE_VERTEX_COLOR'})
+        self.assertTrue(registry.names['SH_NODE_MAT_DIFF'] == 1)
+        self.assertTrue(registry.last_id == 999)
+        self.assertTrue(TEXT[:registry.block_end].endswith('#define SH_NODE_VERTEX_COLOR 999\n'))
+
+    def test_allocate_batch_after_retired_ids(self):
+        allocated = NodeIdRegistry(TEXT).allocate(['SH_NODE_A', 'SH_NODE_B'])
+
+        self.assertTrue(allocated == {'SH_NODE_A': 1001, 'SH_NODE_B': 1002})
+
+    def test_allocate_collisions_all_reported(self):
+        with self.assertRaises(Exception) as context:
+            NodeIdRegistry(TEXT).allocate(['SH_NODE_RGB', 'SH_NODE_MAT_SPEC', 'SH_NODE_A', 'SH_NODE_A'])
+
+        message = str(context.exception)
+        self.assertTrue('SH_NODE_RGB is already defined as 101' in message)
+        self.assertTrue('SH_NODE_MAT_SPEC is already defined as 2' in message)
+        self.assertTrue('SH_NODE_A is added more than once' in message)
+
+    def test_allocate_no_ids_raises(self):
+        with self.assertRaises(Exception):
+            NodeIdRegistry('/* empty */\n').allocate(['SH_NODE_A'])
+
+    def test_generate_nodes_collision_nothing_written(self):
+        with tempfile.TemporaryDirectory() as root:
+            source_path = fake_blender_tree.create(root)
+            guis = [fake_blender_tree.mock_gui(source_path, 'node one'),
+                    fake_blender_tree.mock_gui(source_path, 'vertex color')]
+            with fake_blender_tree.isolated_cache(root), \
+                    patch('code_generation.formatter.LazyClangFormatter.format') as mock_format:
+                with self.assertRaises(Exception):
+                    generate_nodes(guis)
+
+            self.assertFalse(mock_format.called)
+            bke_node = ('source', 'blender', 'blenkernel', 'BKE_node.h')
+            self.assertTrue(fake_blender_tree.read(source_path, *bke_node) == fake_blender_tree.FILES[bke_node])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+
+from code_generation.node_spec import NodeSpec, ItemSpec
+from tests import fake_blender_tree
+
+
+class TestNodeSpec(unittest.TestCase):
+    def _create_default_spec(self, node_name='node name', node_type='Shader'):
+        gui = fake_blender_tree.mock_gui('C:/some/path', node_name)
+        gui.get_node_type.return_value = node_type
+        gui.type_suffix.return_value = 'texture' if node_type == 'Texture' else ''
+        gui.type_suffix_abbreviated.return_value = 'tex' if node_type == 'Texture' else ''
+        return gui, NodeSpec.from_gui(gui)
+
+    def test_from_gui_gui_read_once(self):
+        gui, spec = self._create_default_spec()
+        spec.get_props()
+        spec.get_props()
+        spec.get_node_sockets()
+
+        self.assertTrue(gui.get_props.call_count == 1)
+        self.assertTrue(gui.get_node_sockets.call_count == 1)
+
+    def test_from_gui_node_spec_returned_unchanged(self):
+        _, spec = self._create_default_spec()
+
+        self.assertTrue(NodeSpec.from_gui(spec) is spec)
+
+    def test_node_name_forms_precomputed(self):
+        _, spec = self._create_default_spec('my node name')
+
+        self.assertTrue(spec.name_lower_underscored == 'my_node_name')
+        self.assertTrue(spec.name_upper_underscored == 'MY_NODE_NAME')
+        self.assertTrue(spec.name_capitalized_no_space == 'MyNodeName')
+        self.assertTrue(spec.name_capitalized_spaced == 'My Node Name')
+
+    def test_suffix_prefixes_texture_node(self):
+        _, spec = self._create_default_spec(node_type='Texture')
+
+        self.assertTrue(spec.suffix_prefix == 'texture_')
+        self.assertTrue(spec.suffix_abbreviated_prefix == 'tex_')
+        self.assertTrue(spec.suffix_abbreviated_prefix_upper == 'TEX_')
+
+    def test_suffix_prefixes_shader_node_empty(self):
+        _, spec = self._create_default_spec()
+
+        self.assertTrue(spec.suffix_abbreviated_prefix == '')
+        self.assertTrue(spec.suffix_abbreviated_prefix_upper == '')
+
+    def test_content_hash_equal_specs_equal(self):
+        _, spec = self._create_default_spec()
+        other = NodeSpec.from_gui(fake_blender_tree.mock_gui('C:/other/path'))
+
+        self.assertTrue(spec.content_hash() == other.content_hash())
+
+    def test_content_hash_changed_default_differs(self):
+        _, spec = self._create_default_spec()
+        gui = fake_blender_tree.mock_gui('C:/some/path')
+        gui.get_props.return_value[1]['default'] = 1
+
+        self.assertTrue(spec.content_hash() != NodeSpec.from_gui(gui).content_hash())
+
+    def test_set_attribute_raises(self):
+        _, spec = self._create_default_spec()
+
+        with self.assertRaises(AttributeError):
+            spec.name_lower_underscored = 'other'
+
+    def test_has_no_instance_dict(self):
+        _, spec = self._create_default_spec()
+
+        self.assertFalse(hasattr(spec, '__dict__'))
+
+
+class TestItemSpec(unittest.TestCase):
+    def test_indexed_as_dict(self):
+        item = ItemSpec({'name': 'socket one', 'type': 'Input'})
+
+        self.assertTrue(item['type'] == 'Input')
+        self.assertTrue(item.get('min') is None)
+        self.assertTrue(item == {'name': 'socket one', 'type': 'Input'})
+
+    def test_name_forms_precomputed(self):
+        item = ItemSpec({'name': 'socket one'})
+
+        self.assertTrue(item.name_lower_underscored == 'socket_one')
+        self.assertTrue(item.name_upper_underscored == 'SOCKET_ONE')
+        self.assertTrue(item.name_capitalized_no_space == 'SocketOne')
+
+    def test_enum_options_converted(self):
+        item = ItemSpec({'name': 'dropdown', 'options': [{'name': 'option one', 'desc': ''}]})
+
+        self.assertTrue(item['options'][0].name_upper_underscored == 'OPTION_ONE')
+
+    def test_set_item_raises(self):
+        item = ItemSpec({'name': 'socket one'})
+
+        with self.assertRaises(TypeError):
+            item['name'] = 'other'
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+import os
+from os import path
+import tempfile
+import unittest
+from unittest.mock import patch, Mock
+
+from code_generation import generate_nodes, render_cache
+from code_generation.node_spec import NodeSpec
+from code_generation.render_cache import RenderCache
+from tests import fake_blender_tree
+
+
+class TestRenderCache(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._cache = fake_blender_tree.isolated_cache(self._dir.name)
+        self._cache.start()
+        self.source_path = fake_blender_tree.create(path.join(self._dir.name, 'blender'))
+        render_cache._cache.clear()
+
+    def tearDown(self):
+        render_cache._cache.clear()
+        self._cache.stop()
+        self._dir.cleanup()
+
+    def _spec(self, name='node name'):
+        return NodeSpec.from_gui(fake_blender_tree.mock_gui(self.source_path, name))
+
+    def test_render_second_render_cached(self):
+        cache = RenderCache()
+        render = Mock(return_value='text')
+
+        self.assertTrue(cache.render(self._spec(), 'fragment', render) == 'text')
+        self.assertTrue(cache.render(self._spec(), 'fragment', render) == 'text')
+        self.assertTrue(render.call_count == 1)
+
+    def test_render_different_specs_rendered_separately(self):
+        cache = RenderCache()
+
+        self.assertTrue(cache.render(self._spec('node one'), 'fragment', lambda: 'one') == 'one')
+        self.assertTrue(cache.render(self._spec('node two'), 'fragment', lambda: 'two') == 'two')
+
+    def test_render_equal_spec_at_other_source_path_cached(self):
+        cache = RenderCache()
+        cache.render(self._spec(), 'fragment', lambda: 'text')
+        spec = NodeSpec.from_gui(fake_blender_tree.mock_gui('other/path'))
+
+        self.assertTrue(cache.render(spec, 'fragment', Mock(side_effect=AssertionError)) == 'text')
+
+    def test_render_saved_fragment_loaded_from_disk(self):
+        cache = RenderCache()
+        cache.render(self._spec(), 'fragment', lambda: 'text')
+        cache.save()
+
+        self.assertTrue(RenderCache().render(self._spec(), 'fragment', Mock(side_effect=AssertionError)) == 'text')
+
+    def test_render_least_recently_used_evicted_and_saved(self):
+        cache = RenderCache(size=2)
+        cache.render(self._spec('node one'), 'fragment', lambda: 'one')
+        cache.render(self._spec('node two'), 'fragment', lambda: 'two')
+        cache.render(self._spec('node one'), 'fragment', lambda: 'one')
+        cache.render(self._spec('node three'), 'fragment', lambda: 'three')
+
+        self.assertTrue(len(cache._entries) == 2)
+        self.assertTrue(cache._key(self._spec('node two')) not in cache._entries)
+        # The evicted fragments are stored on disk rather than lost
+        self.assertTrue(cache.render(self._spec('node two'), 'fragment', Mock(side_effect=AssertionError)) == 'two')
+
+    def test_render_other_generator_version_not_used(self):
+        cache = RenderCache()
+        cache.render(self._spec(), 'fragment', lambda: 'old')
+        cache.save()
+        cache.clear()
+
+        with patch('code_generation.render_cache.generator_version', return_value='other'):
+            self.assertTrue(cache.render(self._spec(), 'fragment', lambda: 'new') == 'new')
+
+    def test_rendered_not_enabled_always_renders(self):
+        class Writer:
+            _spec = self._spec()
+            render = Mock(return_value='text')
+
+            @render_cache.rendered
+            def generate(self):
+                return self.render()
+
+        Writer().generate()
+        Writer().generate()
+
+        self.assertTrue(Writer.render.call_count == 2)
+
+    def test_generate_nodes_equal_node_not_rendered_again(self):
+        with patch('code_generation.formatter.LazyClangFormatter.format'):
+            generate_nodes([fake_blender_tree.mock_gui(self.source_path)])
+        first = fake_blender_tree.read(self.source_path, 'intern', 'cycles', 'kernel', 'svm', 'node_name.h')
+        render_cache._cache.clear()
+        other_path = fake_blender_tree.create(path.join(self._dir.name, 'other'))
+
+        with patch('code_generation.formatter.LazyClangFormatter.format'), \
+                patch('code_generation.code_generator_util.license_text', side_effect=AssertionError):
+            generate_nodes([fake_blender_tree.mock_gui(other_path)])
+
+        self.assertTrue(fake_blender_tree.read(other_path, 'intern', 'cycles', 'kernel', 'svm', 'node_name.h') == first)
+        self.assertTrue(os.listdir(path.join(self._dir.name, '.cache', render_cache.CACHE_NAMESPACE)))
+
+    def test_generate_nodes_code_generator_and_drawing_fragments_cached(self):
+        with patch('code_generation.formatter.LazyClangFormatter.format'):
+            generate_nodes([fake_blender_tree.mock_gui(self.source_path)])
+
+        fragments = render_cache._cache._fragments(render_cache._cache._key(self._spec()))
+        for name in ['CodeGenerator._generate_node_definition', 'CodeGenerator._generate_cycles_class',
+                     'CodeGenerator._generate_cycles_class_instance', 'CodeGenerator._generate_cycles_node',
+                     'NodeDrawingWriter._generate_draw_buttons', 'NodeDrawingWriter._generate_draw_buttons_case']:
+            self.assertTrue(name in fragments, name)
+
+
+if __name__ == "__main__":
+    unittest.main()
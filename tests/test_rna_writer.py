@@ -1,6 +1,7 @@
 import unittest
 from unittest.mock import Mock, patch, mock_open
 
+from code_generation.node_spec import ItemSpec
 from code_generation.rna_writer import RNAWriter
 from node_types.prop_bool import BoolProp
 from node_types.prop_enum import EnumProp
@@ -15,6 +16,7 @@ class TestRNAWriter(unittest.TestCase):
     def _create_default_class(self, props=None, node_type='Shader'):
         self._mock_gui.get_node_type.return_value = node_type
         self._mock_gui.get_source_path.return_value = "C:/some_path"
+        self._mock_gui.get_node_sockets.return_value = []
         self._mock_gui.get_node_name.return_value = "node name"
         self._mock_gui.get_props.return_value = [
             {"name": "dropdown1", 'data-type': EnumProp(), "sub-type": "PROP_NONE",
@@ -696,7 +698,7 @@ class TestRNAWriter(unittest.TestCase):
                             {"name": "prop2", "desc": "Short description"}],
                 "default": 'prop1'}
         code_gen = self._create_default_class()
-        enum = code_gen._generate_enum_prop_item(prop)
+        enum = code_gen._generate_enum_prop_item(ItemSpec(prop))
 
         self.assertTrue(enum == 'static const EnumPropertyItem rna_enum_node_dropdown1_items[] = {'
                                 '{1, "PROP1", 0, "Prop1", "Short description"},'
@@ -710,7 +712,7 @@ class TestRNAWriter(unittest.TestCase):
                             {"name": "prop2", "desc": "Short description"}],
                 "default": 'prop1'}
         code_gen = self._create_default_class(node_type='Texture')
-        enum = code_gen._generate_enum_prop_item(prop)
+        enum = code_gen._generate_enum_prop_item(ItemSpec(prop))
 
         self.assertTrue(enum == 'static const EnumPropertyItem rna_enum_node_tex_dropdown1_items[] = {'
                                 '{1, "PROP1", 0, "Prop1", "Short description"},'
@@ -0,0 +1,224 @@
+import os
+from os import path
+import tempfile
+import unittest
+from unittest.mock import patch, mock_open
+
+from code_generation.formatter import RecordingFormatter
+from code_generation.source_tree import SourceTree, changed_line_ranges, unified_diff
+from tests import fake_blender_tree
+
+
+class TestSourceTree(unittest.TestCase):
+    def test_read_file_read_once(self):
+        with patch('builtins.open', mock_open(read_data='text')) as mf:
+            source_tree = SourceTree('C:/some/path')
+            source_tree.read('C:/some/path/file.h')
+            source_tree.read('C:/some/path/file.h')
+
+            self.assertTrue(mf.call_count == 1)
+
+    def test_write_not_written_before_flush(self):
+        with patch('builtins.open', mock_open(read_data='text')) as mf:
+            source_tree = SourceTree('C:/some/path')
+            source_tree.write('C:/some/path/file.h', 'new text')
+
+            self.assertTrue(mf.call_count == 0)
+            self.assertTrue(source_tree.read('C:/some/path/file.h') == 'new text')
+
+    def test_flush_writes_dirty_files(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(path.join(root, 'a.h'), 'w') as f:
+                f.write('text')
+            source_tree = SourceTree(root)
+            source_tree.read(path.join(root, 'a.h'))
+            source_tree.write(path.join(root, 'b.h'), 'new text')
+            with patch('builtins.open', side_effect=open) as mf:
+                source_tree.flush()
+
+            self.assertTrue(mf.call_count == 1)
+            with open(path.join(root, 'b.h')) as f:
+                self.assertTrue(f.read() == 'new text')
+            self.assertTrue(source_tree.dirty_files() == [])
+            self.assertTrue(sorted(os.listdir(root)) == ['a.h', 'b.h'])
+
+    def test_flush_failure_leaves_files_unchanged(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(path.join(root, 'a.h'), 'w') as f:
+                f.write('text')
+            source_tree = SourceTree(root)
+            source_tree.write(path.join(root, 'a.h'), 'new text')
+            source_tree.write(path.join(root, 'missing', 'b.h'), 'new text')
+
+            self.assertRaises(FileNotFoundError, source_tree.flush)
+            with open(path.join(root, 'a.h')) as f:
+                self.assertTrue(f.read() == 'text')
+            self.assertTrue(os.listdir(root) == ['a.h'])
+
+    def test_discard_drops_edits(self):
+        with patch('builtins.open', mock_open(read_data='text')):
+            source_tree = SourceTree('C:/some/path')
+            source_tree.write('C:/some/path/file.h', 'new text')
+            source_tree.discard()
+
+            self.assertTrue(source_tree.dirty_files() == [])
+            self.assertTrue(source_tree.read('C:/some/path/file.h') == 'text')
+
+    def test_changed_lines_new_file_none(self):
+        source_tree = SourceTree('C:/some/path')
+        source_tree.write('C:/some/path/file.h', 'new text')
+
+        self.assertTrue(source_tree.changed_lines('C:/some/path/file.h') is None)
+
+    def test_changed_lines_inserted_lines(self):
+        with patch('builtins.open', mock_open(read_data='a\nb\nc\n')):
+            source_tree = SourceTree('C:/some/path')
+            text = source_tree.read('C:/some/path/file.h')
+            source_tree.write('C:/some/path/file.h', text.replace('b\n', 'new\nb\n') + 'end\n')
+
+            self.assertTrue(source_tree.changed_lines('C:/some/path/file.h') == [(2, 2), (5, 5)])
+
+    def test_flush_formats_changed_lines_only(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(path.join(root, 'a.h'), 'w') as f:
+                f.write('a\nb\n')
+            formatter = RecordingFormatter()
+            source_tree = SourceTree(root, formatter)
+            source_tree.write(path.join(root, 'a.h'), source_tree.read(path.join(root, 'a.h')) + 'c\n',
+                              formatted=True)
+            source_tree.write(path.join(root, 'b.h'), 'new text', formatted=True)
+            source_tree.flush()
+
+            self.assertTrue(formatter.calls == [([path.join(root, 'a.h'), path.join(root, 'b.h')],
+                                                 {path.join(root, 'a.h'): [(3, 3)]})])
+
+
+    def test_diff_nothing_written(self):
+        with tempfile.TemporaryDirectory() as root, fake_blender_tree.isolated_cache(root):
+            with open(path.join(root, 'a.h'), 'w') as f:
+                f.write('one\ntwo\n')
+            source_tree = SourceTree(root)
+            source_tree.insert(path.join(root, 'a.h'), 4, 'new\n')
+            source_tree.write(path.join(root, 'dir', 'b.h'), 'text\n')
+            with patch('os.replace') as mock_replace:
+                diff = source_tree.diff()
+
+            self.assertFalse(mock_replace.called)
+            self.assertTrue(diff == 'diff --git a/a.h b/a.h\n'
+                                    '--- a/a.h\n'
+                                    '+++ b/a.h\n'
+                                    '@@ -1,2 +1,3 @@\n'
+                                    ' one\n'
+                                    '+new\n'
+                                    ' two\n'
+                                    'diff --git a/dir/b.h b/dir/b.h\n'
+                                    'new file mode 100644\n'
+                                    '--- /dev/null\n'
+                                    '+++ b/dir/b.h\n'
+                                    '@@ -0,0 +1 @@\n'
+                                    '+text\n')
+
+
+    def test_preflight_every_missing_anchor_reported(self):
+        with tempfile.TemporaryDirectory() as root, fake_blender_tree.isolated_cache(root):
+            source_path = fake_blender_tree.create(root)
+            types_path = path.join(source_path, 'intern', 'cycles', 'kernel', 'svm', 'types.h')
+            svm_path = path.join(source_path, 'intern', 'cycles', 'kernel', 'svm', 'svm.h')
+            source_tree = SourceTree(source_path)
+
+            with self.assertRaises(Exception) as context:
+                source_tree.preflight([(types_path, 'shader_node_types_end'), (types_path, 'not_an_anchor'),
+                                       (svm_path, 'svm_cases_start'), (svm_path, 'missing_too'),
+                                       (path.join(source_path, 'missing.h'), 'anchor')])
+
+            message = str(context.exception)
+            self.assertTrue('intern/cycles/kernel/svm/types.h: not_an_anchor not found' in message)
+            self.assertTrue('intern/cycles/kernel/svm/svm.h: missing_too not found' in message)
+            self.assertTrue('missing.h: ' in message)
+            self.assertFalse('shader_node_types_end' in message)
+
+    def test_preflight_files_read_once(self):
+        with tempfile.TemporaryDirectory() as root, fake_blender_tree.isolated_cache(root):
+            source_path = fake_blender_tree.create(root)
+            types_path = path.join(source_path, 'intern', 'cycles', 'kernel', 'svm', 'types.h')
+            source_tree = SourceTree(source_path)
+            with patch('builtins.open', side_effect=open) as mf:
+                source_tree.preflight([(types_path, 'shader_node_types_end')])
+                source_tree.insert(types_path, source_tree.anchor(types_path, 'shader_node_types_end'), 'NODE_A,\n')
+
+            self.assertTrue(len([c for c in mf.call_args_list if c.args[0] == types_path]) == 1)
+
+    def test_insert_fragment_recorded_at_anchor(self):
+        with tempfile.TemporaryDirectory() as root, fake_blender_tree.isolated_cache(root):
+            source_path = fake_blender_tree.create(root)
+            types_path = path.join(source_path, 'intern', 'cycles', 'kernel', 'svm', 'types.h')
+            source_tree = SourceTree(source_path)
+            source_tree.insert(types_path, source_tree.anchor(types_path, 'shader_node_types_end'), 'NODE_B,\n')
+            source_tree.insert(types_path, 0, '/* a */\n')
+
+            fragments = source_tree.fragments()
+            self.assertTrue([fragment['anchor'] for fragment in fragments] == ['shader_node_types_end', None])
+            # The first fragment moves with the text inserted before it
+            self.assertTrue(source_tree.read(types_path)[fragments[0]['start']:fragments[0]['end']] == 'NODE_B,\n')
+
+    def test_write_new_file_fragment_recorded(self):
+        source_tree = SourceTree('C:/some/path')
+        source_tree.write('C:/some/path/file.h', 'text')
+
+        self.assertTrue([(fragment['kind'], fragment['text']) for fragment in source_tree.fragments()] ==
+                        [('file', 'text')])
+
+    def test_replace_anchors_moved(self):
+        with tempfile.TemporaryDirectory() as root, fake_blender_tree.isolated_cache(root):
+            source_path = fake_blender_tree.create(root)
+            types_path = path.join(source_path, 'intern', 'cycles', 'kernel', 'svm', 'types.h')
+            source_tree = SourceTree(source_path)
+            source_tree.replace(types_path, 0, len('typedef'), 'enum')
+
+            self.assertTrue(source_tree.read(types_path).startswith('enum enum ShaderNodeType {\n'))
+            self.assertTrue(source_tree.read(types_path)[source_tree.anchor(types_path, 'shader_node_types_end'):]
+                            .startswith('} ShaderNodeType;'))
+
+    def test_base_edits_not_applied_to_base(self):
+        with tempfile.TemporaryDirectory() as root:
+            with open(path.join(root, 'a.h'), 'w') as f:
+                f.write('one\n')
+            base = SourceTree(root)
+            base.write(path.join(root, 'a.h'), 'two\n')
+            scratch_tree = SourceTree(root, base=base)
+            scratch_tree.write(path.join(root, 'a.h'), scratch_tree.read(path.join(root, 'a.h')) + 'three\n')
+
+            self.assertTrue(base.read(path.join(root, 'a.h')) == 'two\n')
+            self.assertTrue(scratch_tree.read(path.join(root, 'a.h')) == 'two\nthree\n')
+
+
+class TestUnifiedDiff(unittest.TestCase):
+    def test_unchanged_empty(self):
+        self.assertTrue(unified_diff('a.h', 'text\n', 'text\n') == '')
+
+    def test_no_newline_at_end_marked(self):
+        diff = unified_diff('a.h', 'one', 'one\ntwo')
+
+        self.assertTrue(diff.endswith('-one\n\\ No newline at end of file\n'
+                                      '+one\n'
+                                      '+two\n\\ No newline at end of file\n'))
+
+
+class TestChangedLineRanges(unittest.TestCase):
+    def test_unchanged_no_ranges(self):
+        self.assertTrue(changed_line_ranges('a\nb\n', 'a\nb\n') == [])
+
+    def test_replaced_line(self):
+        self.assertTrue(changed_line_ranges('a\nb\nc\n', 'a\nx\ny\nc\n') == [(2, 3)])
+
+    def test_removed_lines_no_ranges(self):
+        self.assertTrue(changed_line_ranges('a\nb\nc\n', 'a\nc\n') == [])
+
+    def test_separate_insertions(self):
+        old = ''.join('line {0}\n'.format(i) for i in range(10))
+        new = old.replace('line 2\n', 'line 2\nnew\n').replace('line 7\n', 'line 7\nnew\nnew\n')
+        self.assertTrue(changed_line_ranges(old, new) == [(4, 4), (10, 11)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,217 @@
+import copy
+import json
+import os
+from os import path
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from code_generation import cache, spec_loader
+from node_types.prop_bool import BoolProp
+from node_types.prop_enum import EnumProp
+from node_types.socket_float import FloatSocket
+
+SPEC = {
+    "name": "node name",
+    "type": "Texture",
+    "group": "Texture",
+    "props": [{"name": "box1", "data-type": "Boolean", "sub-type": "PROP_NONE", "default": 0},
+              {"name": "dropdown1", "data-type": "Enum", "sub-type": "PROP_NONE", "default": "prop1",
+               "options": [{"name": "prop1", "desc": "Short description"},
+                           {"name": "prop2", "desc": "Short description"}]}],
+    "sockets": [{"type": "Output", "name": "socket2", "data-type": "Float", "sub-type": "PROP_NONE"},
+                {"type": "Input", "name": "socket1", "data-type": "Float", "sub-type": "PROP_NONE",
+                 "min": "-1.0", "max": "1.0", "default": "0.5"}]
+}
+
+TOML_SPEC = '''name = "node name"
+type = "Shader"
+group = "Shader"
+
+[[props]]
+name = "int1"
+data-type = "Int"
+sub-type = "PROP_NONE"
+min = -1
+max = 1
+default = 0
+
+[[sockets]]
+type = "Input"
+name = "socket1"
+data-type = "Float"
+sub-type = "PROP_NONE"
+min = "0.0f"
+max = "1.0f"
+default = "0.5f"
+'''
+
+
+class TestSpecLoader(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._env = patch.dict(os.environ, {cache.CACHE_DIR_ENV: path.join(self._dir.name, 'cache')})
+        self._env.start()
+        spec_loader._compiled.clear()
+
+    def tearDown(self):
+        self._env.stop()
+        self._dir.cleanup()
+        spec_loader._compiled.clear()
+
+    def _write_spec(self, spec, name='node.json'):
+        spec_path = path.join(self._dir.name, name)
+        with open(spec_path, 'w') as f:
+            f.write(spec if isinstance(spec, str) else json.dumps(spec))
+        return spec_path
+
+    def test_load_json_spec_built(self):
+        spec = spec_loader.load_node_spec(self._write_spec(SPEC), 'C:/some/path')
+
+        self.assertTrue(spec.get_node_name() == 'node name')
+        self.assertTrue(spec.get_source_path() == 'C:/some/path')
+        self.assertTrue(spec.type_suffix_abbreviated() == 'tex')
+        self.assertTrue(isinstance(spec.get_props()[0]['data-type'], EnumProp))
+        self.assertTrue(isinstance(spec.get_props()[1]['data-type'], BoolProp))
+        self.assertTrue(isinstance(spec.get_node_sockets()[0]['data-type'], FloatSocket))
+
+    def test_load_json_spec_sorted_as_gui(self):
+        spec = spec_loader.load_node_spec(self._write_spec(SPEC), 'C:/some/path')
+
+        self.assertTrue([prop['name'] for prop in spec.get_props()] == ['dropdown1', 'box1'])
+        self.assertTrue([socket['type'] for socket in spec.get_node_sockets()] == ['Input', 'Output'])
+        self.assertTrue(spec.get_node_sockets()[1]['flags'] == ())
+
+    @unittest.skipIf(spec_loader.tomllib is None, 'toml parser not available')
+    def test_load_toml_spec_built(self):
+        spec = spec_loader.load_node_spec(self._write_spec(TOML_SPEC, 'node.toml'), 'C:/some/path')
+
+        self.assertTrue(spec.get_props()[0]['max'] == 1)
+        self.assertTrue(spec.get_node_sockets()[0]['default'] == '0.5f')
+
+    def test_constant_fold_off_unless_set(self):
+        self.assertFalse(spec_loader.load_node_spec(self._write_spec(SPEC), 'C:/some/path').uses_constant_fold())
+        spec_path = self._write_spec(dict(SPEC, constant_fold=True))
+
+        self.assertTrue(spec_loader.load_node_spec(spec_path, 'C:/some/path').uses_constant_fold())
+
+    def test_constant_fold_not_bool_rejected(self):
+        spec = dict(SPEC, constant_fold='yes')
+
+        with self.assertRaises(Exception) as context:
+            spec_loader.load_node_spec(self._write_spec(spec), 'C:/some/path')
+
+        self.assertTrue('constant_fold must be true or false' in str(context.exception))
+
+    def test_invalid_spec_all_errors_reported(self):
+        spec = copy.deepcopy(SPEC)
+        spec['type'] = 'Unknown'
+        spec['props'][0]['default'] = 2
+        spec['props'][1]['default'] = 'prop3'
+        spec['sockets'][0]['flags'] = ['not_a_flag']
+        spec['sockets'][1]['name'] = 'box1'
+
+        with self.assertRaises(Exception) as context:
+            spec_loader.load_node_spec(self._write_spec(spec), 'C:/some/path')
+
+        message = str(context.exception)
+        self.assertTrue('node type must be one of' in message)
+        self.assertTrue('prop 0 (box1) default must be 0 or 1' in message)
+        self.assertTrue("prop 1 (dropdown1) default 'prop3' is not one of its options" in message)
+        self.assertTrue("socket 0 (socket2) has unknown flag 'not_a_flag'" in message)
+        self.assertTrue("name 'box1' is used more than once" in message)
+
+    def _errors(self, spec):
+        with self.assertRaises(Exception) as context:
+            spec_loader.load_node_spec(self._write_spec(spec), 'C:/some/path')
+        return str(context.exception)
+
+    def test_input_socket_without_default_rejected(self):
+        spec = copy.deepcopy(SPEC)
+        del spec['sockets'][1]['default']
+
+        self.assertTrue('socket 1 (socket1) has no default' in self._errors(spec))
+
+    def test_input_socket_without_min_rejected(self):
+        spec = copy.deepcopy(SPEC)
+        del spec['sockets'][1]['min']
+
+        self.assertTrue('socket 1 (socket1) has no min' in self._errors(spec))
+
+    def test_input_socket_without_max_rejected(self):
+        spec = copy.deepcopy(SPEC)
+        del spec['sockets'][1]['max']
+
+        self.assertTrue('socket 1 (socket1) has no max' in self._errors(spec))
+
+    def test_socket_without_sub_type_rejected(self):
+        spec = copy.deepcopy(SPEC)
+        del spec['sockets'][0]['sub-type']
+
+        self.assertTrue('socket 0 (socket2) has no sub-type' in self._errors(spec))
+
+    def test_prop_without_sub_type_rejected(self):
+        spec = copy.deepcopy(SPEC)
+        del spec['props'][0]['sub-type']
+
+        self.assertTrue('prop 0 (box1) has no sub-type' in self._errors(spec))
+
+    def test_enum_option_without_desc_rejected(self):
+        spec = copy.deepcopy(SPEC)
+        del spec['props'][1]['options'][1]['desc']
+
+        self.assertTrue("prop 1 (dropdown1) option 'prop2' has no desc" in self._errors(spec))
+
+    def test_props_not_a_list_rejected(self):
+        errors = self._errors(dict(SPEC, props={}))
+
+        self.assertTrue('props must be a list of objects' in errors)
+        self.assertTrue('Invalid node spec' in errors)
+
+    def test_sockets_not_objects_rejected(self):
+        errors = self._errors(dict(SPEC, sockets=['x']))
+
+        self.assertTrue('sockets must be a list of objects' in errors)
+        self.assertTrue('Invalid node spec' in errors)
+
+    def test_enum_options_not_objects_rejected(self):
+        spec = copy.deepcopy(SPEC)
+        spec['props'][1]['options'] = ['prop1', 'prop2']
+
+        self.assertTrue('prop 1 (dropdown1) options must be a list of objects' in self._errors(spec))
+
+    def test_socket_flags_not_a_list_rejected(self):
+        spec = copy.deepcopy(SPEC)
+        spec['sockets'][0]['flags'] = 'hide_value'
+
+        self.assertTrue('socket 0 (socket2) flags must be a list' in self._errors(spec))
+
+    def test_reload_unchanged_spec_not_parsed(self):
+        spec_path = self._write_spec(SPEC)
+        first = spec_loader.load_node_spec(spec_path, 'C:/some/path')
+        with patch('code_generation.spec_loader.parse_spec') as mock_parse:
+            second = spec_loader.load_node_spec(spec_path, 'C:/some/path')
+
+        self.assertFalse(mock_parse.called)
+        self.assertTrue(first is second)
+
+    def test_reload_in_new_run_uses_disk_cache(self):
+        spec_path = self._write_spec(SPEC)
+        spec_loader.load_node_spec(spec_path, 'C:/some/path')
+        spec_loader._compiled.clear()
+        with patch('code_generation.spec_loader.parse_spec') as mock_parse:
+            spec = spec_loader.load_node_spec(spec_path, 'C:/some/path')
+
+        self.assertFalse(mock_parse.called)
+        self.assertTrue([prop['name'] for prop in spec.get_props()] == ['dropdown1', 'box1'])
+
+    def test_changed_spec_reloaded(self):
+        spec_path = self._write_spec(SPEC)
+        spec_loader.load_node_spec(spec_path, 'C:/some/path')
+        self._write_spec(dict(SPEC, name='other node'))
+
+        self.assertTrue(spec_loader.load_node_spec(spec_path, 'C:/some/path').get_node_name() == 'other node')
+
+
+if __name__ == '__main__':
+    unittest.main()